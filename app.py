@@ -1,8 +1,9 @@
+import os
+import time
 import streamlit as st
-import pandas as pd
-import joblib
-import plotly.graph_objects as go
-import plotly.express as px
+from metrics import REGISTRY
+from model_registry import ModelHandle, ModelRegistry
+from prediction_cache import PredictionCache
 
 # ============================================================================
 # FUNÇÃO AUXILIAR PARA FORMATAÇÃO
@@ -20,6 +21,30 @@ def formatar_nome_categoria(nome):
     nome = nome.replace('Obesidade iii', 'Obesidade III')
     return nome
 
+def formatar_valor(valor):
+    """Valor de um campo do formulário para exibição (números sem zeros à direita; vazio vira '—')."""
+    if valor is None or valor != valor:
+        return "—"
+    return f"{valor:g}" if isinstance(valor, float) else str(valor)
+
+# Nomes de exibição dos hábitos do simulador
+ROTULOS_HABITOS = {
+    "Atividade Física": "🏃 Atividade física",
+    "FCVC": "🥗 Consumo de vegetais",
+    "Água por dia": "💧 Consumo de água",
+    "Tempo em Telas": "📱 Tempo em telas",
+    "FAVC": "🍔 Alimentos hipercalóricos",
+    "CAEC": "🍿 Alimentação entre refeições",
+    "Transporte": "🚌 Meio de transporte",
+    "Todos os hábitos": "⭐ Todos os hábitos juntos",
+}
+
+NOMES_ESTIMADORES = {
+    "GradientBoostingClassifier": "Gradient Boosting Classifier",
+    "HistGradientBoostingClassifier": "Hist Gradient Boosting Classifier",
+    "LogisticRegression": "Regressão Logística",
+}
+
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
 # ============================================================================
@@ -212,12 +237,23 @@ with st.sidebar:
     
     st.divider()
     
-    st.markdown("""
+    # Nome e acurácia de holdout vêm do metadata.json da versão ativa no registro (se houver)
+    nome_modelo, acuracia_modelo = "Gradient Boosting Classifier", "95%"
+    registro = ModelRegistry("models")
+    versao_ativa = registro.current_version()
+    if versao_ativa:
+        meta_modelo = registro.metadata(versao_ativa)
+        nome_modelo = NOMES_ESTIMADORES.get(meta_modelo.get("estimador"), meta_modelo.get("estimador", nome_modelo))
+        holdout_acc = meta_modelo.get("metricas", {}).get("holdout_acc")
+        if holdout_acc is not None:
+            acuracia_modelo = f"{holdout_acc:.0%}"
+    
+    st.markdown(f"""
     <div style='text-align: center; color: #6c757d; font-size: 0.85rem;'>
         <p><strong>Tech Challenge - Fase 04</strong></p>
         <p>POSTECH - Data Analytics</p>
-        <p>Modelo: Gradient Boosting Classifier</p>
-        <p>Acurácia: 95%</p>
+        <p>Modelo: {nome_modelo}</p>
+        <p>Acurácia: {acuracia_modelo}</p>
     </div>
     """, unsafe_allow_html=True)
 
@@ -225,14 +261,33 @@ with st.sidebar:
 # CARREGAR MODELO
 # ============================================================================
 @st.cache_resource
-def load_model():
+def load_prediction_cache():
+    # Cache compartilhado entre sessões; troca de modelo a quente quando models/CURRENT muda
     try:
-        return joblib.load("obesity_pipeline.pkl")
+        handle = ModelHandle(ModelRegistry("models"), fallback_path="obesity_pipeline.pkl")
+        return PredictionCache(handle, maxsize=2048)
     except FileNotFoundError:
         st.error("⚠️ Modelo não encontrado! Certifique-se de que o arquivo 'obesity_pipeline.pkl' está no diretório correto.")
         st.stop()
 
-model = load_model()
+prediction_cache = load_prediction_cache()
+
+# ============================================================================
+# MÉTRICAS DE LATÊNCIA
+# ============================================================================
+# OBESITY_METRICS_FILE: grava as métricas (formato Prometheus) nesse arquivo a cada predição
+# OBESITY_METRICS_PORT: expõe GET /metrics nessa porta local
+# OBESITY_DEBUG=1 ou ?debug=1 na URL: mostra o painel de depuração na sidebar
+METRICS_FILE = os.environ.get("OBESITY_METRICS_FILE")
+METRICS_PORT = os.environ.get("OBESITY_METRICS_PORT")
+DEBUG = os.environ.get("OBESITY_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
+@st.cache_resource
+def start_metrics_server(port):
+    return REGISTRY.serve(port)
+
+if METRICS_PORT:
+    start_metrics_server(int(METRICS_PORT))
 
 # ============================================================================
 # INTRODUÇÃO E CONTEXTO
@@ -465,39 +520,66 @@ col1, col2, col3 = st.columns([1, 2, 1])
 with col2:
     predict_button = st.button("🔮 Realizar Predição", use_container_width=True)
 
+# Dados de entrada no formato do modelo
+entrada = {
+    "Gênero": genero,
+    "Idade": idade,
+    "Altura": altura,
+    "Peso": peso,
+    "Histórico Familiar": historico_familiar,
+    "FAVC": favc,
+    "FCVC": fcvc,
+    "NCP": ncp,
+    "CAEC": caec,
+    "Fuma": fuma,
+    "Água por dia": ch2o,
+    "Conta Calorias": scc,
+    "Atividade Física": faf,
+    "Tempo em Telas": tue,
+    "Álcool": alcool,
+    "Transporte": transp
+}
+
 if predict_button:
-    # Criar dataframe com os dados de entrada
-    row = pd.DataFrame([{
-        "Gênero": genero,
-        "Idade": idade,
-        "Altura": altura,
-        "Peso": peso,
-        "Histórico Familiar": historico_familiar,
-        "FAVC": favc,
-        "FCVC": fcvc,
-        "NCP": ncp,
-        "CAEC": caec,
-        "Fuma": fuma,
-        "Água por dia": ch2o,
-        "Conta Calorias": scc,
-        "Atividade Física": faf,
-        "Tempo em Telas": tue,
-        "Álcool": alcool,
-        "Transporte": transp
-    }])
-    
-    # Mostrar animação de processamento
+    t_requisicao = time.perf_counter()
     with st.spinner("🔄 Analisando dados e gerando predição..."):
-        import time
-        time.sleep(1)  # Simular processamento
-        
-        # Fazer predição
-        pred = model.predict(row)[0]
-        proba = model.predict_proba(row)[0]
-        classes = model.named_steps["clf"].classes_
+        # Uma versão do modelo por envio: predição, cenários e explicação saem do mesmo modelo
+        modelo_envio = prediction_cache.handle.get()
+        with REGISTRY.timer("predicao"):
+            pred, proba, classes = prediction_cache.predict(entrada, modelo_envio)
+        # Grade "e se...?" dos hábitos pontuada em uma única chamada de predict_proba
+        from what_if import simulate
+        with REGISTRY.timer("simulacao_habitos"):
+            cenarios = simulate(modelo_envio.model, entrada)
+    
+    # Guardar o resultado na sessão para que reruns não refaçam nem percam a predição
+    st.session_state["ultimo_resultado"] = {
+        "entrada": dict(entrada),
+        "pred": pred,
+        "proba": proba,
+        "classes": classes,
+        "cenarios": cenarios,
+        "modelo": modelo_envio,
+    }
+
+resultado = st.session_state.get("ultimo_resultado")
+
+if resultado:
+    # pandas e plotly só são importados quando há um resultado para exibir (cold start)
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
+    pred, proba, classes = resultado["pred"], resultado["proba"], resultado["classes"]
+    entrada_resultado = resultado["entrada"]
+    altura_resultado, peso_resultado = entrada_resultado["Altura"], entrada_resultado["Peso"]
+    imc_resultado = peso_resultado / (altura_resultado ** 2)
     
     st.divider()
     
+    if entrada_resultado != entrada:
+        st.info("ℹ️ Os dados do formulário foram alterados. Clique em **Realizar Predição** para atualizar o resultado.")
+    
     # ============================================================================
     # EXIBIR RESULTADOS
     # ============================================================================
@@ -529,12 +611,12 @@ if predict_button:
     # Card 2: Peso Ideal
     with col_card2:
         # Calcular peso ideal baseado em IMC saudável (18.5 - 24.9)
-        peso_ideal_min = 18.5 * (altura ** 2)
-        peso_ideal_max = 24.9 * (altura ** 2)
+        peso_ideal_min = 18.5 * (altura_resultado ** 2)
+        peso_ideal_max = 24.9 * (altura_resultado ** 2)
         peso_ideal_medio = (peso_ideal_min + peso_ideal_max) / 2
         
         # Determinar cor baseado na diferença do peso atual
-        diferenca_peso = peso - peso_ideal_medio
+        diferenca_peso = peso_resultado - peso_ideal_medio
         
         if abs(diferenca_peso) <= 5:
             cor_peso = "#4caf50"  # Verde - próximo do ideal
@@ -563,33 +645,34 @@ if predict_button:
     with col1:
         st.markdown("### 📊 Distribuição de Probabilidades")
         
-        # Criar dataframe para o gráfico
-        df_proba = pd.DataFrame({
-            "Categoria": [formatar_nome_categoria(c) for c in classes],
-            "Probabilidade": proba * 100
-        }).sort_values("Probabilidade", ascending=True)
-        
-        # Gráfico de barras horizontal
-        fig = px.bar(
-            df_proba,
-            x="Probabilidade",
-            y="Categoria",
-            orientation='h',
-            text=df_proba["Probabilidade"].apply(lambda x: f"{x:.1f}%"),
-            color="Probabilidade",
-            color_continuous_scale="RdYlGn_r",
-            labels={"Probabilidade": "Probabilidade (%)"}
-        )
+        with REGISTRY.timer("grafico_probabilidades"):
+            # Criar dataframe para o gráfico
+            df_proba = pd.DataFrame({
+                "Categoria": [formatar_nome_categoria(c) for c in classes],
+                "Probabilidade": proba * 100
+            }).sort_values("Probabilidade", ascending=True)
         
-        fig.update_traces(textposition='outside')
-        fig.update_layout(
-            showlegend=False,
-            height=400,
-            margin=dict(l=0, r=0, t=0, b=0),
-            xaxis_title="Probabilidade (%)",
-            yaxis_title="",
-            coloraxis_showscale=False
-        )
+            # Gráfico de barras horizontal
+            fig = px.bar(
+                df_proba,
+                x="Probabilidade",
+                y="Categoria",
+                orientation='h',
+                text=df_proba["Probabilidade"].apply(lambda x: f"{x:.1f}%"),
+                color="Probabilidade",
+                color_continuous_scale="RdYlGn_r",
+                labels={"Probabilidade": "Probabilidade (%)"}
+            )
+        
+            fig.update_traces(textposition='outside')
+            fig.update_layout(
+                showlegend=False,
+                height=400,
+                margin=dict(l=0, r=0, t=0, b=0),
+                xaxis_title="Probabilidade (%)",
+                yaxis_title="",
+                coloraxis_showscale=False
+            )
         
         st.plotly_chart(fig, use_container_width=True)
     
@@ -599,36 +682,37 @@ if predict_button:
         # Probabilidade máxima (confiança)
         max_proba = max(proba) * 100
         
-        # Gauge chart para confiança
-        fig_gauge = go.Figure(go.Indicator(
-            mode="gauge+number+delta",
-            value=max_proba,
-            domain={'x': [0, 1], 'y': [0, 1]},
-            title={'text': "Confiança do Modelo", 'font': {'size': 20}},
-            number={'suffix': "%", 'font': {'size': 40}},
-            gauge={
-                'axis': {'range': [None, 100], 'tickwidth': 1, 'tickcolor': "darkblue"},
-                'bar': {'color': cor_resultado},
-                'bgcolor': "white",
-                'borderwidth': 2,
-                'bordercolor': "gray",
-                'steps': [
-                    {'range': [0, 50], 'color': '#ffebee'},
-                    {'range': [50, 75], 'color': '#fff3e0'},
-                    {'range': [75, 100], 'color': '#e8f5e9'}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 75
+        with REGISTRY.timer("grafico_confianca"):
+            # Gauge chart para confiança
+            fig_gauge = go.Figure(go.Indicator(
+                mode="gauge+number+delta",
+                value=max_proba,
+                domain={'x': [0, 1], 'y': [0, 1]},
+                title={'text': "Confiança do Modelo", 'font': {'size': 20}},
+                number={'suffix': "%", 'font': {'size': 40}},
+                gauge={
+                    'axis': {'range': [None, 100], 'tickwidth': 1, 'tickcolor': "darkblue"},
+                    'bar': {'color': cor_resultado},
+                    'bgcolor': "white",
+                    'borderwidth': 2,
+                    'bordercolor': "gray",
+                    'steps': [
+                        {'range': [0, 50], 'color': '#ffebee'},
+                        {'range': [50, 75], 'color': '#fff3e0'},
+                        {'range': [75, 100], 'color': '#e8f5e9'}
+                    ],
+                    'threshold': {
+                        'line': {'color': "red", 'width': 4},
+                        'thickness': 0.75,
+                        'value': 75
+                    }
                 }
-            }
-        ))
+            ))
         
-        fig_gauge.update_layout(
-            height=400,
-            margin=dict(l=20, r=20, t=50, b=20)
-        )
+            fig_gauge.update_layout(
+                height=400,
+                margin=dict(l=20, r=20, t=50, b=20)
+            )
         
         st.plotly_chart(fig_gauge, use_container_width=True)
         
@@ -639,9 +723,113 @@ if predict_button:
             st.warning("⚠️ **Confiança moderada** - Considere avaliação clínica adicional.")
         else:
             st.error("❌ **Baixa confiança** - Recomenda-se avaliação médica detalhada.")
-    
+
+    # ============================================================================
+    # EXPLICAÇÃO DA PREDIÇÃO (CONTRIBUIÇÃO DE CADA CAMPO)
+    # ============================================================================
+    explicacao = prediction_cache.explain(entrada_resultado, resultado["modelo"])
+    if explicacao is not None:
+        st.markdown("### 🔍 Por que esta predição?")
+
+        with REGISTRY.timer("grafico_explicacao"):
+            # Contribuições para a classe prevista, das maiores (em módulo) para as menores
+            contribuicoes = list(explicacao[str(pred)].items())[:8]
+            df_explicacao = pd.DataFrame({
+                "Campo": [
+                    f"{campo} = {entrada_resultado[campo]:g}" if isinstance(entrada_resultado[campo], float)
+                    else f"{campo} = {entrada_resultado[campo]}"
+                    for campo, _ in contribuicoes
+                ],
+                "Contribuição": [valor for _, valor in contribuicoes],
+            }).iloc[::-1]
+            aproxima = f"Aproxima de {formatar_nome_categoria(pred)}"
+            afasta = f"Afasta de {formatar_nome_categoria(pred)}"
+            df_explicacao["Efeito"] = [aproxima if v > 0 else afasta for v in df_explicacao["Contribuição"]]
+
+            fig_explicacao = px.bar(
+                df_explicacao,
+                x="Contribuição",
+                y="Campo",
+                orientation='h',
+                color="Efeito",
+                color_discrete_map={aproxima: "#f44336", afasta: "#2196f3"}
+            )
+            fig_explicacao.update_layout(
+                height=350,
+                margin=dict(l=0, r=0, t=0, b=0),
+                xaxis_title="Contribuição para a classe prevista (log-odds)",
+                yaxis_title="",
+                legend_title_text=""
+            )
+
+        st.plotly_chart(fig_explicacao, use_container_width=True)
+        st.caption(
+            "Contribuição de cada campo do formulário para a pontuação da classe prevista, calculada "
+            "percorrendo as árvores do modelo (método de Saabas). Valores positivos aproximam o paciente "
+            "desta classe; negativos o afastam."
+        )
+
+    # ============================================================================
+    # SIMULADOR DE HÁBITOS (E SE...?)
+    # ============================================================================
+    cenarios = resultado.get("cenarios")
+    ranking_habitos = None
+    if cenarios is not None and len(cenarios):
+        from what_if import rank_habits
+        ranking_habitos = rank_habits(cenarios)
+
+        st.markdown("### 🔮 Simulador: e se o paciente mudar os hábitos?")
+
+        with REGISTRY.timer("grafico_simulacao"):
+            df_simulacao = ranking_habitos.assign(
+                Cenário=[
+                    f"{ROTULOS_HABITOS.get(h, h)}: {formatar_valor(a)} → {formatar_valor(n)}" if n is not None
+                    else ROTULOS_HABITOS.get(h, h)
+                    for h, a, n in zip(ranking_habitos["Hábito"], ranking_habitos["Valor atual"], ranking_habitos["Novo valor"])
+                ]
+            ).iloc[::-1]
+
+            fig_simulacao = px.bar(
+                df_simulacao,
+                x="Impacto",
+                y="Cenário",
+                orientation='h',
+                color="Impacto",
+                color_continuous_scale="RdYlGn",
+                color_continuous_midpoint=0,
+                hover_data={"Classe prevista": True, "ΔP classe atual": ':.1%'}
+            )
+            fig_simulacao.update_layout(
+                height=350,
+                margin=dict(l=0, r=0, t=0, b=0),
+                xaxis_title="Aproximação do Peso Normal (níveis esperados)",
+                yaxis_title="",
+                coloraxis_showscale=False
+            )
+
+        st.plotly_chart(fig_simulacao, use_container_width=True)
+        st.caption(
+            "Cada barra é a melhor mudança daquele hábito, mantendo peso e altura atuais. O impacto é quanto "
+            "a distância esperada até o Peso Normal (em níveis da escala de peso) diminui segundo o modelo."
+        )
+        with st.expander("📋 Ver todos os cenários simulados"):
+            st.dataframe(
+                cenarios.assign(**{
+                    "Hábito": cenarios["Hábito"].map(lambda h: ROTULOS_HABITOS.get(h, h)),
+                    "Classe prevista": cenarios["Classe prevista"].map(formatar_nome_categoria),
+                    "Valor atual": cenarios["Valor atual"].map(formatar_valor),
+                    "Novo valor": cenarios["Novo valor"].map(formatar_valor),
+                }),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "ΔP classe atual": st.column_config.NumberColumn(format="percent"),
+                    "Impacto": st.column_config.NumberColumn(format="%.3f"),
+                }
+            )
+
     st.divider()
-    
+
     # ============================================================================
     # RECOMENDAÇÕES BASEADAS NO RESULTADO
     # ============================================================================
@@ -652,6 +840,16 @@ if predict_button:
     with col1:
         st.markdown("### 🎯 Ações Recomendadas")
         
+        # Hábitos ordenados pelo impacto estimado no simulador (só os que ajudam)
+        if ranking_habitos is not None:
+            prioridades = ranking_habitos[(ranking_habitos["Impacto"] > 0) & ranking_habitos["Novo valor"].notna()].head(3)
+            if len(prioridades):
+                st.markdown("**Prioridades para este paciente (maior impacto estimado):**")
+                st.markdown("\n".join(
+                    f"{i}. {ROTULOS_HABITOS.get(h, h)}: {formatar_valor(a)} → {formatar_valor(n)}"
+                    for i, (h, a, n) in enumerate(zip(prioridades["Hábito"], prioridades["Valor atual"], prioridades["Novo valor"]), 1)
+                ))
+        
         if "Baixo_peso" in pred:
             st.markdown("""
             - 🍽️ Consultar nutricionista para plano alimentar adequado
@@ -690,25 +888,25 @@ if predict_button:
         
         fatores_risco = []
         
-        if imc >= 30:
+        if imc_resultado >= 30:
             fatores_risco.append("🔴 IMC elevado (≥30)")
-        if historico_familiar == "Sim":
+        if entrada_resultado["Histórico Familiar"] == "Sim":
             fatores_risco.append("🟡 Histórico familiar de obesidade")
-        if favc == "Sim":
+        if entrada_resultado["FAVC"] == "Sim":
             fatores_risco.append("🟡 Consumo frequente de alimentos hipercalóricos")
-        if fcvc < 2:
+        if entrada_resultado["FCVC"] < 2:
             fatores_risco.append("🟡 Baixo consumo de vegetais")
-        if faf < 1:
+        if entrada_resultado["Atividade Física"] < 1:
             fatores_risco.append("🔴 Sedentarismo (atividade física insuficiente)")
-        if ch2o < 2:
+        if entrada_resultado["Água por dia"] < 2:
             fatores_risco.append("🟡 Hidratação inadequada")
-        if tue >= 1.5:
+        if entrada_resultado["Tempo em Telas"] >= 1.5:
             fatores_risco.append("🟡 Tempo excessivo em telas")
-        if fuma == "Sim":
+        if entrada_resultado["Fuma"] == "Sim":
             fatores_risco.append("🔴 Tabagismo")
-        if alcool in ["Frequentemente", "Sempre"]:
+        if entrada_resultado["Álcool"] in ["Frequentemente", "Sempre"]:
             fatores_risco.append("🟠 Consumo frequente de álcool")
-        if transp == "Automóvel":
+        if entrada_resultado["Transporte"] == "Automóvel":
             fatores_risco.append("🟡 Baixa atividade física no transporte")
         
         if fatores_risco:
@@ -723,14 +921,15 @@ if predict_button:
     # TABELA DETALHADA DE PROBABILIDADES
     # ============================================================================
     with st.expander("📈 Ver Tabela Detalhada de Probabilidades"):
-        df_detailed = pd.DataFrame({
-            "Categoria": [formatar_nome_categoria(c) for c in classes],
-            "Probabilidade (%)": [f"{p*100:.2f}%" for p in proba],
-            "Valor Numérico": proba
-        }).sort_values("Valor Numérico", ascending=False).reset_index(drop=True)
+        with REGISTRY.timer("tabela_detalhada"):
+            df_detailed = pd.DataFrame({
+                "Categoria": [formatar_nome_categoria(c) for c in classes],
+                "Probabilidade (%)": [f"{p*100:.2f}%" for p in proba],
+                "Valor Numérico": proba
+            }).sort_values("Valor Numérico", ascending=False).reset_index(drop=True)
         
-        df_detailed.index = df_detailed.index + 1
-        df_detailed = df_detailed.drop(columns=["Valor Numérico"])
+            df_detailed.index = df_detailed.index + 1
+            df_detailed = df_detailed.drop(columns=["Valor Numérico"])
         
         st.dataframe(
             df_detailed,
@@ -738,6 +937,117 @@ if predict_button:
             hide_index=False
         )
 
+# ============================================================================
+# PREDIÇÃO EM LOTE (PLANILHA)
+# ============================================================================
+# Abaixo desta confiança (probabilidade da classe prevista) o paciente vai para revisão
+LIMIAR_BAIXA_CONFIANCA = 0.60
+# Linhas por bloco na pontuação da planilha (a barra de progresso avança a cada bloco)
+TAMANHO_BLOCO_LOTE = 2_000
+
+@st.fragment
+def secao_lote():
+    """Pontuação de uma planilha inteira; interações aqui reexecutam só esta seção."""
+    st.divider()
+    st.markdown("## 📂 Predição em Lote")
+    st.caption(
+        "Envie uma planilha CSV ou XLSX com as 16 colunas do formulário (nomes em PT-BR, como no "
+        "formulário, ou os nomes originais do Obesity.csv). Cada linha é um paciente."
+    )
+    arquivo = st.file_uploader("Planilha de pacientes", type=["csv", "xlsx"])
+    if arquivo is None:
+        return
+
+    import pandas as pd
+    import plotly.express as px
+    from batch_scoring import read_table, score_frame
+    from schema import to_pt_features, validate_frame
+
+    modelo = prediction_cache.handle.get()
+    chave_lote = (arquivo.file_id, modelo.sha256)
+    if st.session_state.get("lote_chave") != chave_lote:
+        # Leitura e validação: colunas ausentes barram o arquivo; linhas inválidas só ficam de fora
+        try:
+            with REGISTRY.timer("lote_leitura"):
+                planilha = read_table(arquivo, arquivo.name)
+                X = to_pt_features(planilha)
+        except (ValueError, SystemExit) as exc:
+            st.error(f"⚠️ Não foi possível ler a planilha: {exc}")
+            return
+        erros = validate_frame(X)
+        validas = erros == ""
+
+        if validas.any():
+            barra = st.progress(0.0, text="🔄 Pontuando pacientes...")
+            with REGISTRY.timer("lote_predicao"):
+                pontuado = score_frame(
+                    X[validas], modelo.model, TAMANHO_BLOCO_LOTE,
+                    on_progress=lambda feitas, total: barra.progress(feitas / total, text=f"🔄 {feitas} de {total} pacientes pontuados")
+                )
+            barra.empty()
+        else:
+            pontuado = score_frame(X[validas], modelo.model)  # nenhuma linha válida: só as colunas do resultado
+
+        colunas_prob = [c for c in pontuado.columns if c.startswith("Prob_")]
+        pontuado.insert(1, "Confiança", pontuado[colunas_prob].max(axis=1))
+        resultado_lote = pd.concat([planilha, pontuado.reindex(planilha.index)], axis=1)
+        resultado_lote["Erros"] = erros
+        st.session_state["lote_chave"] = chave_lote
+        st.session_state["lote_resultado"] = resultado_lote
+
+    resultado_lote = st.session_state["lote_resultado"]
+    pontuados = resultado_lote[resultado_lote["Erros"] == ""]
+    invalidos = resultado_lote[resultado_lote["Erros"] != ""]
+    baixa_confianca = pontuados[pontuados["Confiança"] < LIMIAR_BAIXA_CONFIANCA]
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Pacientes pontuados", len(pontuados))
+    with col2:
+        st.metric("Linhas inválidas", len(invalidos))
+    with col3:
+        st.metric(f"Baixa confiança (< {LIMIAR_BAIXA_CONFIANCA:.0%})", len(baixa_confianca))
+
+    if len(invalidos):
+        with st.expander(f"⚠️ {len(invalidos)} linha(s) com erro de validação (não pontuadas)"):
+            st.dataframe(invalidos[["Erros"]], use_container_width=True)
+
+    if len(pontuados):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("### 📊 Distribuição das Predições")
+            distribuicao = pontuados["Predição"].value_counts()
+            df_distribuicao = pd.DataFrame({
+                "Categoria": [formatar_nome_categoria(c) for c in distribuicao.index],
+                "Pacientes": distribuicao.to_numpy()
+            })
+            fig_lote = px.bar(df_distribuicao, x="Pacientes", y="Categoria", orientation='h', text="Pacientes")
+            fig_lote.update_layout(height=400, margin=dict(l=0, r=0, t=0, b=0), yaxis_title="")
+            st.plotly_chart(fig_lote, use_container_width=True)
+
+        with col2:
+            st.markdown("### 🔍 Casos de Baixa Confiança")
+            if len(baixa_confianca):
+                st.caption("Pacientes com predição incerta: recomenda-se avaliação clínica individual.")
+                st.dataframe(
+                    baixa_confianca[["Predição", "Confiança"]].sort_values("Confiança"),
+                    use_container_width=True,
+                    column_config={"Confiança": st.column_config.ProgressColumn(format="percent", min_value=0, max_value=1)}
+                )
+            else:
+                st.success("✅ Todas as predições estão acima do limiar de confiança.")
+
+    st.download_button(
+        "⬇️ Baixar resultados (CSV)",
+        data=lambda: resultado_lote.to_csv(index=False).encode("utf-8"),
+        file_name=f"predicoes_{arquivo.name.rsplit('.', 1)[0]}.csv",
+        mime="text/csv",
+        use_container_width=True
+    )
+
+secao_lote()
+
 # ============================================================================
 # FOOTER
 # ============================================================================
@@ -751,3 +1061,30 @@ st.markdown("""
     </p>
 </div>
 """, unsafe_allow_html=True)
+
+# ============================================================================
+# EXPORTAÇÃO DE MÉTRICAS E PAINEL DE DEPURAÇÃO
+# ============================================================================
+if predict_button:
+    REGISTRY.observe("requisicao_total", time.perf_counter() - t_requisicao)
+
+cache_stats = prediction_cache.stats()
+REGISTRY.set_gauge("prediction_cache_hits", cache_stats["hits"], "Acertos do cache de predições.")
+REGISTRY.set_gauge("prediction_cache_misses", cache_stats["misses"], "Faltas do cache de predições.")
+REGISTRY.set_gauge("prediction_cache_size", cache_stats["tamanho"], "Entradas no cache de predições.")
+
+if METRICS_FILE and predict_button:
+    REGISTRY.write_textfile(METRICS_FILE)
+
+if DEBUG:
+    import pandas as pd
+    with st.sidebar.expander("🛠️ Depuração: latência por fase", expanded=True):
+        resumo = REGISTRY.summary()
+        if resumo:
+            st.dataframe(pd.DataFrame(resumo).round(2), hide_index=True)
+        else:
+            st.caption("Nenhuma fase medida ainda.")
+        st.json(cache_stats)
+        modelo_ativo = prediction_cache.handle.loaded
+        if modelo_ativo is not None:
+            st.caption(f"Modelo ativo: {modelo_ativo.version} ({modelo_ativo.sha256[:12]})")
@@ -1,8 +1,11 @@
+import os
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
+
+# leve: só constantes no topo (pandas e o dataset são importados sob demanda, depois do cabeçalho)
+from dashboard_data import (
+    COLUNAS_CATEGORICAS, COLUNAS_NUMERICAS, NIVEIS_OBESIDADE,
+    cube_from_frame, cube_from_parquet, load_dashboard_frame, row_index,
+)
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -103,40 +106,291 @@ st.markdown("""
 # FUNÇÕES DE PRÉ-PROCESSAMENTO E CARREGAMENTO
 # ============================================================================
 
+# Linhas exibidas na tabela de registros filtrados (o download leva todas)
+LIMITE_TABELA = 500
+
+# Dataset Parquet particionado (diretório ou glob) no lugar do Obesity.csv; agregado pelo DuckDB
+FONTE_PARQUET = os.environ.get("OBESITY_PARQUET")
+
 @st.cache_data
-def load_data():
-    df = pd.read_csv('Obesity.csv')
-    
-    # Renomear colunas
-    df.columns = ['Gender', 'Age', 'Height', 'Weight', 'Family_History_with_Overweight',
-                  'FAVC', 'FCVC', 'NCP', 'CAEC', 'SMOKE', 'CH2O', 'SNC', 'FAF',
-                  'TUE', 'CALC', 'MTRANS', 'NObeyesdad']
-    
-    # Mapear níveis de obesidade
-    obesity_map = {
-        'Insufficient_Weight': 'Baixo Peso',
-        'Normal_Weight': 'Peso Normal',
-        'Overweight_Level_I': 'Sobrepeso I',
-        'Overweight_Level_II': 'Sobrepeso II',
-        'Obesity_Type_I': 'Obesidade I',
-        'Obesity_Type_II': 'Obesidade II',
-        'Obesity_Type_III': 'Obesidade III'
-    }
-    df['NObeyesdad_PT'] = df['NObeyesdad'].replace(obesity_map)
+def load_data(fingerprint, fonte=None):
+    """Dataset compacto do painel (dashboard_data.py), a partir do cache colunar compartilhado.
+
+    `fingerprint` (impressão digital do CSV ou do Parquet) é a chave do cache:
+    quando os dados mudam, o Streamlit recarrega.
+    """
+    return load_dashboard_frame(fonte)
+
+@st.cache_resource
+def load_cube(fingerprint, fonte=None):
+    """Cubo pré-agregado (gênero, faixa de idade, histórico familiar, nível) do dataset,
+    com esboços de quantis para os box plots.
+
+    Com `fonte` Parquet, as agregações rodam no DuckDB sem carregar as linhas;
+    sem DuckDB instalado (ou sem `fonte`), o cubo sai do DataFrame em memória.
+    Somente leitura: compartilhado entre sessões sem cópia por rerun.
+    """
+    if fonte:
+        try:
+            return cube_from_parquet(fonte)
+        except ImportError:
+            pass
+    return cube_from_frame(load_data(fingerprint, fonte))
+
+@st.cache_resource
+def load_rows(fingerprint):
+    """DataFrame do painel com o índice de filtros (bitmaps por categoria e idades ordenadas).
+
+    Usado só pela tabela de registros filtrados: um filtro vira um vetor de
+    índices de linha, sem máscaras em colunas inteiras nem cópia do DataFrame
+    a cada rerun. Somente leitura, compartilhado entre sessões.
+    """
+    df = load_data(fingerprint)
+    return df, row_index(df)
+
+# ============================================================================
+# FIGURAS (construção memoizada)
+# ============================================================================
+
+# Cores dos níveis de peso
+CORES_NIVEL = {
+    'Baixo Peso': '#2196f3',
+    'Peso Normal': '#4caf50',
+    'Sobrepeso I': '#ffc107',
+    'Sobrepeso II': '#ff9800',
+    'Obesidade I': '#ff5722',
+    'Obesidade II': '#f44336',
+    'Obesidade III': '#b71c1c'
+}
+ROTULOS_CORRELACAO = ['Idade', 'Altura', 'Peso', 'IMC', 'Consumo Vegetais', 'Nº Refeições', 'Consumo Água', 'Atividade Física', 'Tempo em Telas']
+
+# Figuras guardadas no cache (as menos usadas saem primeiro)
+TAMANHO_CACHE_FIGURAS = 128
+
+@st.cache_resource(max_entries=TAMANHO_CACHE_FIGURAS)
+def figura(grafico, filtros, fingerprint, _construir):
+    """Figura Plotly memoizada por (gráfico, estado dos filtros, impressão digital dos dados).
+
+    Um estado de filtro já visto, nesta ou em outra sessão, não reconstrói a
+    figura. `_construir` fica fora da chave (prefixo `_`). Somente leitura:
+    `st.plotly_chart` só serializa a figura.
+    """
+    return _construir()
+
+def criar_box_plot(estatisticas, titulo, eixo_y, color_map):
+    """Box plot com quartis/whiskers já calculados (um traço por nível) e os outliers amostrados."""
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    for nivel, e in estatisticas.items():
+        fig.add_trace(go.Box(
+            x=[nivel], q1=[e['q1']], median=[e['median']], q3=[e['q3']],
+            lowerfence=[e['lowerfence']], upperfence=[e['upperfence']],
+            name=nivel, marker_color=color_map.get(nivel)
+        ))
+        if len(e['outliers']):
+            fig.add_trace(go.Scatter(
+                x=[nivel] * len(e['outliers']), y=e['outliers'], mode='markers',
+                marker=dict(color=color_map.get(nivel), size=5), name=nivel, hoverinfo='y'
+            ))
+    fig.update_layout(
+        template="plotly_dark",
+        title=titulo,
+        showlegend=False,
+        xaxis_title=None,
+        yaxis_title=eixo_y,
+        xaxis={'tickangle': -45}
+    )
+    return fig
+
+def criar_distribuicao(selecao):
+    """Barras horizontais com a contagem de pacientes por nível de peso."""
+    import plotly.express as px
+    # Contagens do cubo, já na ordem dos níveis
+    df_dist = selecao.counts_by_class().reset_index()
+    df_dist.columns = ['Nível de Peso', 'Contagem']
+    
+    fig_dist = px.bar(
+        df_dist, 
+        y='Nível de Peso', 
+        x='Contagem', 
+        orientation='h',
+        color='Nível de Peso',
+        color_discrete_map=CORES_NIVEL,
+        template="plotly_dark",
+        title="Contagem de Pacientes por Nível de Peso"
+    )
+    fig_dist.update_layout(showlegend=False, yaxis_title=None, xaxis_title="Número de Pacientes")
+    return fig_dist
+
+def criar_historico(selecao):
+    """Pizza da proporção de obesidade (I, II, III) por histórico familiar."""
+    import plotly.express as px
+    df_hist_sum = selecao.share_by_family(NIVEIS_OBESIDADE).reset_index()
+    df_hist_sum.columns = ['Histórico Familiar', 'Percentual']
+    
+    fig_hist = px.pie(
+        df_hist_sum,
+        values='Percentual',
+        names='Histórico Familiar',
+        title='Proporção de Obesidade (I, II, III) por Histórico Familiar',
+        color_discrete_sequence=px.colors.sequential.RdBu
+    )
+    fig_hist.update_traces(textinfo='percent+label')
+    fig_hist.update_layout(showlegend=False, template="plotly_dark")
+    return fig_hist
+
+def criar_media_por_nivel(selecao, coluna, rotulo, titulo, eixo_y):
+    """Barras com a média de `coluna` por nível de peso."""
+    import plotly.express as px
+    df_media = selecao.mean_by_class(coluna).reset_index()
+    df_media.columns = ['Nível de Peso', rotulo]
+    
+    fig = px.bar(
+        df_media,
+        x='Nível de Peso',
+        y=rotulo,
+        color=rotulo,
+        template="plotly_dark",
+        title=titulo
+    )
+    fig.update_layout(xaxis_title=None, yaxis_title=eixo_y, showlegend=False)
+    return fig
+
+def criar_correlacao(selecao):
+    """Mapa de calor da correlação das variáveis numéricas (COLUNAS_CUBO) a partir das somas do cubo."""
+    import numpy as np
+    import plotly.graph_objects as go
+    df_corr = selecao.corr()
+    
+    fig_heatmap = go.Figure(data=go.Heatmap(
+        z=df_corr.values,
+        x=ROTULOS_CORRELACAO,
+        y=ROTULOS_CORRELACAO,
+        colorscale='RdBu_r',
+        zmid=0,
+        text=np.round(df_corr.values, 2),
+        texttemplate='%{text}',
+        textfont={"size": 10},
+        colorbar=dict(title="Correlação")
+    ))
+    
+    fig_heatmap.update_layout(
+        title="Matriz de Correlação entre Variáveis Numéricas",
+        template="plotly_dark",
+        height=600,
+        xaxis_title=None,
+        yaxis_title=None
+    )
+    return fig_heatmap
+
+# ============================================================================
+# SEÇÕES DO PAINEL (só as que têm widgets próprios são fragmentos)
+# ============================================================================
+
+def secao_kpis(selecao):
+    st.markdown("### 🔑 Métricas Chave")
     
-    # Criar coluna de IMC
-    df['IMC'] = df['Weight'] / (df['Height'] ** 2)
+    total_pacientes = selecao.total
+    perc_obesidade = selecao.share(NIVEIS_OBESIDADE)
+    media_imc = selecao.mean('IMC')
+    media_idade = selecao.mean('Idade')
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(label="Total de Pacientes", value=total_pacientes)
+    with col2:
+        st.metric(label="Média de Idade", value=f"{media_idade:.1f} anos")
+    with col3:
+        st.metric(label="Média de IMC", value=f"{media_imc:.2f}")
+    with col4:
+        st.metric(label="% Obesidade (Tipo I, II, III)", value=f"{perc_obesidade*100:.1f}%")
+
+def secao_distribuicao(selecao, filtros, chave):
+    col_dist, col_risco = st.columns([1.5, 1])
+    
+    # Gráfico 1: Distribuição dos Níveis de Obesidade
+    with col_dist:
+        st.markdown("### 📊 Distribuição dos Níveis de Peso")
+        fig_dist = figura('distribuicao', filtros, chave, lambda: criar_distribuicao(selecao))
+        st.plotly_chart(fig_dist, use_container_width=True)
+
+    # Gráfico 2: Histórico Familiar
+    with col_risco:
+        st.markdown("### 🧬 Relação: Histórico Familiar")
+        fig_hist = figura('historico', filtros, chave, lambda: criar_historico(selecao))
+        st.plotly_chart(fig_hist, use_container_width=True)
+
+def secao_habitos(selecao, filtros, chave):
+    st.markdown("### 🥗 Hábitos e Estilo de Vida")
+    
+    col_habito1, col_habito2 = st.columns(2)
+    
+    # Gráfico 3: Consumo de Água
+    with col_habito1:
+        st.markdown("#### Média de Consumo de Água (CH2O)")
+        fig_ch2o = figura('agua', filtros, chave, lambda: criar_media_por_nivel(
+            selecao, 'Água por dia', 'Média de CH2O',
+            "Média de Consumo de Água (Escala 1-3) por Nível de Peso", "Média de Consumo"))
+        st.plotly_chart(fig_ch2o, use_container_width=True)
+
+    # Gráfico 4: Atividade Física
+    with col_habito2:
+        st.markdown("#### Média de Atividade Física (FAF)")
+        fig_faf = figura('atividade', filtros, chave, lambda: criar_media_por_nivel(
+            selecao, 'Atividade Física', 'Média de FAF',
+            "Média de Atividade Física (Escala 0-3) por Nível de Peso", "Média de FAF"))
+        st.plotly_chart(fig_faf, use_container_width=True)
+
+def secao_analises(selecao, filtros, chave):
+    st.markdown("### 🔬 Análises Aprofundadas")
+    
+    # Heatmap de Correlação
+    st.markdown("#### 🌡️ Mapa de Calor: Correlação entre Variáveis")
+    fig_heatmap = figura('correlacao', filtros, chave, lambda: criar_correlacao(selecao))
+    st.plotly_chart(fig_heatmap, use_container_width=True)
+    
+    st.markdown("---")
+    
+    # Box Plots
+    st.markdown("#### 📦 Distribuição de Variáveis por Nível de Obesidade")
+    
+    col_box1, col_box2, col_box3 = st.columns(3)
+    
+    # Quartis, whiskers e outliers vêm dos esboços do cubo: nenhuma linha vai para o navegador
+    with col_box1:
+        fig_box_imc = figura('box_imc', filtros, chave, lambda: criar_box_plot(
+            selecao.box_stats('IMC'), "Distribuição de IMC", "IMC", CORES_NIVEL))
+        st.plotly_chart(fig_box_imc, use_container_width=True)
     
-    # Traduzir colunas categóricas
-    df['Gender_PT'] = df['Gender'].replace({'Male': 'Masculino', 'Female': 'Feminino'})
-    df['Family_History_with_Overweight_PT'] = df['Family_History_with_Overweight'].replace({'yes': 'Sim', 'no': 'Não'})
-    df['SMOKE_PT'] = df['SMOKE'].replace({'yes': 'Sim', 'no': 'Não'})
-    df['CAEC_PT'] = df['CAEC'].replace({'Sometimes': 'Às vezes', 'Frequently': 'Frequentemente', 'Always': 'Sempre', 'no': 'Não'})
-    df['CALC_PT'] = df['CALC'].replace({'Sometimes': 'Às vezes', 'Frequently': 'Frequentemente', 'Always': 'Sempre', 'no': 'Não'})
+    with col_box2:
+        fig_box_age = figura('box_idade', filtros, chave, lambda: criar_box_plot(
+            selecao.box_stats('Idade'), "Distribuição de Idade", "Idade (anos)", CORES_NIVEL))
+        st.plotly_chart(fig_box_age, use_container_width=True)
     
-    return df
+    with col_box3:
+        fig_box_faf = figura('box_atividade', filtros, chave, lambda: criar_box_plot(
+            selecao.box_stats('Atividade Física'), "Distribuição de Atividade Física", "Frequência (0-3)", CORES_NIVEL))
+        st.plotly_chart(fig_box_faf, use_container_width=True)
 
-df = load_data()
+@st.fragment
+def secao_registros(filtros, chave):
+    # Linhas só com o dataset em memória (no backend Parquet/DuckDB ficam fora do processo)
+    if FONTE_PARQUET or not st.toggle("📋 Ver registros filtrados"):
+        return
+    generos, idade_range, historicos = filtros
+    df, indice = load_rows(chave)
+    linhas = indice.select({'Gênero': generos, 'Histórico Familiar': historicos}, idade_range)
+    colunas = COLUNAS_CATEGORICAS + COLUNAS_NUMERICAS + ['IMC']
+    st.dataframe(df.iloc[linhas[:LIMITE_TABELA]][colunas], use_container_width=True, hide_index=True)
+    if len(linhas) > LIMITE_TABELA:
+        st.caption(f"Exibindo {LIMITE_TABELA} de {len(linhas)} registros; o CSV contém todos.")
+    st.download_button(
+        "⬇️ Baixar registros filtrados (CSV)",
+        data=lambda: df.iloc[linhas][colunas].to_csv(index=False).encode('utf-8'),
+        file_name="registros_filtrados.csv",
+        mime="text/csv"
+    )
 
 # ============================================================================
 # FUNÇÃO PRINCIPAL DO DASHBOARD
@@ -152,6 +406,14 @@ def create_dashboard():
     </div>
     """, unsafe_allow_html=True)
     
+    from dataset import fingerprint, parquet_fingerprint
+    if FONTE_PARQUET:
+        chave = parquet_fingerprint(FONTE_PARQUET)
+        cube = load_cube(chave, FONTE_PARQUET)
+    else:
+        chave = fingerprint()
+        cube = load_cube(chave)
+    
     # ============================================================================
     # SIDEBAR - FILTROS
     # ============================================================================
@@ -162,12 +424,12 @@ def create_dashboard():
         # Filtro de Gênero
         genero_filtro = st.multiselect(
             "Gênero",
-            options=df['Gender_PT'].unique(),
-            default=df['Gender_PT'].unique()
+            options=list(cube.genders),
+            default=list(cube.genders)
         )
         
         # Filtro de Idade
-        min_age, max_age = int(df['Age'].min()), int(df['Age'].max())
+        min_age, max_age = cube.age_lo, cube.age_hi
         idade_range = st.slider(
             "Faixa Etária",
             min_value=min_age,
@@ -178,269 +440,55 @@ def create_dashboard():
         # Filtro de Histórico Familiar
         hist_familiar_filtro = st.multiselect(
             "Histórico Familiar de Obesidade",
-            options=df['Family_History_with_Overweight_PT'].unique(),
-            default=df['Family_History_with_Overweight_PT'].unique()
+            options=list(cube.families),
+            default=list(cube.families)
         )
         
-        # Aplicar filtros
-        df_filtered = df[
-            (df['Gender_PT'].isin(genero_filtro)) &
-            (df['Age'] >= idade_range[0]) &
-            (df['Age'] <= idade_range[1]) &
-            (df['Family_History_with_Overweight_PT'].isin(hist_familiar_filtro))
-        ]
+        # Aplicar filtros: soma das células do cubo, sem varrer as linhas
+        selecao = cube.select(genero_filtro, idade_range, hist_familiar_filtro)
         
-        st.info(f"Dados Filtrados: {len(df_filtered)} registros")
+        st.info(f"Dados Filtrados: {selecao.total} registros")
 
     # Validação de dados
-    if df_filtered.empty:
+    if selecao.total == 0:
         st.warning("Nenhum dado encontrado com os filtros selecionados.")
         return
 
-    # Ordem das categorias
-    order = ['Baixo Peso', 'Peso Normal', 'Sobrepeso I', 'Sobrepeso II', 'Obesidade I', 'Obesidade II', 'Obesidade III']
-    
-    # Mapa de cores
-    color_map = {
-        'Baixo Peso': '#2196f3',
-        'Peso Normal': '#4caf50',
-        'Sobrepeso I': '#ffc107',
-        'Sobrepeso II': '#ff9800',
-        'Obesidade I': '#ff5722',
-        'Obesidade II': '#f44336',
-        'Obesidade III': '#b71c1c'
-    }
+    # Estado dos filtros (ordem de seleção irrelevante): parte da chave do cache de figuras
+    filtros = (tuple(sorted(genero_filtro)), tuple(idade_range), tuple(sorted(hist_familiar_filtro)))
 
     # ============================================================================
     # MÉTRICAS CHAVE (KPIs)
     # ============================================================================
-    st.markdown("### 🔑 Métricas Chave")
-    
-    total_pacientes = len(df_filtered)
-    perc_obesidade = df_filtered[df_filtered['NObeyesdad'].str.contains('Obesity')].shape[0] / total_pacientes
-    media_imc = df_filtered['IMC'].mean()
-    media_idade = df_filtered['Age'].mean()
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric(label="Total de Pacientes", value=total_pacientes)
-    with col2:
-        st.metric(label="Média de Idade", value=f"{media_idade:.1f} anos")
-    with col3:
-        st.metric(label="Média de IMC", value=f"{media_imc:.2f}")
-    with col4:
-        st.metric(label="% Obesidade (Tipo I, II, III)", value=f"{perc_obesidade*100:.1f}%")
+    secao_kpis(selecao)
 
     st.markdown("---")
 
     # ============================================================================
     # DISTRIBUIÇÃO E FATORES DE RISCO
     # ============================================================================
-    col_dist, col_risco = st.columns([1.5, 1])
-    
-    # Gráfico 1: Distribuição dos Níveis de Obesidade
-    with col_dist:
-        st.markdown("### 📊 Distribuição dos Níveis de Peso")
-        
-        df_dist = df_filtered['NObeyesdad_PT'].value_counts().reset_index()
-        df_dist.columns = ['Nível de Peso', 'Contagem']
-        df_dist['Nível de Peso'] = pd.Categorical(df_dist['Nível de Peso'], categories=order, ordered=True)
-        df_dist = df_dist.sort_values('Nível de Peso')
-        
-        fig_dist = px.bar(
-            df_dist, 
-            y='Nível de Peso', 
-            x='Contagem', 
-            orientation='h',
-            color='Nível de Peso',
-            color_discrete_map=color_map,
-            template="plotly_dark",
-            title="Contagem de Pacientes por Nível de Peso"
-        )
-        fig_dist.update_layout(showlegend=False, yaxis_title=None, xaxis_title="Número de Pacientes")
-        st.plotly_chart(fig_dist, use_container_width=True)
-
-    # Gráfico 2: Histórico Familiar
-    with col_risco:
-        st.markdown("### 🧬 Relação: Histórico Familiar")
-        
-        df_hist = df_filtered.groupby('Family_History_with_Overweight_PT')['NObeyesdad'].value_counts(normalize=True).mul(100).rename('Percentual').reset_index()
-        df_hist_obesity = df_hist[df_hist['NObeyesdad'].str.contains('Obesity')]
-        df_hist_sum = df_hist_obesity.groupby('Family_History_with_Overweight_PT')['Percentual'].sum().reset_index()
-        
-        fig_hist = px.pie(
-            df_hist_sum,
-            values='Percentual',
-            names='Family_History_with_Overweight_PT',
-            title='Proporção de Obesidade (I, II, III) por Histórico Familiar',
-            color_discrete_sequence=px.colors.sequential.RdBu
-        )
-        fig_hist.update_traces(textinfo='percent+label')
-        fig_hist.update_layout(showlegend=False, template="plotly_dark")
-        st.plotly_chart(fig_hist, use_container_width=True)
+    secao_distribuicao(selecao, filtros, chave)
 
     st.markdown("---")
 
     # ============================================================================
     # HÁBITOS ALIMENTARES E ESTILO DE VIDA
     # ============================================================================
-    st.markdown("### 🥗 Hábitos e Estilo de Vida")
-    
-    col_habito1, col_habito2 = st.columns(2)
-    
-    # Gráfico 3: Consumo de Água
-    with col_habito1:
-        st.markdown("#### Média de Consumo de Água (CH2O)")
-        
-        df_ch2o = df_filtered.groupby('NObeyesdad_PT')['CH2O'].mean().reset_index()
-        df_ch2o.columns = ['Nível de Peso', 'Média de CH2O']
-        df_ch2o['Nível de Peso'] = pd.Categorical(df_ch2o['Nível de Peso'], categories=order, ordered=True)
-        df_ch2o = df_ch2o.sort_values('Nível de Peso')
-        
-        fig_ch2o = px.bar(
-            df_ch2o,
-            x='Nível de Peso',
-            y='Média de CH2O',
-            color='Média de CH2O',
-            template="plotly_dark",
-            title="Média de Consumo de Água (Escala 1-3) por Nível de Peso"
-        )
-        fig_ch2o.update_layout(xaxis_title=None, yaxis_title="Média de Consumo", showlegend=False)
-        st.plotly_chart(fig_ch2o, use_container_width=True)
-
-    # Gráfico 4: Atividade Física
-    with col_habito2:
-        st.markdown("#### Média de Atividade Física (FAF)")
-        
-        df_faf = df_filtered.groupby('NObeyesdad_PT')['FAF'].mean().reset_index()
-        df_faf.columns = ['Nível de Peso', 'Média de FAF']
-        df_faf['Nível de Peso'] = pd.Categorical(df_faf['Nível de Peso'], categories=order, ordered=True)
-        df_faf = df_faf.sort_values('Nível de Peso')
-        
-        fig_faf = px.bar(
-            df_faf,
-            x='Nível de Peso',
-            y='Média de FAF',
-            color='Média de FAF',
-            template="plotly_dark",
-            title="Média de Atividade Física (Escala 0-3) por Nível de Peso"
-        )
-        fig_faf.update_layout(xaxis_title=None, yaxis_title="Média de FAF", showlegend=False)
-        st.plotly_chart(fig_faf, use_container_width=True)
+    secao_habitos(selecao, filtros, chave)
         
     st.markdown("---")
     
     # ============================================================================
     # NOVA SEÇÃO: ANÁLISES APROFUNDADAS
     # ============================================================================
-    st.markdown("### 🔬 Análises Aprofundadas")
-    
-    # Heatmap de Correlação
-    st.markdown("#### 🌡️ Mapa de Calor: Correlação entre Variáveis")
-    
-    # Selecionar variáveis numéricas relevantes
-    numeric_cols = ['Age', 'Height', 'Weight', 'IMC', 'FCVC', 'NCP', 'CH2O', 'FAF', 'TUE']
-    df_corr = df_filtered[numeric_cols].corr()
-    
-    # Criar heatmap
-    fig_heatmap = go.Figure(data=go.Heatmap(
-        z=df_corr.values,
-        x=['Idade', 'Altura', 'Peso', 'IMC', 'Consumo Vegetais', 'Nº Refeições', 'Consumo Água', 'Atividade Física', 'Tempo em Telas'],
-        y=['Idade', 'Altura', 'Peso', 'IMC', 'Consumo Vegetais', 'Nº Refeições', 'Consumo Água', 'Atividade Física', 'Tempo em Telas'],
-        colorscale='RdBu_r',
-        zmid=0,
-        text=np.round(df_corr.values, 2),
-        texttemplate='%{text}',
-        textfont={"size": 10},
-        colorbar=dict(title="Correlação")
-    ))
-    
-    fig_heatmap.update_layout(
-        title="Matriz de Correlação entre Variáveis Numéricas",
-        template="plotly_dark",
-        height=600,
-        xaxis_title=None,
-        yaxis_title=None
-    )
-    
-    st.plotly_chart(fig_heatmap, use_container_width=True)
+    secao_analises(selecao, filtros, chave)
     
     st.markdown("---")
     
-    # Box Plots
-    st.markdown("#### 📦 Distribuição de Variáveis por Nível de Obesidade")
-    
-    col_box1, col_box2, col_box3 = st.columns(3)
-    
-    # Box Plot 1: IMC
-    with col_box1:
-        df_box_imc = df_filtered.copy()
-        df_box_imc['NObeyesdad_PT'] = pd.Categorical(df_box_imc['NObeyesdad_PT'], categories=order, ordered=True)
-        df_box_imc = df_box_imc.sort_values('NObeyesdad_PT')
-        
-        fig_box_imc = px.box(
-            df_box_imc,
-            x='NObeyesdad_PT',
-            y='IMC',
-            color='NObeyesdad_PT',
-            color_discrete_map=color_map,
-            template="plotly_dark",
-            title="Distribuição de IMC"
-        )
-        fig_box_imc.update_layout(
-            showlegend=False,
-            xaxis_title=None,
-            yaxis_title="IMC",
-            xaxis={'tickangle': -45}
-        )
-        st.plotly_chart(fig_box_imc, use_container_width=True)
-    
-    # Box Plot 2: Idade
-    with col_box2:
-        df_box_age = df_filtered.copy()
-        df_box_age['NObeyesdad_PT'] = pd.Categorical(df_box_age['NObeyesdad_PT'], categories=order, ordered=True)
-        df_box_age = df_box_age.sort_values('NObeyesdad_PT')
-        
-        fig_box_age = px.box(
-            df_box_age,
-            x='NObeyesdad_PT',
-            y='Age',
-            color='NObeyesdad_PT',
-            color_discrete_map=color_map,
-            template="plotly_dark",
-            title="Distribuição de Idade"
-        )
-        fig_box_age.update_layout(
-            showlegend=False,
-            xaxis_title=None,
-            yaxis_title="Idade (anos)",
-            xaxis={'tickangle': -45}
-        )
-        st.plotly_chart(fig_box_age, use_container_width=True)
-    
-    # Box Plot 3: Atividade Física
-    with col_box3:
-        df_box_faf = df_filtered.copy()
-        df_box_faf['NObeyesdad_PT'] = pd.Categorical(df_box_faf['NObeyesdad_PT'], categories=order, ordered=True)
-        df_box_faf = df_box_faf.sort_values('NObeyesdad_PT')
-        
-        fig_box_faf = px.box(
-            df_box_faf,
-            x='NObeyesdad_PT',
-            y='FAF',
-            color='NObeyesdad_PT',
-            color_discrete_map=color_map,
-            template="plotly_dark",
-            title="Distribuição de Atividade Física"
-        )
-        fig_box_faf.update_layout(
-            showlegend=False,
-            xaxis_title=None,
-            yaxis_title="Frequência (0-3)",
-            xaxis={'tickangle': -45}
-        )
-        st.plotly_chart(fig_box_faf, use_container_width=True)
+    # ============================================================================
+    # REGISTROS FILTRADOS
+    # ============================================================================
+    secao_registros(filtros, chave)
     
     st.markdown("---")
     
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""Pontuação em lote com o obesity_pipeline.pkl.
+
+Lê um CSV, XLSX, Parquet ou Arrow IPC em blocos de tamanho fixo, distribui os blocos
+entre processos e grava a predição e as colunas de predict_proba à medida que
+cada bloco fica pronto (a memória não cresce com o tamanho do arquivo).
+
+Uso:
+    python batch_scoring.py pacientes.csv predicoes.csv --chunksize 50000 --workers 4
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+from schema import to_pt_features
+
+MODEL_PATH = Path("obesity_pipeline.pkl")
+PARQUET_EXTS = {".parquet", ".pq"}
+ARROW_EXTS = {".arrow", ".feather", ".ipc"}
+EXCEL_EXTS = {".xlsx"}
+
+_model = None  # modelo carregado uma única vez por processo
+
+
+# ============================================================================
+# LEITURA E ESCRITA EM BLOCOS
+# ============================================================================
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise SystemExit("⚠️ Parquet/Arrow requer o pacote 'pyarrow' (pip install pyarrow).")
+
+
+def _require_openpyxl():
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        raise SystemExit("⚠️ XLSX requer o pacote 'openpyxl' (pip install openpyxl).")
+
+
+def read_table(source, name=None):
+    """Lê uma planilha inteira (CSV ou XLSX); `name` indica o formato quando `source` é um arquivo em memória.
+
+    CSVs com `;` como separador (Excel em PT-BR) são detectados automaticamente.
+    """
+    ext = Path(name or source).suffix.lower()
+    if ext in EXCEL_EXTS:
+        _require_openpyxl()
+        return pd.read_excel(source)
+    return pd.read_csv(source, sep=None, engine="python")
+
+
+def iter_chunks(path, chunksize):
+    """Gera DataFrames de até `chunksize` linhas a partir de CSV, XLSX, Parquet ou Arrow IPC."""
+    path = Path(path)
+    ext = path.suffix.lower()
+    if ext in EXCEL_EXTS:
+        df = read_table(path)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+    elif ext in PARQUET_EXTS:
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif ext in ARROW_EXTS:
+        _require_pyarrow()
+        import pyarrow as pa
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                for start in range(0, batch.num_rows, chunksize):
+                    yield batch.slice(start, chunksize).to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+class ChunkWriter:
+    """Escreve blocos de resultado incrementalmente em CSV ou Parquet."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.parquet = self.path.suffix.lower() in PARQUET_EXTS
+        self._writer = None
+        self._first = True
+
+    def write(self, df):
+        if self.parquet:
+            _require_pyarrow()
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# ============================================================================
+# PONTUAÇÃO
+# ============================================================================
+def _init_worker(model_path):
+    global _model
+    _model = joblib.load(model_path)
+
+
+def score_chunk(chunk, model=None, keep_input=True):
+    """Pontua um bloco: adiciona 'Predição' e uma coluna 'Prob_<classe>' por classe."""
+    model = model if model is not None else _model
+    proba = model.predict_proba(to_pt_features(chunk))
+    classes = model.classes_
+
+    out = pd.DataFrame(proba, columns=[f"Prob_{c}" for c in classes], index=chunk.index)
+    out.insert(0, "Predição", classes[proba.argmax(axis=1)])
+    if keep_input:
+        out = pd.concat([chunk, out], axis=1)
+    return out
+
+
+def score_frame(df, model, chunksize=5_000, on_progress=None):
+    """Pontua um DataFrame em memória, bloco a bloco, sem repetir as colunas de entrada.
+
+    `on_progress(linhas_feitas, total)` é chamado após cada bloco (ex.: barra de progresso).
+    """
+    parts = []
+    for start in range(0, len(df), chunksize):
+        parts.append(score_chunk(df.iloc[start:start + chunksize], model, keep_input=False))
+        if on_progress is not None:
+            on_progress(min(start + chunksize, len(df)), len(df))
+    if parts:
+        return pd.concat(parts)
+    # nenhuma linha: mesmas colunas de um resultado não vazio
+    columns = ["Predição"] + [f"Prob_{c}" for c in model.classes_]
+    return pd.DataFrame({c: pd.Series(index=df.index, dtype="float64") for c in columns}).astype({"Predição": object})
+
+
+def score_file(input_path, output_path, model_path=MODEL_PATH, chunksize=50_000,
+               workers=None, keep_input=True):
+    """Pontua `input_path` inteiro e grava em `output_path`, preservando a ordem das linhas.
+
+    Com workers > 1 os blocos são processados em paralelo, com no máximo
+    2 × workers blocos em voo para manter a memória constante.
+    """
+    workers = workers or os.cpu_count() or 1
+    writer = ChunkWriter(output_path)
+    n_rows = 0
+    t0 = time.perf_counter()
+
+    try:
+        if workers == 1:
+            model = joblib.load(model_path)
+            for chunk in iter_chunks(input_path, chunksize):
+                writer.write(score_chunk(chunk, model, keep_input))
+                n_rows += len(chunk)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(str(model_path),)) as pool:
+                pending = deque()
+                for chunk in iter_chunks(input_path, chunksize):
+                    pending.append(pool.submit(score_chunk, chunk, None, keep_input))
+                    if len(pending) >= 2 * workers:
+                        result = pending.popleft().result()
+                        writer.write(result)
+                        n_rows += len(result)
+                while pending:
+                    result = pending.popleft().result()
+                    writer.write(result)
+                    n_rows += len(result)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - t0
+    return {"linhas": n_rows, "segundos": elapsed, "linhas_por_segundo": n_rows / elapsed if elapsed else 0.0}
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pontuação em lote do modelo de obesidade.")
+    parser.add_argument("entrada", help="Arquivo CSV, XLSX, Parquet ou Arrow IPC com as 16 features (PT-BR ou originais em inglês)")
+    parser.add_argument("saida", help="Arquivo de saída (.csv ou .parquet)")
+    parser.add_argument("--modelo", default=str(MODEL_PATH), help="Caminho do pipeline treinado")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="Linhas por bloco")
+    parser.add_argument("--workers", type=int, default=None, help="Processos (padrão: nº de CPUs)")
+    parser.add_argument("--apenas-predicoes", action="store_true", help="Não repete as colunas de entrada na saída")
+    args = parser.parse_args(argv)
+
+    stats = score_file(args.entrada, args.saida, args.modelo, args.chunksize,
+                       args.workers, keep_input=not args.apenas_predicoes)
+    print(f"{stats['linhas']} linhas pontuadas em {stats['segundos']:.2f}s "
+          f"({stats['linhas_por_segundo']:.0f} linhas/s) -> {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
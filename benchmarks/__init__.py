@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks de desempenho do projeto (executar a partir da raiz: python -m benchmarks.<nome>)."""
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Utilitários compartilhados pelos benchmarks."""
+import json
+import platform
+import subprocess
+import sys
+from importlib import metadata
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGES = ("streamlit", "pandas", "numpy", "scikit-learn", "plotly", "joblib")
+
+
+def environment_info():
+    """Commit, Python e versões das bibliotecas, para comparar execuções entre releases."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {}
+    for pkg in PACKAGES:
+        try:
+            versions[pkg] = metadata.version(pkg)
+        except metadata.PackageNotFoundError:
+            versions[pkg] = None
+    return {
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "pacotes": versions,
+    }
+
+
+def write_json(path, payload):
+    Path(path).write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Benchmark dos backends do painel: pandas em memória x DuckDB out-of-core.
+
+Para cada escala, exporta o dataset replicado como Parquet particionado e
+monta o cubo do painel em um interpretador novo com cada motor:
+    - pandas: lê o Parquet inteiro (dataset.load_parquet) e agrega no NumPy
+    - duckdb: agrega direto dos arquivos (duckdb_backend.build_cube)
+Mede tempo de montagem e pico de memória do processo (ru_maxrss) e confere
+que os dois cubos coincidem.
+
+Uso:
+    python -m benchmarks.dashboard_backend --escala 10 100 --saida backend.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import ROOT, environment_info, write_json
+
+_SNIPPET = r'''
+import json, resource, sys, time, warnings
+warnings.filterwarnings("ignore")
+motor, fonte = sys.argv[1], sys.argv[2]
+COLS = ["Idade", "Altura", "Peso", "IMC", "FCVC", "NCP", "Água por dia", "Atividade Física", "Tempo em Telas"]
+BOX = ["IMC", "Idade", "Atividade Física"]
+base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+if motor == "duckdb":
+    from duckdb_backend import build_cube
+    cube = build_cube(fonte, COLS, BOX)
+else:
+    from dataset import load_parquet
+    from stats_cube import StatsCube
+    df = load_parquet(fonte)
+    df = df[["Gênero", "Histórico Familiar", "Obesidade"] + [c for c in COLS if c != "IMC"]]
+    num = [c for c in COLS if c != "IMC"]
+    df[num] = df[num].astype("float32")
+    df["IMC"] = df["Peso"] / (df["Altura"] ** 2)
+    cube = StatsCube.from_frame(df, COLS, BOX)
+elapsed = time.perf_counter() - t0
+sel = cube.select(cube.genders, (cube.age_lo, cube.age_hi), cube.families)
+print(json.dumps({
+    "montagem_s": elapsed,
+    "pico_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "rss_inicial_mb": base_rss / 1024,
+    "total": sel.total,
+    "imc_medio": float(sel.mean("IMC")),
+    "contagens": cube.n.ravel().tolist(),
+}))
+'''
+
+MOTORES = ("pandas", "duckdb")
+
+
+def _run(motor, fonte):
+    out = subprocess.run([sys.executable, "-c", _SNIPPET, motor, str(fonte)], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(scale):
+    from duckdb_backend import export_parquet
+
+    with tempfile.TemporaryDirectory(prefix="obesity_parquet_bench_") as tmp:
+        fonte = Path(tmp) / "dados"
+        rows = export_parquet(str(fonte), scale)
+        size_mb = sum(f.stat().st_size for f in fonte.rglob("*.parquet")) / 1e6
+        results = {motor: _run(motor, fonte) for motor in MOTORES}
+
+    same = results["pandas"].pop("contagens") == results["duckdb"].pop("contagens")
+    return {
+        "escala": scale,
+        "linhas": rows,
+        "parquet_mb": size_mb,
+        "cubos_iguais": same and abs(results["pandas"]["imc_medio"] - results["duckdb"]["imc_medio"]) < 1e-4,
+        **results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos backends do painel (pandas x DuckDB)")
+    parser.add_argument("--escala", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída")
+    args = parser.parse_args(argv)
+
+    results = []
+    for scale in args.escala:
+        r = run(scale)
+        results.append(r)
+        print(f"{r['escala']:>5}x | {r['linhas']:>10,} linhas | {r['parquet_mb']:7.1f} MB Parquet | "
+              + " | ".join(f"{m} {r[m]['montagem_s']:6.2f}s pico {r[m]['pico_rss_mb']:7.0f} MB" for m in MOTORES)
+              + f" | iguais: {r['cubos_iguais']}")
+
+    if args.saida:
+        write_json(args.saida, {"ambiente": environment_info(), "resultados": results})
+        print("Resultados salvos em", args.saida)
+
+
+if __name__ == "__main__":
+    main()
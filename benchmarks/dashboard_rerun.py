@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Latência de rerun do painel (app_dashboard.py) em trocas de filtro.
+
+Roda o painel com AppTest em um interpretador novo e, depois da primeira
+renderização, percorre uma sequência de estados de filtro duas vezes:
+    - filtro_novo_s: estado ainda não visto (figuras construídas)
+    - filtro_repetido_s: estado já visto nesta sessão/servidor
+    - registros_s: liga a tabela de registros filtrados
+`--revisao` mede uma versão do git (ex.: HEAD~1) para comparar antes/depois.
+
+Uso:
+    python -m benchmarks.dashboard_rerun --revisao HEAD~1 --saida rerun_antes.json
+    python -m benchmarks.dashboard_rerun --saida rerun_depois.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import ROOT, environment_info, write_json
+
+_SNIPPET = r'''
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+import logging
+logging.disable(logging.WARNING)
+from streamlit.testing.v1 import AppTest
+ESTADOS = json.loads(sys.argv[2])
+
+at = AppTest.from_file(sys.argv[1], default_timeout=300).run()
+
+def medir(acao):
+    t0 = time.perf_counter()
+    acao()
+    at.run()
+    return time.perf_counter() - t0
+
+def aplicar(estado):
+    generos, idade, historicos = estado
+    at.multiselect[0].set_value(generos)
+    at.slider[0].set_value(tuple(idade))
+    at.multiselect[1].set_value(historicos)
+
+novo = [medir(lambda e=e: aplicar(e)) for e in ESTADOS]
+repetido = [medir(lambda e=e: aplicar(e)) for e in ESTADOS]
+registros = [medir(lambda: at.toggle[0].set_value(True))] if len(at.toggle) else []
+print(json.dumps({"filtro_novo_s": novo, "filtro_repetido_s": repetido, "registros_s": registros,
+                  "erros": [str(e.value) for e in at.exception]}))
+'''
+
+ESTADOS = [
+    (["Feminino"], (20, 30), ["Sim"]),
+    (["Masculino"], (18, 40), ["Não", "Sim"]),
+    (["Feminino", "Masculino"], (25, 45), ["Não"]),
+    (["Feminino", "Masculino"], (14, 61), ["Não", "Sim"]),
+    (["Feminino"], (14, 61), ["Não", "Sim"]),
+]
+
+
+def _script(revision):
+    """Caminho do painel: o da árvore de trabalho ou uma cópia da revisão do git (na raiz, pelos imports)."""
+    if revision is None:
+        return ROOT / "app_dashboard.py", None
+    source = subprocess.run(["git", "show", f"{revision}:app_dashboard.py"], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    tmp = tempfile.NamedTemporaryFile("w", suffix=".py", prefix=".rerun_", dir=ROOT, delete=False, encoding="utf-8")
+    tmp.write(source)
+    tmp.close()
+    return tmp.name, tmp.name
+
+
+def measure(revision=None):
+    script, cleanup = _script(revision)
+    try:
+        out = subprocess.run([sys.executable, "-c", _SNIPPET, str(script), json.dumps(ESTADOS)],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    finally:
+        if cleanup:
+            (ROOT / cleanup).unlink()
+    runs = json.loads(out.strip().splitlines()[-1])
+    return {
+        "revisao": revision or "árvore de trabalho",
+        **{k: statistics.median(v) for k, v in runs.items() if k.endswith("_s") and v},
+        "erros": runs["erros"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latência de rerun do painel analítico")
+    parser.add_argument("--revisao", default=None, help="Revisão do git a medir (padrão: árvore de trabalho)")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída")
+    args = parser.parse_args(argv)
+
+    r = measure(args.revisao)
+    print(f"{r['revisao']}: filtro novo {r['filtro_novo_s'] * 1000:.0f} ms | "
+          f"filtro repetido {r['filtro_repetido_s'] * 1000:.0f} ms"
+          + (f" | registros {r['registros_s'] * 1000:.0f} ms" if "registros_s" in r else ""))
+    if r["erros"]:
+        print("Erros:", r["erros"])
+
+    if args.saida:
+        write_json(args.saida, {"ambiente": environment_info(), "resultados": r})
+        print("Resultados salvos em", args.saida)
+
+
+if __name__ == "__main__":
+    main()
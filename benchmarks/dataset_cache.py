@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Benchmark do cache colunar do dataset (dataset.py) em escala.
+
+Replica o Obesity.csv N vezes num diretório temporário e mede:
+    - csv_s: leitura + tradução direto do CSV (o caminho antigo)
+    - cache_frio_s: primeira carga (hash do CSV + parse + gravação do Arrow)
+    - cache_quente_s: cargas seguintes (stat + leitura do Arrow mapeado em memória)
+    - impressao_digital_s: custo da checagem de validade a cada carga
+
+Uso:
+    python -m benchmarks.dataset_cache --escala 100 --saida dataset_cache.json
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import dataset
+from benchmarks.common import ROOT, environment_info, write_json
+
+
+def _best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), statistics.median(times)
+
+
+def run(scale, repeats=5):
+    base = pd.read_csv(ROOT / "Obesity.csv")
+    with tempfile.TemporaryDirectory(prefix="obesity_dataset_bench_") as tmp:
+        csv_path = Path(tmp) / "Obesity.csv"
+        cache_dir = Path(tmp) / "cache"
+        pd.concat([base] * scale, ignore_index=True).to_csv(csv_path, index=False)
+
+        csv_best, csv_med = _best_of(lambda: dataset.parse_csv(csv_path), repeats)
+
+        t0 = time.perf_counter()
+        df = dataset.load_frame(csv_path, cache_dir)
+        cold = time.perf_counter() - t0
+
+        warm_best, warm_med = _best_of(lambda: dataset.load_frame(csv_path, cache_dir), repeats)
+        fp_best, _ = _best_of(lambda: dataset.fingerprint(csv_path, cache_dir), repeats)
+
+        return {
+            "escala": scale,
+            "linhas": len(df),
+            "csv_mb": csv_path.stat().st_size / 1e6,
+            "arrow_mb": dataset.cache_path(csv_path, cache_dir).stat().st_size / 1e6,
+            "memoria_mb": df.memory_usage(deep=True).sum() / 1e6,
+            "csv_s": csv_best,
+            "csv_mediana_s": csv_med,
+            "cache_frio_s": cold,
+            "cache_quente_s": warm_best,
+            "cache_quente_mediana_s": warm_med,
+            "impressao_digital_s": fp_best,
+            "aceleracao": csv_best / warm_best,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do cache colunar do Obesity.csv")
+    parser.add_argument("--escala", type=int, nargs="+", default=[1, 100], help="Multiplicadores do dataset")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída")
+    args = parser.parse_args(argv)
+
+    results = [run(scale, args.repeticoes) for scale in args.escala]
+    for r in results:
+        print(f"{r['escala']:>4}x | {r['linhas']:>9,} linhas | CSV {r['csv_s'] * 1000:8.1f} ms | "
+              f"cache frio {r['cache_frio_s'] * 1000:8.1f} ms | cache quente {r['cache_quente_s'] * 1000:7.1f} ms "
+              f"({r['aceleracao']:.0f}x) | checagem {r['impressao_digital_s'] * 1e6:.0f} µs")
+
+    if args.saida:
+        write_json(args.saida, {"ambiente": environment_info(), "resultados": results})
+        print("Resultados salvos em", args.saida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Benchmark do índice de filtros (filter_index.py) contra as máscaras do pandas.
+
+Replica o dataset até N linhas (10 milhões por padrão) e, para cada
+combinação de filtros da sidebar, mede:
+    - pandas: `isin` + faixa de idade + `isin` e o DataFrame filtrado copiado
+    - índice: OR/AND de bitmaps + `searchsorted` até o vetor de índices de linha
+Confere que as duas seleções têm exatamente as mesmas linhas.
+
+Uso:
+    python -m benchmarks.filter_index --linhas 10000000 --saida filter_index.json
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import ROOT, environment_info, write_json
+from dataset import load_frame
+from filter_index import FilterIndex
+
+FILTROS = [
+    (["Feminino", "Masculino"], (14, 61), ["Não", "Sim"]),
+    (["Feminino"], (20, 30), ["Sim"]),
+    (["Masculino"], (18, 40), ["Não", "Sim"]),
+    (["Feminino", "Masculino"], (25, 45), ["Não"]),
+    (["Feminino"], (30, 31), ["Não"]),
+]
+COLS = ["Gênero", "Histórico Familiar", "Obesidade", "Idade", "Altura", "Peso", "FCVC", "NCP",
+        "Água por dia", "Atividade Física", "Tempo em Telas"]
+
+
+def _frame(rows):
+    df = load_frame(ROOT / "Obesity.csv", ROOT / ".cache")[COLS]
+    df = pd.concat([df] * -(-rows // len(df)), ignore_index=True).iloc[:rows]
+    num = COLS[3:]
+    df[num] = df[num].astype("float32")
+    return df
+
+
+def _by_mask(df, generos, idade, historicos):
+    mask = (df["Gênero"].isin(generos) & (df["Idade"] >= idade[0]) & (df["Idade"] <= idade[1])
+            & df["Histórico Familiar"].isin(historicos))
+    return df[mask]
+
+
+def _by_index(index, generos, idade, historicos):
+    return index.select({"Gênero": generos, "Histórico Familiar": historicos}, idade)
+
+
+def _time(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def run(rows, repeats=3):
+    df = _frame(rows)
+    t0 = time.perf_counter()
+    index = FilterIndex.from_frame(df)
+    build = time.perf_counter() - t0
+
+    for filtro in FILTROS:
+        expected = _by_mask(df, *filtro).index.to_numpy()
+        assert np.array_equal(expected, _by_index(index, *filtro)), filtro
+
+    per_filter = []
+    for filtro in FILTROS:
+        per_filter.append({
+            "filtro": {"genero": filtro[0], "idade": list(filtro[1]), "historico": filtro[2]},
+            "linhas_selecionadas": int(index.count({"Gênero": filtro[0], "Histórico Familiar": filtro[2]}, filtro[1])),
+            "mascara_pandas_s": _time(lambda: _by_mask(df, *filtro), repeats),
+            "indice_s": _time(lambda: _by_index(index, *filtro), repeats),
+        })
+    return {
+        "linhas": len(df),
+        "dataframe_mb": df.memory_usage(deep=True).sum() / 1e6,
+        "indice_mb": index.nbytes / 1e6,
+        "montagem_indice_s": build,
+        "filtros": per_filter,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do índice de filtros do painel")
+    parser.add_argument("--linhas", type=int, default=10_000_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída")
+    args = parser.parse_args(argv)
+
+    r = run(args.linhas, args.repeticoes)
+    print(f"{r['linhas']:,} linhas | DataFrame {r['dataframe_mb']:.0f} MB | índice {r['indice_mb']:.0f} MB "
+          f"(montagem {r['montagem_indice_s']:.2f} s)")
+    for f in r["filtros"]:
+        print(f"  {f['linhas_selecionadas']:>10,} selecionadas | máscara pandas {f['mascara_pandas_s'] * 1000:8.1f} ms | "
+              f"índice {f['indice_s'] * 1000:7.1f} ms | {f['mascara_pandas_s'] / f['indice_s']:5.1f}x")
+
+    if args.saida:
+        write_json(args.saida, {"ambiente": environment_info(), "resultados": r})
+        print("Resultados salvos em", args.saida)
+
+
+if __name__ == "__main__":
+    main()
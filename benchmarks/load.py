@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""Teste de carga headless de app.py e app_dashboard.py.
+
+Cada app roda em um interpretador novo, com N sessões simultâneas (uma
+AppTest por sessão, cada uma na sua thread, como o servidor do Streamlit
+executa o script de cada sessão). Os caches `st.cache_data`/`cache_resource`
+são compartilhados pelo processo, como em produção. Para cada nível de
+concorrência:
+    - app.py: cada sessão preenche o formulário com um paciente aleatório e
+      clica em "Realizar Predição"
+    - app_dashboard.py: cada sessão troca os filtros da sidebar (gênero,
+      faixa etária, histórico familiar) para um estado aleatório
+Antes da medição, cada sessão renderiza e faz uma interação de aquecimento.
+São medidos p50/p95/p99 da latência de rerun, a vazão (reruns/s) e a
+memória do processo (RSS após o nível e pico).
+
+Uso:
+    python -m benchmarks.load --concorrencia 1 2 4 8 16 --interacoes 10 --saida carga.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from benchmarks.common import ROOT, environment_info, write_json
+
+APPS = ("app.py", "app_dashboard.py")
+
+_SNIPPET = r'''
+import json, random, sys, threading, time, warnings
+warnings.filterwarnings("ignore")
+import logging
+logging.disable(logging.WARNING)
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+APP, NIVEIS, INTERACOES, SEMENTE = sys.argv[1], json.loads(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])
+
+def rss_mb():
+    campos = dict(l.split(":", 1) for l in open("/proc/self/status"))
+    return int(campos["VmRSS"].split()[0]) / 1024, int(campos["VmHWM"].split()[0]) / 1024
+
+def grade(lo, hi, passo):
+    return [round(lo + i * passo, 6) for i in range(int(round((hi - lo) / passo)) + 1)]
+
+def preencher_formulario(at, rng):
+    idade, altura, peso = at.number_input
+    idade.set_value(float(rng.randint(14, 61)))
+    altura.set_value(round(rng.uniform(1.45, 1.98), 2))
+    peso.set_value(round(rng.uniform(40.0, 170.0), 1))
+    for s in at.selectbox:
+        s.set_value(rng.choice(s.options))
+    for s in at.slider:
+        s.set_value(rng.choice(grade(s.min, s.max, s.step)))
+    at.button[0].click()
+
+def trocar_filtros(at, rng):
+    generos, historicos = at.multiselect
+    generos.set_value(rng.sample(generos.options, rng.randint(1, len(generos.options))))
+    historicos.set_value(rng.sample(historicos.options, rng.randint(1, len(historicos.options))))
+    faixa = at.slider[0]
+    lo = rng.randint(int(faixa.min), int(faixa.max) - 5)
+    faixa.set_value((lo, rng.randint(lo + 5, int(faixa.max))))
+
+interagir = preencher_formulario if APP == "app.py" else trocar_filtros
+rss_inicial, _ = rss_mb()
+niveis = []
+for n in NIVEIS:
+    sessoes = [AppTest.from_file(APP, default_timeout=600) for _ in range(n)]
+    for i, at in enumerate(sessoes):
+        # primeira renderização e uma interação de aquecimento (cargas preguiçosas) fora da medição
+        at.run()
+        interagir(at, random.Random(-1 - i))
+        at.run()
+    latencias, erros = [[] for _ in range(n)], []
+    largada = threading.Barrier(n)
+
+    def sessao(i):
+        at, rng = sessoes[i], random.Random(SEMENTE * 1000 + n * 100 + i)
+        largada.wait()
+        for _ in range(INTERACOES):
+            interagir(at, rng)
+            t0 = time.perf_counter()
+            at.run()
+            latencias[i].append(time.perf_counter() - t0)
+        erros.extend(str(e.value) for e in at.exception)
+
+    threads = [threading.Thread(target=sessao, args=(i,)) for i in range(n)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    parede = time.perf_counter() - t0
+    todas = np.array([x for l in latencias for x in l])
+    rss, pico = rss_mb()
+    niveis.append({
+        "sessoes": n,
+        "reruns": len(todas),
+        "p50_s": float(np.percentile(todas, 50)),
+        "p95_s": float(np.percentile(todas, 95)),
+        "p99_s": float(np.percentile(todas, 99)),
+        "vazao_reruns_s": len(todas) / parede,
+        "rss_mb": rss,
+        "pico_rss_mb": pico,
+        "rss_por_sessao_mb": (rss - rss_inicial) / n,
+        "erros": sorted(set(erros)),
+    })
+    del sessoes
+print(json.dumps({"rss_inicial_mb": rss_inicial, "niveis": niveis}))
+'''
+
+
+def measure(app, levels, interactions, seed=0):
+    out = subprocess.run([sys.executable, "-c", _SNIPPET, app, json.dumps(levels), str(interactions), str(seed)],
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga headless dos apps Streamlit (AppTest).")
+    parser.add_argument("--apps", nargs="+", choices=APPS, default=list(APPS))
+    parser.add_argument("--concorrencia", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="Sessões simultâneas em cada nível")
+    parser.add_argument("--interacoes", type=int, default=10, help="Reruns medidos por sessão")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída")
+    args = parser.parse_args(argv)
+
+    payload = {"ambiente": environment_info(), "interacoes": args.interacoes, "apps": {}}
+    for app in args.apps:
+        payload["apps"][app] = res = measure(app, sorted(args.concorrencia), args.interacoes, args.semente)
+        print(f"{app} (RSS inicial {res['rss_inicial_mb']:.0f} MB)")
+        print(f"  {'sessões':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'reruns/s':>9} {'RSS':>8} {'pico':>8}")
+        for r in res["niveis"]:
+            print(f"  {r['sessoes']:>7} {r['p50_s'] * 1000:7.0f}ms {r['p95_s'] * 1000:7.0f}ms "
+                  f"{r['p99_s'] * 1000:7.0f}ms {r['vazao_reruns_s']:9.1f} {r['rss_mb']:6.0f}MB {r['pico_rss_mb']:6.0f}MB"
+                  + (f"  erros: {r['erros']}" if r["erros"] else ""))
+    if args.saida:
+        write_json(args.saida, payload)
+
+
+if __name__ == "__main__":
+    main()
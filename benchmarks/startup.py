@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Benchmark de cold start de app.py e app_dashboard.py.
+
+Cada repetição roda em um interpretador novo e mede:
+    - import_s: tempo das importações de topo do script
+    - primeira_renderizacao_s: primeira execução completa do script (AppTest)
+    - primeira_interacao_s: primeira predição (app.py) ou primeira troca de filtro (dashboard)
+e registra quais bibliotecas pesadas já estavam carregadas após a primeira renderização.
+
+Uso:
+    python -m benchmarks.startup --repeticoes 5 --saida startup.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import ROOT, environment_info, write_json
+
+APPS = ("app.py", "app_dashboard.py")
+HEAVY_MODULES = ("pandas", "sklearn", "plotly.express", "plotly.graph_objects")
+
+_SNIPPET = r'''
+import ast, importlib, json, sys, time, warnings
+warnings.filterwarnings("ignore")
+APP = sys.argv[1]
+HEAVY = sys.argv[2].split(",")
+
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t_streamlit = time.perf_counter() - t0
+
+tree = ast.parse(open(APP, encoding="utf-8").read())
+top_level = []
+for node in tree.body:
+    if isinstance(node, ast.Import):
+        top_level += [a.name for a in node.names]
+    elif isinstance(node, ast.ImportFrom) and node.module:
+        top_level.append(node.module)
+t0 = time.perf_counter()
+for name in top_level:
+    importlib.import_module(name)
+t_import = time.perf_counter() - t0
+
+at = AppTest.from_file(APP, default_timeout=300)
+t0 = time.perf_counter()
+at.run()
+t_render = time.perf_counter() - t0
+loaded = {m: m in sys.modules for m in HEAVY}
+
+t0 = time.perf_counter()
+if APP == "app.py":
+    at.button[0].click().run()
+else:
+    lo, hi = at.slider[0].value
+    at.slider[0].set_value((lo + 1, hi)).run()
+t_interaction = time.perf_counter() - t0
+
+print(json.dumps({
+    "import_streamlit_s": t_streamlit,
+    "import_s": t_import,
+    "primeira_renderizacao_s": t_render,
+    "primeira_interacao_s": t_interaction,
+    "carregados_apos_renderizacao": loaded,
+    "erros": [str(e.value) for e in at.exception],
+}))
+'''
+
+
+def measure_once(app):
+    out = subprocess.run([sys.executable, "-c", _SNIPPET, app, ",".join(HEAVY_MODULES)],
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(app, repeats=5):
+    runs = [measure_once(app) for _ in range(repeats)]
+    keys = ("import_streamlit_s", "import_s", "primeira_renderizacao_s", "primeira_interacao_s")
+    result = {k: statistics.median(r[k] for r in runs) for k in keys}
+    result["carregados_apos_renderizacao"] = runs[-1]["carregados_apos_renderizacao"]
+    result["erros"] = sorted({e for r in runs for e in r["erros"]})
+    result["repeticoes"] = repeats
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de cold start dos apps Streamlit.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída")
+    args = parser.parse_args(argv)
+
+    payload = {"ambiente": environment_info(), "apps": {}}
+    for app in APPS:
+        payload["apps"][app] = res = measure(app, args.repeticoes)
+        print(f"{app}: import {res['import_s']:.2f}s | 1ª renderização {res['primeira_renderizacao_s']:.2f}s "
+              f"| 1ª interação {res['primeira_interacao_s']:.2f}s | carregados: "
+              + ", ".join(m for m, ok in res["carregados_apos_renderizacao"].items() if ok))
+    if args.saida:
+        write_json(args.saida, payload)
+
+
+if __name__ == "__main__":
+    main()
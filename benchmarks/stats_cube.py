@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Benchmark do cubo de estatísticas do painel (stats_cube.py) contra o caminho por linhas.
+
+Para o dataset replicado N vezes, mede o tempo de uma troca de filtro:
+KPIs, contagem por nível, proporção por histórico familiar, médias de
+água/atividade por nível, a matriz de correlação e os quartis dos box plots.
+A comparação é entre pandas sobre as linhas filtradas e a soma de células do
+cubo. Confere que os agregados coincidem e que os quartis dos esboços
+ficam a menos de um bin dos exatos.
+
+Uso:
+    python -m benchmarks.stats_cube --escala 1 100 1000 --saida stats_cube.json
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import ROOT, environment_info, write_json
+from dataset import load_frame
+from stats_cube import StatsCube
+
+COLS = ["Idade", "Altura", "Peso", "IMC", "FCVC", "NCP", "Água por dia", "Atividade Física", "Tempo em Telas"]
+BOX_COLS = ["IMC", "Idade", "Atividade Física"]
+OBESIDADE = ["Obesidade_I", "Obesidade_II", "Obesidade_III"]
+FILTROS = [
+    (["Feminino", "Masculino"], (14, 61), ["Não", "Sim"]),
+    (["Feminino"], (20, 30), ["Sim"]),
+    (["Masculino"], (18, 40), ["Não", "Sim"]),
+    (["Feminino", "Masculino"], (25, 45), ["Não"]),
+]
+
+
+def _frame(scale):
+    df = load_frame(ROOT / "Obesity.csv", ROOT / ".cache")
+    df["IMC"] = df["Peso"] / df["Altura"] ** 2
+    df = pd.concat([df] * scale, ignore_index=True)
+    df["Obeso"] = df["Obesidade"].isin(OBESIDADE)
+    return df
+
+
+def _by_rows(df, generos, idade, historicos):
+    f = df[df["Gênero"].isin(generos) & (df["Idade"] >= idade[0]) & (df["Idade"] <= idade[1])
+           & df["Histórico Familiar"].isin(historicos)]
+    return {
+        "total": len(f),
+        "obesidade": f["Obeso"].mean(),
+        "imc": f["IMC"].mean(),
+        "niveis": f["Obesidade"].value_counts(sort=False).loc[lambda c: c > 0].to_numpy(),
+        "historico": f.groupby("Histórico Familiar", observed=True)["Obeso"].mean().mul(100).to_numpy(),
+        "agua": f.groupby("Obesidade", observed=True)["Água por dia"].mean().to_numpy(),
+        "corr": f[COLS].corr().to_numpy(),
+        "quartis": {c: f.groupby("Obesidade", observed=True)[c].quantile([0.25, 0.5, 0.75]).to_numpy()
+                    for c in BOX_COLS},
+    }
+
+
+def _by_cube(cube, generos, idade, historicos):
+    sel = cube.select(generos, idade, historicos)
+    return {
+        "total": sel.total,
+        "obesidade": sel.share(OBESIDADE),
+        "imc": sel.mean("IMC"),
+        "niveis": sel.counts_by_class().to_numpy(),
+        "historico": sel.share_by_family(OBESIDADE).to_numpy(),
+        "agua": sel.mean_by_class("Água por dia").to_numpy(),
+        "corr": sel.corr().to_numpy(),
+        "quartis": {c: np.array([[e["q1"], e["median"], e["q3"]] for e in sel.box_stats(c).values()]).ravel()
+                    for c in BOX_COLS},
+    }
+
+
+def _time(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def run(scale, repeats=5):
+    df = _frame(scale)
+    t0 = time.perf_counter()
+    cube = StatsCube.from_frame(df, COLS, BOX_COLS)
+    build = time.perf_counter() - t0
+
+    max_diff = 0.0
+    quartile_bins = 0.0
+    for filtro in FILTROS:
+        a, b = _by_rows(df, *filtro), _by_cube(cube, *filtro)
+        assert a["total"] == b["total"]
+        for k in ("obesidade", "imc", "niveis", "historico", "agua", "corr"):
+            max_diff = max(max_diff, float(np.nanmax(np.abs(np.asarray(a[k], float) - np.asarray(b[k], float)))))
+        for j, c in enumerate(BOX_COLS):
+            err = np.abs(a["quartis"][c] - b["quartis"][c]).max() / cube.sketches.width[j]
+            quartile_bins = max(quartile_bins, float(err))
+
+    rows_s = _time(lambda: [_by_rows(df, *f) for f in FILTROS], repeats) / len(FILTROS)
+    cube_s = _time(lambda: [_by_cube(cube, *f) for f in FILTROS], repeats) / len(FILTROS)
+    return {
+        "escala": scale,
+        "linhas": len(df),
+        "celulas": int(cube.n.size),
+        "cubo_mb": cube.nbytes / 1e6,
+        "montagem_cubo_s": build,
+        "por_linhas_s": rows_s,
+        "cubo_s": cube_s,
+        "maior_diferenca": max_diff,
+        "erro_quartis_bins": quartile_bins,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do cubo de estatísticas do painel")
+    parser.add_argument("--escala", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída")
+    args = parser.parse_args(argv)
+
+    results = [run(scale, args.repeticoes) for scale in args.escala]
+    for r in results:
+        print(f"{r['escala']:>5}x | {r['linhas']:>10,} linhas | por linhas {r['por_linhas_s'] * 1000:8.2f} ms | "
+              f"cubo {r['cubo_s'] * 1000:6.2f} ms | montagem {r['montagem_cubo_s']:.2f} s | "
+              f"dif. máx {r['maior_diferenca']:.1e} | quartis ±{r['erro_quartis_bins']:.2f} bin")
+
+    if args.saida:
+        write_json(args.saida, {"ambiente": environment_info(), "resultados": results})
+        print("Resultados salvos em", args.saida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""Suíte de benchmarks dos caminhos quentes de treino, inferência e painel.
+
+Cada caso vira uma entrada `nome -> {"mediana_s", "repeticoes", ...}` no JSON:
+    - treino.*: etapas de ml_pipeline_obesity.py (carga, pipeline, ajuste,
+      um fold de CV e o run_training completo em paralelo)
+    - inferencia.*: uma linha pelo PredictionCache como o app.py chama (falta
+      e acerto de cache) e vazão em lote (score_chunk) em 1k/100k/1M linhas
+    - painel.*: a carga do dataset do painel (dashboard_data.py, sem o
+      cache do Streamlit) do Obesity.csv e, nos tamanhos maiores, de um Parquet sintético
+      (synthetic_data.py) com o mesmo número de linhas; para cada tamanho,
+      a montagem do cubo, do índice de filtros e cada agregação que o
+      create_dashboard faz por rerun
+`comparar` confronta dois JSONs e sai com código 1 se algum caso ficou mais
+lento que o limiar.
+
+Uso:
+    python -m benchmarks.suite rodar --saida baseline.json
+    python -m benchmarks.suite rodar --rapido --saida atual.json
+    python -m benchmarks.suite comparar baseline.json atual.json --limiar 0.15
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import warnings
+
+from benchmarks.common import ROOT, environment_info, write_json
+
+OBESIDADE = ["Obesidade I", "Obesidade II", "Obesidade III"]
+ORCAMENTO_S = 0.5  # tempo alvo por caso: casos rápidos repetem mais (mediana estável)
+
+
+def _time(fn, repeats, warmup=True):
+    """Mediana de até `repeats` execuções; com aquecimento, o número se ajusta ao ORCAMENTO_S."""
+    if warmup:
+        t0 = time.perf_counter()
+        fn()
+        repeats = max(3, min(repeats, int(ORCAMENTO_S / max(time.perf_counter() - t0, 1e-6))))
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {"mediana_s": statistics.median(times), "min_s": min(times), "repeticoes": repeats}
+
+
+# ============================================================================
+# CASOS
+# ============================================================================
+def bench_training(results, rapido):
+    import ml_pipeline_obesity as mp
+
+    X, y, num_cols, cat_cols = mp.load_dataset(ROOT / "Obesity.csv")
+    results["treino.carregar_dados"] = _time(lambda: mp.load_dataset(ROOT / "Obesity.csv"), 20)
+    results["treino.montar_pipeline"] = _time(lambda: mp.build_pipeline(num_cols, cat_cols), 20)
+    pipe = mp.build_pipeline(num_cols, cat_cols)
+    fits = 1 if rapido else 3
+    results["treino.ajuste_final"] = _time(lambda: mp._fit_full(pipe, X, y), fits, warmup=False)
+
+    from sklearn.model_selection import StratifiedKFold
+    train_idx, test_idx = next(StratifiedKFold(n_splits=5, shuffle=True, random_state=42).split(X, y))
+    results["treino.fold_cv"] = _time(lambda: mp._fit_predict(pipe, X, y, train_idx, test_idx), fits, warmup=False)
+    if not rapido:
+        results["treino.run_training"] = _time(lambda: mp.run_training(pipe, X, y), 1, warmup=False)
+
+
+def bench_inference(results, rapido):
+    import pandas as pd
+    from batch_scoring import score_chunk
+    from dataset import load_frame
+    from model_registry import ModelHandle, ModelRegistry
+    from prediction_cache import PredictionCache
+    from schema import FEATURE_COLS
+
+    cache = PredictionCache(ModelHandle(ModelRegistry(ROOT / "models"), fallback_path=ROOT / "obesity_pipeline.pkl"))
+    X = load_frame(ROOT / "Obesity.csv", ROOT / ".cache")[FEATURE_COLS]
+    rec = X.iloc[0].to_dict()
+
+    def miss():
+        cache.clear()
+        cache.predict(rec)
+
+    results["inferencia.uma_linha"] = _time(miss, 200)
+    results["inferencia.uma_linha_cache"] = _time(lambda: cache.predict(rec), 5000)
+
+    model = cache.model
+    for n in ((1_000, 100_000) if rapido else (1_000, 100_000, 1_000_000)):
+        batch = pd.concat([X] * -(-n // len(X)), ignore_index=True).iloc[:n]
+        r = _time(lambda: score_chunk(batch, model, keep_input=False), 5 if n <= 100_000 else 1, warmup=n <= 100_000)
+        r["linhas_por_s"] = n / r["mediana_s"]
+        results[f"inferencia.lote_{n // 1000}k"] = r
+
+
+def bench_dashboard(results, rapido):
+    import tempfile
+    from pathlib import Path
+
+    import pandas as pd
+
+    from dashboard_data import COLUNAS_BOX, COLUNAS_CUBO, load_dashboard_frame
+    from filter_index import FilterIndex
+    from stats_cube import StatsCube
+    from synthetic_data import SyntheticModel, generate_file
+
+    results["painel.load_data"] = _time(load_dashboard_frame, 20)
+    base = load_dashboard_frame()
+    gerador = SyntheticModel.fit(pd.read_csv(ROOT / "Obesity.csv"))
+
+    filtros = (["Feminino", "Masculino"], (20, 40), ["Sim"])
+    with tempfile.TemporaryDirectory(prefix="obesity_suite_") as tmp:
+        for escala in ((1, 100) if rapido else (1, 100, 1000)):
+            df = pd.concat([base] * escala, ignore_index=True)
+            p = f"painel.x{escala}."
+            if escala > 1:
+                # carga em escala: Parquet PT-BR sintético (dados replicados comprimiriam bem demais)
+                fonte = str(Path(tmp) / f"x{escala}.parquet")
+                generate_file(fonte, len(df), gerador, seed=escala, workers=1, ptbr=True)
+                results[p + "load_data"] = _time(lambda: load_dashboard_frame(fonte), 20)
+                results[p + "load_data"]["linhas"] = len(df)
+            results[p + "montar_cubo"] = _time(lambda: StatsCube.from_frame(df, COLUNAS_CUBO, COLUNAS_BOX), 20)
+            results[p + "montar_indice"] = _time(lambda: FilterIndex.from_frame(df), 20)
+            cube = StatsCube.from_frame(df, COLUNAS_CUBO, COLUNAS_BOX)
+            index = FilterIndex.from_frame(df)
+            sel = cube.select(*filtros)
+            casos = {
+                "selecao": lambda: cube.select(*filtros),
+                "kpis": lambda: (sel.share(OBESIDADE), sel.mean("IMC"), sel.mean("Idade")),
+                "distribuicao": sel.counts_by_class,
+                "historico": lambda: sel.share_by_family(OBESIDADE),
+                "medias_por_nivel": lambda: (sel.mean_by_class("Água por dia"), sel.mean_by_class("Atividade Física")),
+                "correlacao": sel.corr,
+                "box_plots": lambda: [sel.box_stats(c) for c in COLUNAS_BOX],
+                "registros_filtrados": lambda: index.select({"Gênero": filtros[0], "Histórico Familiar": filtros[2]}, filtros[1]),
+            }
+            for nome, fn in casos.items():
+                results[p + nome] = _time(fn, 500)
+            results[p + "montar_cubo"]["linhas"] = len(df)
+
+
+SUITES = {"treino": bench_training, "inferencia": bench_inference, "painel": bench_dashboard}
+
+
+# ============================================================================
+# COMPARAÇÃO
+# ============================================================================
+def compare(base, atual, limiar, piso_s=0.0):
+    """Casos presentes nos dois resultados: (nome, base_s, atual_s, razão, status).
+
+    Diferenças absolutas abaixo de `piso_s` contam como "ok" (ruído de medição).
+    """
+    linhas = []
+    for nome in sorted(set(base) & set(atual)):
+        b, a = base[nome]["mediana_s"], atual[nome]["mediana_s"]
+        razao = a / b if b else float("inf")
+        status = "ok"
+        if abs(a - b) >= piso_s:
+            status = "REGRESSÃO" if razao > 1 + limiar else "melhora" if razao < 1 - limiar else "ok"
+        linhas.append((nome, b, a, razao, status))
+    return linhas
+
+
+def _load(path):
+    payload = json.loads(open(path, encoding="utf-8").read())
+    return payload["resultados"], payload.get("ambiente", {})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks (treino, inferência e painel)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_run = sub.add_parser("rodar", help="Roda os casos e grava o JSON")
+    p_run.add_argument("--saida", default="benchmarks.json")
+    p_run.add_argument("--suites", nargs="+", choices=sorted(SUITES), default=list(SUITES))
+    p_run.add_argument("--rapido", action="store_true", help="Menos repetições, sem 1M linhas nem run_training")
+    p_cmp = sub.add_parser("comparar", help="Compara um resultado com a linha de base")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("atual")
+    p_cmp.add_argument("--limiar", type=float, default=0.15, help="Aumento relativo tolerado (0.15 = 15%%)")
+    p_cmp.add_argument("--piso-ms", type=float, default=0.5, help="Diferença absoluta ignorada (ruído)")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "rodar":
+        warnings.filterwarnings("ignore")
+        results = {}
+        for nome in args.suites:
+            t0 = time.perf_counter()
+            SUITES[nome](results, args.rapido)
+            print(f"{nome}: {time.perf_counter() - t0:.1f}s")
+        for nome, r in results.items():
+            print(f"  {nome:<40} {r['mediana_s'] * 1000:12.3f} ms")
+        write_json(args.saida, {"ambiente": environment_info(), "rapido": args.rapido, "resultados": results})
+        print("Resultados salvos em", args.saida)
+        return
+
+    base, amb_base = _load(args.base)
+    atual, amb_atual = _load(args.atual)
+    print(f"base: {amb_base.get('commit')} | atual: {amb_atual.get('commit')} | limiar: {args.limiar:.0%}")
+    linhas = compare(base, atual, args.limiar, args.piso_ms / 1000)
+    for nome, b, a, razao, status in linhas:
+        print(f"  {nome:<40} {b * 1000:12.3f} ms -> {a * 1000:12.3f} ms  {razao:6.2f}x  {status}")
+    for nome in sorted(set(base) ^ set(atual)):
+        print(f"  {nome:<40} só em {'base' if nome in base else 'atual'}")
+    regressoes = [l for l in linhas if l[4] == "REGRESSÃO"]
+    if regressoes:
+        sys.exit(f"❌ {len(regressoes)} caso(s) acima do limiar.")
+    print("✅ Nenhuma regressão acima do limiar.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""Motor de inferência em NumPy puro para o obesity_pipeline.pkl.
+
+O exportador achata o Pipeline treinado (StandardScaler + OneHotEncoder +
+GradientBoostingClassifier) em arrays NumPy contíguos: médias/escalas do
+scaler, tabelas de categorias do one-hot e, para cada árvore, os vetores de
+feature/threshold/filhos/valor preenchidos até o mesmo número de nós. O
+avaliador percorre todas as árvores ao mesmo tempo, nível a nível, e produz as
+mesmas probabilidades do Pipeline original sem pandas nem sklearn.
+
+Uso:
+    python compiled_model.py exportar --modelo obesity_pipeline.pkl --saida obesity_compiled.npz
+    python compiled_model.py verificar --modelo obesity_pipeline.pkl --dados Obesity.csv
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+MODEL_PATH = Path("obesity_pipeline.pkl")
+COMPILED_PATH = Path("obesity_compiled.npz")
+BLOCK_ROWS = 4096  # linhas por bloco na avaliação vetorizada (limita memória de n × árvores)
+
+
+# ============================================================================
+# EXPORTAÇÃO
+# ============================================================================
+def export_pipeline(pipe):
+    """Converte o Pipeline treinado em um dicionário de arrays NumPy."""
+    prep, clf = pipe.named_steps["prep"], pipe.named_steps["clf"]
+    if not hasattr(clf, "estimators_") or not hasattr(clf, "_raw_predict_init"):
+        raise ValueError("Somente GradientBoostingClassifier pode ser compilado.")
+
+    num_cols, cat_cols, categories = [], [], []
+    mean = scale = None
+    for name, trans, cols in prep.transformers_:
+        if name == "remainder":
+            if trans != "drop":
+                raise ValueError("ColumnTransformer com remainder diferente de 'drop' não é suportado.")
+        elif name == "num":
+            num_cols = list(cols)
+            mean = trans.mean_ if trans.with_mean else np.zeros(len(cols))
+            scale = trans.scale_ if trans.with_std else np.ones(len(cols))
+        elif name == "cat":
+            if getattr(trans, "drop_idx_", None) is not None:
+                raise ValueError("OneHotEncoder com 'drop' não é suportado.")
+            cat_cols = list(cols)
+            categories = [[str(v) for v in cats] for cats in trans.categories_]
+        else:
+            raise ValueError(f"Transformador não suportado: {name}")
+
+    stages, n_classes_raw = clf.estimators_.shape
+    trees = [est.tree_ for est in clf.estimators_.ravel()]  # árvore t = estágio * K + classe
+    max_nodes = max(t.node_count for t in trees)
+    n_trees = len(trees)
+
+    feature = np.zeros((n_trees, max_nodes), dtype=np.int32)
+    threshold = np.zeros((n_trees, max_nodes), dtype=np.float64)
+    left = np.tile(np.arange(max_nodes, dtype=np.int32), (n_trees, 1))
+    right = left.copy()
+    value = np.zeros((n_trees, max_nodes), dtype=np.float64)
+    for i, tree in enumerate(trees):
+        n = tree.node_count
+        internal = tree.children_left[:n] != -1
+        feature[i, :n] = np.where(internal, tree.feature[:n], 0)
+        threshold[i, :n] = np.where(internal, tree.threshold[:n], 0.0)
+        # folhas apontam para si mesmas: passos extras de travessia não mudam o nó
+        left[i, :n] = np.where(internal, tree.children_left[:n], np.arange(n))
+        right[i, :n] = np.where(internal, tree.children_right[:n], np.arange(n))
+        value[i, :n] = tree.value[:n, 0, 0]
+
+    n_features = len(num_cols) + sum(len(c) for c in categories)
+    init_raw = clf._raw_predict_init(np.zeros((1, n_features), dtype=np.float32))[0]
+
+    meta = {
+        "num_cols": num_cols,
+        "cat_cols": cat_cols,
+        "categories": categories,
+        "classes": [str(c) for c in clf.classes_],
+        "n_stages": int(stages),
+        "n_raw": int(n_classes_raw),
+        "max_depth": int(max(t.max_depth for t in trees)),
+    }
+    return {
+        "meta": np.array(json.dumps(meta, ensure_ascii=False)),
+        "mean": np.ascontiguousarray(mean, dtype=np.float64),
+        "scale": np.ascontiguousarray(scale, dtype=np.float64),
+        "feature": feature,
+        "threshold": threshold,
+        "left": left,
+        "right": right,
+        "value": value,
+        "learning_rate": np.array(clf.learning_rate, dtype=np.float64),
+        "init_raw": np.ascontiguousarray(init_raw, dtype=np.float64),
+    }
+
+
+def save_compiled(arrays, path=COMPILED_PATH):
+    np.savez(path, **arrays)
+
+
+# ============================================================================
+# AVALIAÇÃO
+# ============================================================================
+class CompiledPipeline:
+    """Avaliador vetorizado dos arrays gerados por `export_pipeline`."""
+
+    def __init__(self, arrays):
+        meta = json.loads(str(arrays["meta"]))
+        self.num_cols = meta["num_cols"]
+        self.cat_cols = meta["cat_cols"]
+        self.categories = meta["categories"]
+        self.classes_ = np.array(meta["classes"], dtype=object)
+        self.n_stages = meta["n_stages"]
+        self.n_raw = meta["n_raw"]
+        self.max_depth = meta["max_depth"]
+
+        self.mean = arrays["mean"]
+        self.scale = arrays["scale"]
+        self.learning_rate = float(arrays["learning_rate"])
+        self.init_raw = arrays["init_raw"]
+
+        n_trees, max_nodes = arrays["feature"].shape
+        self.n_trees = n_trees
+        # nós de todas as árvores em vetores planos: id global = árvore * max_nodes + nó
+        self._base = (np.arange(n_trees, dtype=np.int64) * max_nodes)
+        self._feature = arrays["feature"].ravel().astype(np.int64)
+        self._threshold = arrays["threshold"].ravel()
+        self._left = arrays["left"].ravel().astype(np.int64) + np.repeat(self._base, max_nodes)
+        self._right = arrays["right"].ravel().astype(np.int64) + np.repeat(self._base, max_nodes)
+        self._value = arrays["value"].ravel()
+
+        self._offsets = np.cumsum([len(self.num_cols)] + [len(c) for c in self.categories])
+        self._cat_index = [{v: j for j, v in enumerate(cats)} for cats in self.categories]
+        self.n_features = int(self._offsets[-1])
+
+    @classmethod
+    def from_pipeline(cls, pipe):
+        return cls(export_pipeline(pipe))
+
+    @classmethod
+    def load(cls, path=COMPILED_PATH):
+        with np.load(path) as data:
+            return cls({k: data[k] for k in data.files})
+
+    # ------------------------------------------------------------------
+    # Pré-processamento
+    # ------------------------------------------------------------------
+    def encode_record(self, rec):
+        """Codifica um paciente (dict PT-BR) em uma matriz 1 × n_features."""
+        x = np.zeros((1, self.n_features), dtype=np.float64)
+        for j, c in enumerate(self.num_cols):
+            x[0, j] = (float(rec[c]) - self.mean[j]) / self.scale[j]
+        for k, c in enumerate(self.cat_cols):
+            j = self._cat_index[k].get(str(rec[c]))
+            if j is not None:  # categoria desconhecida: bloco todo zero (handle_unknown="ignore")
+                x[0, self._offsets[k] + j] = 1.0
+        return x
+
+    def transform(self, X):
+        """Equivalente ao ColumnTransformer: aceita DataFrame, dict ou lista de dicts."""
+        if isinstance(X, dict):
+            return self.encode_record(X)
+        if isinstance(X, list):
+            return np.vstack([self.encode_record(r) for r in X])
+
+        import pandas as pd  # só necessário para entradas DataFrame
+        n = len(X)
+        out = np.zeros((n, self.n_features), dtype=np.float64)
+        num = X[self.num_cols].to_numpy(dtype=np.float64)
+        out[:, :len(self.num_cols)] = (num - self.mean) / self.scale
+        rows = np.arange(n)
+        for k, c in enumerate(self.cat_cols):
+            codes = pd.Categorical(X[c].astype(str), categories=self.categories[k]).codes
+            known = codes >= 0
+            out[rows[known], self._offsets[k] + codes[known]] = 1.0
+        return out
+
+    # ------------------------------------------------------------------
+    # Árvores
+    # ------------------------------------------------------------------
+    def _leaves(self, Xt, trees=slice(None)):
+        """Id global da folha alcançada por cada linha em cada árvore selecionada."""
+        # as árvores do sklearn comparam em float32
+        flat = np.ascontiguousarray(Xt, dtype=np.float32).ravel()
+        if Xt.shape[0] == 1:  # caminho rápido de uma linha: vetores 1-D, sem broadcast
+            node = self._base[trees]
+            for _ in range(self.max_depth):
+                go_left = flat[self._feature[node]] <= self._threshold[node]
+                node = np.where(go_left, self._left[node], self._right[node])
+            return node[None, :]
+        row_base = (np.arange(Xt.shape[0], dtype=np.int64) * Xt.shape[1])[:, None]
+        node = np.broadcast_to(self._base[trees], (Xt.shape[0], len(self._base[trees]))).copy()
+        for _ in range(self.max_depth):
+            go_left = flat[row_base + self._feature[node]] <= self._threshold[node]
+            node = np.where(go_left, self._left[node], self._right[node])
+        return node
+
+    def decision_function(self, Xt):
+        """Soma bruta (raw) do ensemble para uma matriz já transformada."""
+        raw = np.empty((Xt.shape[0], self.n_raw), dtype=np.float64)
+        for start in range(0, Xt.shape[0], BLOCK_ROWS):
+            block = Xt[start:start + BLOCK_ROWS]
+            leaf_values = self._value[self._leaves(block)]
+            summed = leaf_values.reshape(len(block), self.n_stages, self.n_raw).sum(axis=1)
+            raw[start:start + BLOCK_ROWS] = self.init_raw + self.learning_rate * summed
+        return raw
+
+    def _proba_from_raw(self, raw):
+        if self.n_raw == 1:
+            p = 1.0 / (1.0 + np.exp(-raw[:, 0]))
+            return np.column_stack([1.0 - p, p])
+        e = np.exp(raw - raw.max(axis=1, keepdims=True))
+        return e / e.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, X):
+        return self._proba_from_raw(self.decision_function(self.transform(X)))
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+# ============================================================================
+# VERIFICAÇÃO DE PARIDADE
+# ============================================================================
+def check_parity(pipe, compiled, X, atol=1e-9):
+    """Compara probabilidades do Pipeline original e do motor compilado em X.
+
+    Devolve (maior diferença absoluta, fração de predições iguais).
+    """
+    p_ref = pipe.predict_proba(X)
+    p_new = compiled.predict_proba(X)
+    max_diff = float(np.abs(p_ref - p_new).max())
+    agree = float((p_ref.argmax(axis=1) == p_new.argmax(axis=1)).mean())
+    return max_diff, agree
+
+
+def _time_per_call(fn, repeat):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main(argv=None):
+    import joblib
+    import pandas as pd
+    from schema import to_pt_features
+
+    parser = argparse.ArgumentParser(description="Exporta e verifica o motor NumPy do modelo.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_exp = sub.add_parser("exportar", help="Gera o arquivo .npz a partir do pipeline")
+    p_exp.add_argument("--modelo", default=str(MODEL_PATH))
+    p_exp.add_argument("--saida", default=str(COMPILED_PATH))
+    p_ver = sub.add_parser("verificar", help="Paridade e latência contra o pipeline original")
+    p_ver.add_argument("--modelo", default=str(MODEL_PATH))
+    p_ver.add_argument("--dados", default="Obesity.csv")
+    p_ver.add_argument("--atol", type=float, default=1e-9)
+    args = parser.parse_args(argv)
+
+    pipe = joblib.load(args.modelo)
+    if args.cmd == "exportar":
+        save_compiled(export_pipeline(pipe), args.saida)
+        print("Modelo compilado salvo em", Path(args.saida).resolve())
+        return
+
+    compiled = CompiledPipeline.from_pipeline(pipe)
+    X = to_pt_features(pd.read_csv(args.dados))
+    max_diff, agree = check_parity(pipe, compiled, X, args.atol)
+    print(f"Paridade: maior diferença de probabilidade = {max_diff:.2e} | predições iguais = {agree:.2%}")
+
+    rec = X.iloc[0].to_dict()
+    row = X.iloc[[0]]
+    t_pipe = _time_per_call(lambda: pipe.predict_proba(row), 50)
+    t_comp = _time_per_call(lambda: compiled.predict_proba(rec), 500)
+    t_pipe_batch = _time_per_call(lambda: pipe.predict_proba(X), 3)
+    t_comp_batch = _time_per_call(lambda: compiled.predict_proba(X), 3)
+    print(f"1 linha:  pipeline {t_pipe * 1e6:.0f} µs | compilado {t_comp * 1e6:.0f} µs")
+    print(f"{len(X)} linhas: pipeline {t_pipe_batch * 1e3:.1f} ms | compilado {t_comp_batch * 1e3:.1f} ms")
+
+    if max_diff > args.atol or agree < 1.0:
+        sys.exit("❌ Motor compilado divergente do pipeline original.")
+    print("✅ Paridade verificada.")
+
+
+if __name__ == "__main__":
+    main()
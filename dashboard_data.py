@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Dados do painel analítico (app_dashboard.py), sem Streamlit.
+
+Colunas, rótulos dos níveis de peso e a montagem do DataFrame compacto e do
+cubo do painel. O app embrulha estas funções nos caches do Streamlit; os
+benchmarks as chamam direto, sem executar o script do painel. Nada pesado é
+importado no topo: o painel desenha o cabeçalho antes de carregar pandas.
+"""
+
+# Rótulos de exibição dos níveis de peso (classes PT-BR do dataset -> painel)
+ROTULOS_NIVEL = {
+    'Baixo_peso': 'Baixo Peso',
+    'Peso_normal': 'Peso Normal',
+    'Sobrepeso_I': 'Sobrepeso I',
+    'Sobrepeso_II': 'Sobrepeso II',
+    'Obesidade_I': 'Obesidade I',
+    'Obesidade_II': 'Obesidade II',
+    'Obesidade_III': 'Obesidade III'
+}
+NIVEIS_OBESIDADE = ['Obesidade I', 'Obesidade II', 'Obesidade III']
+
+# Colunas numéricas do painel (float32) e categóricas usadas nos filtros/gráficos
+COLUNAS_NUMERICAS = ['Idade', 'Altura', 'Peso', 'FCVC', 'NCP', 'Água por dia', 'Atividade Física', 'Tempo em Telas']
+COLUNAS_CATEGORICAS = ['Gênero', 'Histórico Familiar', 'Obesidade']
+# Variáveis agregadas no cubo (médias e mapa de correlação) e as que têm box plot
+COLUNAS_CUBO = ['Idade', 'Altura', 'Peso', 'IMC', 'FCVC', 'NCP', 'Água por dia', 'Atividade Física', 'Tempo em Telas']
+COLUNAS_BOX = ['IMC', 'Idade', 'Atividade Física']
+
+
+def load_dashboard_frame(source=None):
+    """Dataset compacto do painel: do cache colunar do Obesity.csv ou do Parquet `source`.
+
+    Categóricas ficam como códigos int8 (rótulos só no dicionário de
+    categorias), numéricas em float32, mais a coluna de IMC.
+    """
+    from dataset import load_frame, load_parquet
+    df = (load_parquet(source) if source else load_frame())[COLUNAS_CATEGORICAS + COLUNAS_NUMERICAS]
+
+    # Níveis de obesidade com rótulos do painel (renomeia só as categorias, não as linhas)
+    df['Obesidade'] = df['Obesidade'].cat.rename_categories(lambda c: ROTULOS_NIVEL.get(c, c))
+    df[COLUNAS_NUMERICAS] = df[COLUNAS_NUMERICAS].astype('float32')
+    df['IMC'] = df['Peso'] / (df['Altura'] ** 2)
+    return df
+
+
+def cube_from_frame(df):
+    """Cubo pré-agregado do painel a partir do DataFrame de `load_dashboard_frame`."""
+    from stats_cube import StatsCube
+    return StatsCube.from_frame(df, COLUNAS_CUBO, COLUNAS_BOX)
+
+
+def cube_from_parquet(source):
+    """Cubo do painel agregado pelo DuckDB direto do Parquet (ImportError sem DuckDB)."""
+    from duckdb_backend import build_cube
+    return build_cube(source, COLUNAS_CUBO, COLUNAS_BOX, class_labels=ROTULOS_NIVEL)
+
+
+def row_index(df):
+    """Índice de filtros (bitmaps por categoria e idades ordenadas) da tabela de registros."""
+    from filter_index import FilterIndex
+    return FilterIndex.from_frame(df, ['Gênero', 'Histórico Familiar'], 'Idade')
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""Acesso compartilhado ao Obesity.csv por meio de um cache colunar tipado.
+
+O CSV é lido e traduzido para o esquema PT-BR (schema.py) uma única vez; o
+resultado vai para um arquivo Arrow IPC em `.cache/` com as categóricas já
+como `category`. Treino (ml_pipeline_obesity.py) e painel (app_dashboard.py)
+carregam desse arquivo.
+
+O cache é identificado pela impressão digital do CSV (tamanho, mtime e
+SHA-256 do conteúdo). O SHA-256 só é recalculado quando tamanho ou mtime
+mudam; nesse caso, um conteúdo idêntico reaproveita o cache existente.
+
+Também lê o mesmo esquema de um dataset Parquet particionado (um arquivo, um
+diretório ou um glob), usado pelo painel quando os dados não cabem no CSV.
+
+Uso:
+    python dataset.py              # monta/valida o cache e mostra os tempos
+    python dataset.py --limpar     # remove os caches do CSV
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from schema import CAT_COLS, COL_MAP_PT, NUM_COLS, TARGET_COL, TARGET_MAP_PT, VALUE_MAPS_PT
+
+CSV_PATH = Path("Obesity.csv")
+CACHE_DIR = Path(".cache")
+# Incrementar quando a tradução/tipagem mudar, para invalidar caches antigos
+CACHE_FORMAT_VERSION = 1
+# Ordem ordinal dos níveis de peso (do menor para o maior IMC)
+TARGET_LEVELS = list(TARGET_MAP_PT.values())
+
+
+def _sha256_file(path, chunk_size=1 << 20):
+    import hashlib
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _manifest_path(csv_path, cache_dir):
+    return Path(cache_dir) / f"{Path(csv_path).stem}.manifest.json"
+
+
+def fingerprint(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Impressão digital do CSV: "<sha256[:16]>-v<formato>".
+
+    Custa um `stat` quando o arquivo não mudou (o hash fica no manifesto em
+    `cache_dir`); serve também como chave de `st.cache_data`.
+    """
+    csv_path = Path(csv_path)
+    info = os.stat(csv_path)
+    manifest = _manifest_path(csv_path, cache_dir)
+    try:
+        known = json.loads(manifest.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        known = {}
+    if known.get("tamanho") == info.st_size and known.get("mtime_ns") == info.st_mtime_ns:
+        digest = known["sha256"]
+    else:
+        digest = _sha256_file(csv_path)
+        manifest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(f"{manifest}.tmp")
+        tmp.write_text(json.dumps({
+            "origem": str(csv_path), "tamanho": info.st_size, "mtime_ns": info.st_mtime_ns, "sha256": digest,
+        }), encoding="utf-8")
+        os.replace(tmp, manifest)
+    return f"{digest[:16]}-v{CACHE_FORMAT_VERSION}"
+
+
+def parse_csv(csv_path=CSV_PATH):
+    """Lê o CSV original e devolve o DataFrame tipado no esquema PT-BR.
+
+    Numéricas em float64, categóricas e alvo como `category` (alvo ordenado
+    por nível de peso). Valores fora dos mapas de tradução são mantidos.
+    """
+    return _typed(pd.read_csv(csv_path).rename(columns=COL_MAP_PT))
+
+
+def _typed(df):
+    """Traduz e tipa um DataFrame com as colunas PT-BR (valores em inglês ou já em PT-BR)."""
+    for c in NUM_COLS:
+        df[c] = pd.to_numeric(df[c], errors="coerce").astype("float64")
+    for c in CAT_COLS:
+        mapping = VALUE_MAPS_PT.get(c, {})
+        # traduz só as categorias (uma vez por rótulo), não cada linha
+        values = df[c].astype("category").cat.rename_categories(lambda v: mapping.get(v, v))
+        df[c] = values.cat.reorder_categories(sorted(values.cat.categories))
+    if TARGET_COL in df.columns:
+        raw = df[TARGET_COL].astype("object")
+        target = raw.map(TARGET_MAP_PT).fillna(raw)
+        extra = sorted(set(target.dropna()) - set(TARGET_LEVELS))
+        df[TARGET_COL] = pd.Categorical(target, categories=TARGET_LEVELS + extra, ordered=True)
+    return df
+
+
+def parquet_files(source):
+    """Arquivos .parquet de `source` (arquivo, diretório percorrido recursivamente ou glob), ordenados."""
+    import glob
+
+    source = Path(source)
+    if source.is_dir():
+        files = source.rglob("*.parquet")
+    elif source.exists():
+        files = [source]
+    else:
+        files = glob.glob(str(source), recursive=True)
+    files = sorted(str(f) for f in files)
+    if not files:
+        raise FileNotFoundError(f"Nenhum arquivo Parquet em {source}")
+    return files
+
+
+def parquet_fingerprint(source):
+    """Impressão digital de um dataset Parquet: caminho, tamanho e mtime de cada arquivo.
+
+    Não lê o conteúdo (o dataset pode ser maior que a memória); qualquer
+    arquivo novo, removido ou regravado muda a impressão digital.
+    """
+    import hashlib
+
+    h = hashlib.sha256()
+    for f in parquet_files(source):
+        info = os.stat(f)
+        h.update(f"{f}|{info.st_size}|{info.st_mtime_ns}\n".encode("utf-8"))
+    return f"{h.hexdigest()[:16]}-v{CACHE_FORMAT_VERSION}"
+
+
+def load_parquet(source):
+    """Dataset Parquet inteiro em memória, tipado como `parse_csv` (caminho pandas)."""
+    import pyarrow.dataset as ds
+
+    table = ds.dataset(parquet_files(source), format="parquet", partitioning="hive").to_table()
+    return _typed(table.to_pandas())
+
+
+def cache_path(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    return Path(cache_dir) / f"{Path(csv_path).stem}-{fingerprint(csv_path, cache_dir)}.arrow"
+
+
+def load_frame(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """DataFrame PT-BR tipado do CSV, vindo do cache Arrow quando válido.
+
+    Sem pyarrow instalado, cai para a leitura direta do CSV.
+    """
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return parse_csv(csv_path)
+
+    path = cache_path(csv_path, cache_dir)
+    if path.exists():
+        return feather.read_table(path, memory_map=True).to_pandas()
+
+    df = parse_csv(csv_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(f"{path}.tmp")
+    feather.write_feather(df, tmp, compression="uncompressed")
+    os.replace(tmp, path)
+    # caches de versões anteriores do mesmo CSV
+    for old in path.parent.glob(f"{Path(csv_path).stem}-*.arrow"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return df
+
+
+def clear_cache(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    stem = Path(csv_path).stem
+    removed = list(Path(cache_dir).glob(f"{stem}-*.arrow")) + [_manifest_path(csv_path, cache_dir)]
+    for p in removed:
+        p.unlink(missing_ok=True)
+    return removed
+
+
+# =========================================================
+# CLI
+# =========================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cache colunar do dataset de obesidade")
+    parser.add_argument("--csv", default=str(CSV_PATH))
+    parser.add_argument("--cache-dir", default=str(CACHE_DIR))
+    parser.add_argument("--limpar", action="store_true", help="Remove o cache deste CSV e sai")
+    args = parser.parse_args(argv)
+
+    if args.limpar:
+        clear_cache(args.csv, args.cache_dir)
+        print("Cache removido.")
+        return
+
+    t0 = time.perf_counter()
+    df = load_frame(args.csv, args.cache_dir)
+    t1 = time.perf_counter()
+    load_frame(args.csv, args.cache_dir)
+    t2 = time.perf_counter()
+    print(f"Impressão digital: {fingerprint(args.csv, args.cache_dir)}")
+    print(f"Cache: {cache_path(args.csv, args.cache_dir)}")
+    print(f"{len(df)} linhas | {df.memory_usage(deep=True).sum() / 1e6:.2f} MB em memória")
+    print(f"1ª carga: {(t1 - t0) * 1000:.1f} ms | carga do cache: {(t2 - t1) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""Backend out-of-core do painel: o cubo de estatísticas é agregado pelo DuckDB.
+
+O painel só consome o `StatsCube` (stats_cube.py). Com um dataset Parquet
+particionado maior que a memória, as agregações vão para o DuckDB por
+arquivo local, e só o cubo (alguns MB) chega ao Python. Os filtros da
+sidebar viram recortes de células desse cubo. Os agregados são contagens,
+somas, produtos cruzados, histogramas e extremos por célula, numa
+varredura em streaming.
+
+O caminho pandas (DataFrame inteiro em memória + `StatsCube.from_frame`)
+continua como alternativa quando o DuckDB não está instalado.
+
+Uso:
+    python duckdb_backend.py exportar --saida dados_parquet --escala 100
+    OBESITY_PARQUET=dados_parquet streamlit run app_dashboard.py
+"""
+import argparse
+import time
+
+import numpy as np
+
+from dataset import TARGET_LEVELS, load_frame, parquet_files
+from stats_cube import CellSketches, StatsCube
+
+# Variáveis derivadas calculadas no motor (mesma fórmula do painel)
+DERIVED = {"IMC": '"Peso" / ("Altura" * "Altura")'}
+
+
+def _require_duckdb():
+    try:
+        import duckdb
+    except ImportError as exc:
+        raise ImportError("O backend out-of-core precisa do duckdb: pip install duckdb") from exc
+    return duckdb
+
+
+def _q(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _lit(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _list(values):
+    return "[" + ", ".join(_lit(v) for v in values) + "]"
+
+
+def _expr(col):
+    """Expressão float32 da coluna (mesmo tipo do DataFrame compacto do painel)."""
+    return f"CAST({DERIVED.get(col, _q(col))} AS FLOAT)"
+
+
+def build_cube(source, value_cols, sketch_cols=(), class_labels=None, bins=256, extremes=16,
+               gender_col="Gênero", age_col="Idade", family_col="Histórico Familiar", class_col="Obesidade",
+               con=None):
+    """Monta o `StatsCube` do dataset Parquet `source` com agregações no DuckDB.
+
+    Mesmo resultado de `StatsCube.from_frame` sobre o DataFrame do painel
+    (categorias ordenadas, idades em faixas exatas, valores em float32),
+    sem carregar as linhas em memória. `class_labels` renomeia os níveis
+    (ex.: rótulos de exibição).
+    """
+    duckdb = _require_duckdb()
+    con = con or duckdb.connect()
+    con.read_parquet(parquet_files(source), hive_partitioning=True).create_view("dados", replace=True)
+
+    g, h, c, age = _q(gender_col), _q(family_col), _q(class_col), _q(age_col)
+    not_null = f"{g} IS NOT NULL AND {h} IS NOT NULL AND {c} IS NOT NULL AND {age} IS NOT NULL"
+
+    # 1ª passada: categorias, faixa de idades, médias (deslocamento) e limites dos esboços
+    def distinct(col):
+        return [r[0] for r in con.execute(
+            f"SELECT DISTINCT CAST({col} AS VARCHAR) FROM dados WHERE {col} IS NOT NULL ORDER BY 1").fetchall()]
+
+    genders, families = distinct(g), distinct(h)
+    observed = set(distinct(c))
+    classes = TARGET_LEVELS + sorted(observed - set(TARGET_LEVELS))  # mesmas categorias de dataset._typed
+
+    V, S = len(value_cols), len(sketch_cols)
+    stats = con.execute(
+        f"SELECT min({age}), max({age}), "
+        + ", ".join(f"avg({_expr(v)})" for v in value_cols)
+        + "".join(f", min({_expr(v)}), max({_expr(v)})" for v in sketch_cols)
+        + f" FROM dados WHERE {not_null}"
+    ).fetchone()
+    age_lo, age_hi = int(np.floor(stats[0])), int(np.floor(stats[1]))
+    shift = np.array(stats[2:2 + V], dtype=np.float64)
+    bounds = np.array(stats[2 + V:], dtype=np.float64).reshape(S, 2) if S else np.empty((0, 2))
+    sk_lo = bounds[:, 0]
+    sk_width = np.maximum(bounds[:, 1] - sk_lo, 1e-9) / bins
+
+    dims = (len(genders), 2 * (age_hi - age_lo) + 2, len(families), len(classes))
+    n_cells = int(np.prod(dims))
+    bucket = f"(2 * (floor({age}) - {age_lo}) + CAST({age} <> floor({age}) AS INTEGER))"
+    cell = (f"((((list_position({_list(genders)}, CAST({g} AS VARCHAR)) - 1) * {dims[1]} + {bucket}) * {dims[2]}"
+            f" + list_position({_list(families)}, CAST({h} AS VARCHAR)) - 1) * {dims[3]}"
+            f" + list_position({_list(classes)}, CAST({c} AS VARCHAR)) - 1)")
+    x = [f"x{i}" for i in range(V)]
+    cells_view = (f"SELECT CAST({cell} AS BIGINT) AS cell, "
+                  + ", ".join(f"CAST({_expr(v)} AS DOUBLE) - {float(shift[i])!r} AS x{i}" for i, v in enumerate(value_cols))
+                  + "".join(f", CAST({_expr(v)} AS DOUBLE) AS y{j}" for j, v in enumerate(sketch_cols))
+                  + f" FROM dados WHERE {not_null}")
+    con.execute(f"CREATE OR REPLACE TEMP VIEW celulas AS {cells_view}")
+
+    # 2ª passada: contagem, somas e produtos cruzados (deslocados) e extremos por célula
+    pairs = [(i, j) for i in range(V) for j in range(i, V)]
+    moments = con.execute(
+        "SELECT cell, count(*), "
+        + ", ".join(f"sum({xi})" for xi in x) + ", "
+        + ", ".join(f"sum(x{i} * x{j})" for i, j in pairs)
+        + "".join(f", min(y{j}, {extremes}), max(y{j}, {extremes})" for j in range(S))
+        + " FROM celulas GROUP BY cell"
+    ).fetchall()
+
+    n = np.zeros(n_cells, dtype=np.int64)
+    s = np.zeros((n_cells, V))
+    xx = np.zeros((n_cells, V, V))
+    lows = np.full((n_cells, S, extremes), np.nan)
+    highs = np.full((n_cells, S, extremes), np.nan)
+    for row in moments:
+        k = row[0]
+        n[k] = row[1]
+        s[k] = row[2:2 + V]
+        for (i, j), v in zip(pairs, row[2 + V:2 + V + len(pairs)]):
+            xx[k, i, j] = xx[k, j, i] = v
+        ext = row[2 + V + len(pairs):]
+        for j in range(S):
+            lo_vals, hi_vals = ext[2 * j], ext[2 * j + 1]
+            lows[k, j, :len(lo_vals)] = lo_vals
+            highs[k, j, :len(hi_vals)] = hi_vals
+
+    # 3ª passada: histogramas dos esboços
+    hist = np.zeros((n_cells, S, bins), dtype=np.int32)
+    for j in range(S):
+        b = f"least(CAST(floor((y{j} - {float(sk_lo[j])!r}) / {float(sk_width[j])!r}) AS BIGINT), {bins - 1})"
+        counts = con.execute(f"SELECT cell, {b} AS b, count(*) FROM celulas GROUP BY ALL").fetchnumpy()
+        hist[counts["cell"], j, counts["b"]] = counts["count_star()"]
+
+    sketches = None
+    if S:
+        sketches = CellSketches(tuple(sketch_cols), sk_lo, sk_width, extremes,
+                                hist.reshape(dims + (S, bins)),
+                                lows.reshape(dims + (S, extremes)), highs.reshape(dims + (S, extremes)))
+    if class_labels:
+        classes = [class_labels.get(v, v) for v in classes]
+    return StatsCube(genders, families, classes, value_cols, age_lo, age_hi,
+                     n.reshape(dims), s.reshape(dims + (V,)), xx.reshape(dims + (V, V)), shift, sketches)
+
+
+def export_parquet(dest, scale=1, partition_by=("Obesidade",), con=None):
+    """Grava o dataset (replicado `scale` vezes) como Parquet particionado em `dest`."""
+    duckdb = _require_duckdb()
+    con = con or duckdb.connect()
+    df = load_frame()
+    con.register("origem", df)
+    cols = ", ".join(_q(col) for col in df.columns)
+    parts = ", ".join(_q(col) for col in partition_by)
+    con.execute(
+        f"COPY (SELECT {cols} FROM origem, range({int(scale)})) TO {_lit(dest)} "
+        f"(FORMAT PARQUET, PARTITION_BY ({parts}), OVERWRITE_OR_IGNORE)"
+    )
+    return len(df) * int(scale)
+
+
+# =========================================================
+# CLI
+# =========================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backend DuckDB do painel analítico")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_exp = sub.add_parser("exportar", help="Gera um dataset Parquet particionado a partir do Obesity.csv")
+    p_exp.add_argument("--saida", default="dados_parquet")
+    p_exp.add_argument("--escala", type=int, default=1, help="Quantas vezes replicar o dataset")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "exportar":
+        t0 = time.perf_counter()
+        n = export_parquet(args.saida, args.escala)
+        print(f"{n:,} linhas gravadas em {args.saida} ({time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""Inferência com saída antecipada sobre os estágios do Gradient Boosting.
+
+Cada estágio soma, à pontuação bruta de cada classe, o valor de uma folha
+da árvore daquela classe. Para cada estágio e classe, o maior e o menor
+valor de folha alcançável limitam o quanto a pontuação ainda pode subir ou
+descer. As somas desses limites do estágio s até o fim dizem se a classe no
+topo ainda pode ser ultrapassada:
+
+    raw[topo] + Σ mínimo[topo] > raw[j] + Σ máximo[j]   para toda classe j ≠ topo
+
+Quando a desigualdade vale, a linha para de descer árvores e a classe
+prevista é exatamente a da avaliação completa. As probabilidades são as do
+ponto de parada, não as calibradas do modelo: por isso o método se chama
+`predict_proba_partial`. A verificação é feita a cada `check_every`
+estágios sobre blocos de linhas (caminho vetorizado de
+`compiled_model.CompiledPipeline`) e a cada `row_check_every` estágios no
+caminho 1-D de uma linha sozinha. `bound_scale` < 1 encolhe os limites
+(parada mais cedo, sem a garantia de predição idêntica).
+
+Uso:
+    python early_exit.py --modelo obesity_pipeline.pkl --dados Obesity.csv --passo 10
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from compiled_model import BLOCK_ROWS, MODEL_PATH, CompiledPipeline
+
+
+def _stage_bounds(compiled):
+    """(maior, menor) valor de folha alcançável × learning rate, por estágio e classe."""
+    # desce todos os caminhos a partir das raízes: depois de max_depth passos só restam folhas
+    nodes = compiled._base[:, None]
+    for _ in range(compiled.max_depth):
+        nodes = np.concatenate([compiled._left[nodes], compiled._right[nodes]], axis=1)
+    values = compiled._value[nodes] * compiled.learning_rate
+    shape = (compiled.n_stages, compiled.n_raw)
+    return values.max(axis=1).reshape(shape), values.min(axis=1).reshape(shape)
+
+
+def _suffix_sums(per_stage):
+    """Linha s = soma dos estágios s…fim; a última linha (nenhum estágio restante) é zero."""
+    out = np.zeros((per_stage.shape[0] + 1, per_stage.shape[1]))
+    out[:-1] = np.cumsum(per_stage[::-1], axis=0)[::-1]
+    return out
+
+
+class EarlyExitModel:
+    """Avaliação adaptativa de um `CompiledPipeline`: para cada linha, só os estágios necessários."""
+
+    def __init__(self, compiled, check_every=10, bound_scale=1.0, row_check_every=25):
+        self.compiled = compiled
+        self.classes_ = compiled.classes_
+        self.check_every = int(check_every)
+        self.row_check_every = int(row_check_every)
+        hi, lo = _stage_bounds(compiled)
+        self._rest_hi = bound_scale * _suffix_sums(hi)
+        self._rest_lo = bound_scale * _suffix_sums(lo)
+
+    @classmethod
+    def from_pipeline(cls, pipe, **kwargs):
+        return cls(CompiledPipeline.from_pipeline(pipe), **kwargs)
+
+    def _settled(self, raw, stage):
+        """Linhas cuja classe prevista não muda mais com os estágios restantes."""
+        hi, lo = self._rest_hi[stage], self._rest_lo[stage]
+        if raw.shape[1] == 1:  # binário: o sinal da pontuação decide
+            return (raw[:, 0] + lo[0] > 0) | (raw[:, 0] + hi[0] < 0)
+        rows = np.arange(len(raw))
+        top = raw.argmax(axis=1)
+        floor = raw[rows, top] + lo[top]
+        ceiling = raw + hi
+        ceiling[rows, top] = -np.inf
+        return floor > ceiling.max(axis=1)
+
+    def _row(self, x):
+        """Caminho de uma linha: vetores 1-D, sem máscaras de linhas ativas.
+
+        Cada bloco de estágios custa um número fixo de chamadas NumPy, então
+        a linha é verificada a cada `row_check_every` estágios (mais espaçado
+        que em lote).
+        """
+        c, K = self.compiled, self.compiled.n_raw
+        flat = np.ascontiguousarray(x, dtype=np.float32).ravel()
+        raw = c.init_raw.copy()
+        for start in range(0, c.n_stages, self.row_check_every):
+            if start:
+                hi, lo = self._rest_hi[start], self._rest_lo[start]
+                if K == 1:
+                    if raw[0] + lo[0] > 0 or raw[0] + hi[0] < 0:
+                        return raw, start
+                else:
+                    top = int(raw.argmax())
+                    ceiling = raw + hi
+                    ceiling[top] = -np.inf
+                    if raw[top] + lo[top] > ceiling.max():
+                        return raw, start
+            stop = min(start + self.row_check_every, c.n_stages)
+            node = c._base[start * K:stop * K]
+            for _ in range(c.max_depth):
+                node = np.where(flat[c._feature[node]] <= c._threshold[node], c._left[node], c._right[node])
+            raw += c.learning_rate * c._value[node].reshape(-1, K).sum(axis=0)
+        return raw, c.n_stages
+
+    def _block(self, Xt):
+        c, K = self.compiled, self.compiled.n_raw
+        if len(Xt) == 1:
+            raw, stages = self._row(Xt)
+            return raw[None, :], np.array([stages])
+        raw = np.tile(c.init_raw, (len(Xt), 1))
+        stages = np.full(len(Xt), c.n_stages)
+        active = np.arange(len(Xt))
+        for start in range(0, c.n_stages, self.check_every):
+            if start:
+                done = self._settled(raw[active], start)
+                stages[active[done]] = start
+                active = active[~done]
+                if not len(active):
+                    break
+            stop = min(start + self.check_every, c.n_stages)
+            leaves = c._leaves(Xt[active], slice(start * K, stop * K))
+            raw[active] += c.learning_rate * c._value[leaves].reshape(len(active), stop - start, K).sum(axis=1)
+        return raw, stages
+
+    def decision_function(self, Xt):
+        """(pontuação bruta no ponto de parada, estágios avaliados) para uma matriz já transformada."""
+        raw = np.empty((Xt.shape[0], self.compiled.n_raw))
+        stages = np.empty(Xt.shape[0], dtype=np.int64)
+        for start in range(0, Xt.shape[0], BLOCK_ROWS):
+            raw[start:start + BLOCK_ROWS], stages[start:start + BLOCK_ROWS] = self._block(Xt[start:start + BLOCK_ROWS])
+        return raw, stages
+
+    def evaluate(self, X):
+        """(probabilidades, estágios avaliados por linha); `X` pode ser um dict, lista de dicts ou DataFrame."""
+        raw, stages = self.decision_function(self.compiled.transform(X))
+        return self.compiled._proba_from_raw(raw), stages
+
+    def predict_proba_partial(self, X):
+        """Probabilidades no ponto de parada (não calibradas): use `compiled.predict_proba` para as finais."""
+        return self.evaluate(X)[0]
+
+    def predict(self, X):
+        raw, _ = self.decision_function(self.compiled.transform(X))
+        if raw.shape[1] == 1:
+            return self.classes_[(raw[:, 0] > 0).astype(int)]
+        return self.classes_[raw.argmax(axis=1)]
+
+
+# ============================================================================
+# VERIFICAÇÃO
+# ============================================================================
+def check_agreement(model, X, single_rows=200):
+    """Concordância com a avaliação completa e árvores avaliadas, em `X`.
+
+    Além do lote, até `single_rows` linhas são avaliadas uma a uma (caminho 1-D).
+    """
+    full = model.compiled.predict_proba(X)
+    proba, stages = model.evaluate(X)
+    trees = stages * model.compiled.n_raw
+    pred = model.classes_[full.argmax(axis=1)]
+    Xt = model.compiled.transform(X)
+    sample = np.linspace(0, len(X) - 1, min(single_rows, len(X))).astype(int)
+    row_results = [model._row(Xt[i:i + 1]) for i in sample]
+    row_pred = np.array([raw.argmax() for raw, _ in row_results])
+    return {
+        "concordancia": float((proba.argmax(axis=1) == full.argmax(axis=1)).mean()),
+        "concordancia_1_linha": float((row_pred == full[sample].argmax(axis=1)).mean()),
+        "arvores_media_1_linha": float(np.mean([st for _, st in row_results]) * model.compiled.n_raw),
+        "maior_diferenca_proba": float(np.abs(proba - full).max()),
+        "arvores_media": float(trees.mean()),
+        "arvores_total": model.compiled.n_trees,
+        "saida_antecipada": float((stages < model.compiled.n_stages).mean()),
+        "arvores_por_classe": {str(c): float(trees[pred == c].mean()) for c in model.classes_ if (pred == c).any()},
+    }
+
+
+def _time_per_call(fn, repeat):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main(argv=None):
+    import joblib
+    import pandas as pd
+    from schema import to_pt_features
+
+    parser = argparse.ArgumentParser(description="Saída antecipada: árvores avaliadas e concordância com o modelo completo.")
+    parser.add_argument("--modelo", default=str(MODEL_PATH))
+    parser.add_argument("--dados", default="Obesity.csv", help="CSV com as 16 features (ex.: gerado por synthetic_data.py)")
+    parser.add_argument("--passo", type=int, default=10, help="Estágios entre verificações da margem")
+    parser.add_argument("--passo-linha", type=int, default=25,
+                        help="Estágios entre verificações no caminho de uma linha")
+    parser.add_argument("--fator", type=float, default=1.0,
+                        help="Escala dos limites restantes (1.0 = predição idêntica garantida)")
+    args = parser.parse_args(argv)
+
+    model = EarlyExitModel.from_pipeline(joblib.load(args.modelo), check_every=args.passo, bound_scale=args.fator,
+                                         row_check_every=args.passo_linha)
+    X = to_pt_features(pd.read_csv(args.dados))
+    stats = check_agreement(model, X)
+    print(f"Árvores avaliadas: {stats['arvores_media']:.0f} de {stats['arvores_total']} em média "
+          f"| {stats['saida_antecipada']:.1%} das linhas param antes do fim")
+    for cls, trees in stats["arvores_por_classe"].items():
+        print(f"  {cls:<14} {trees:6.0f} árvores")
+    print(f"Concordância com a avaliação completa: {stats['concordancia']:.4%} "
+          f"| maior diferença de probabilidade {stats['maior_diferenca_proba']:.3f}")
+
+    rec = X.iloc[0].to_dict()
+    t_full = _time_per_call(lambda: model.compiled.predict(rec), 500)
+    t_early = _time_per_call(lambda: model.predict(rec), 500)
+    t_full_batch = _time_per_call(lambda: model.compiled.predict(X), 3)
+    t_early_batch = _time_per_call(lambda: model.predict(X), 3)
+    print(f"1 linha:  completo {t_full * 1e6:.0f} µs | antecipado {t_early * 1e6:.0f} µs "
+          f"| {stats['arvores_media_1_linha']:.0f} árvores | concordância {stats['concordancia_1_linha']:.2%}")
+    print(f"{len(X)} linhas: completo {t_full_batch * 1e3:.1f} ms | antecipado {t_early_batch * 1e3:.1f} ms")
+
+    if args.fator >= 1.0 and min(stats["concordancia"], stats["concordancia_1_linha"]) < 1.0:
+        sys.exit("❌ Saída antecipada mudou alguma predição.")
+    print("✅ Verificação concluída.")
+
+
+if __name__ == "__main__":
+    main()
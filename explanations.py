@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Contribuições por campo do formulário para cada predição (método de caminhos de Saabas).
+
+Em cada árvore do GradientBoostingClassifier, o valor esperado de um nó é a
+média ponderada das folhas abaixo dele. Ao descer de um nó para o filho, a
+variação desse valor esperado é atribuída à feature da divisão. Somando
+todos os passos de todas as árvores:
+
+    raw[classe] = viés[classe] + Σ contribuições[classe, campo]
+
+é exatamente o `decision_function` do modelo. As colunas do one-hot são
+somadas no campo PT-BR de origem (ex.: todas as `Transporte_*` em
+"Transporte"). A travessia reaproveita os arrays planos de
+`compiled_model.CompiledPipeline`: todas as árvores são percorridas ao mesmo
+tempo, nível a nível, também para lotes.
+
+Uso:
+    python explanations.py --modelo obesity_pipeline.pkl --dados Obesity.csv
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from compiled_model import BLOCK_ROWS, MODEL_PATH, CompiledPipeline
+
+
+def _expected_values(clf, max_nodes):
+    """Valor esperado de cada nó (folhas: valor final; nós internos: média ponderada dos filhos)."""
+    trees = [est.tree_ for est in clf.estimators_.ravel()]
+    expected = np.zeros((len(trees), max_nodes), dtype=np.float64)
+    for i, tree in enumerate(trees):
+        n = tree.node_count
+        value = tree.value[:n, 0, 0].astype(np.float64)
+        weight = tree.weighted_n_node_samples[:n]
+        left, right = tree.children_left[:n], tree.children_right[:n]
+        # filhos sempre têm id maior que o pai: de trás para frente, os filhos já estão prontos
+        for node in range(n - 1, -1, -1):
+            if left[node] != -1:
+                wl, wr = weight[left[node]], weight[right[node]]
+                value[node] = (wl * value[left[node]] + wr * value[right[node]]) / (wl + wr)
+        expected[i, :n] = value
+    return expected
+
+
+class TreeExplainer:
+    """Contribuições de Saabas vetorizadas sobre um `CompiledPipeline`."""
+
+    def __init__(self, compiled, expected):
+        self.compiled = compiled
+        self.fields = list(compiled.num_cols) + list(compiled.cat_cols)
+        self.classes_ = compiled.classes_
+        self._expected = expected.ravel()
+        # campo do formulário de cada coluna transformada (numéricas 1:1, one-hot por bloco)
+        widths = [1] * len(compiled.num_cols) + [len(c) for c in compiled.categories]
+        self._field_of_column = np.repeat(np.arange(len(self.fields)), widths)
+        self._tree_class = np.arange(compiled.n_trees) % compiled.n_raw  # árvore t = estágio * K + classe
+        roots = expected[:, 0].reshape(compiled.n_stages, compiled.n_raw).sum(axis=0)
+        self.bias = compiled.init_raw + compiled.learning_rate * roots
+
+    @classmethod
+    def from_pipeline(cls, pipe):
+        """Explicador do Pipeline treinado; ValueError se o estimador não for um GradientBoostingClassifier."""
+        compiled = CompiledPipeline.from_pipeline(pipe)
+        max_nodes = len(compiled._feature) // compiled.n_trees
+        return cls(compiled, _expected_values(pipe.named_steps["clf"], max_nodes))
+
+    def _block(self, Xt):
+        """Contribuições brutas (linhas × classes × campos) de um bloco já transformado."""
+        c = self.compiled
+        n, K, F = Xt.shape[0], c.n_raw, len(self.fields)
+        flat = np.ascontiguousarray(Xt, dtype=np.float32).ravel()  # as árvores comparam em float32
+        row_base = (np.arange(n, dtype=np.int64) * Xt.shape[1])[:, None]
+        cell_base = (np.arange(n, dtype=np.int64) * K)[:, None] + self._tree_class
+        node = np.broadcast_to(c._base, (n, c.n_trees)).copy()
+        acc = np.zeros(n * K * F, dtype=np.float64)
+        for _ in range(c.max_depth):
+            feature = c._feature[node]
+            go_left = flat[row_base + feature] <= c._threshold[node]
+            child = np.where(go_left, c._left[node], c._right[node])
+            # folhas apontam para si mesmas: variação zero depois de chegar na folha
+            delta = self._expected[child] - self._expected[node]
+            index = cell_base * F + self._field_of_column[feature]
+            acc += np.bincount(index.ravel(), weights=delta.ravel(), minlength=acc.size)
+            node = child
+        return c.learning_rate * acc.reshape(n, K, F)
+
+    def contributions(self, X):
+        """Contribuições ao raw score de cada classe, por campo: array (linhas × classes × campos).
+
+        `X` pode ser um dict (um paciente), lista de dicts ou DataFrame com as 16 features.
+        """
+        Xt = self.compiled.transform(X)
+        out = np.empty((Xt.shape[0], self.compiled.n_raw, len(self.fields)), dtype=np.float64)
+        for start in range(0, Xt.shape[0], BLOCK_ROWS):
+            out[start:start + BLOCK_ROWS] = self._block(Xt[start:start + BLOCK_ROWS])
+        return out
+
+    def explain(self, rec):
+        """Um paciente: {campo: contribuição} para cada classe, do maior efeito absoluto ao menor."""
+        contrib = self.contributions(rec)[0]
+        return {
+            str(cls): dict(sorted(zip(self.fields, contrib[k].tolist()), key=lambda kv: -abs(kv[1])))
+            for k, cls in enumerate(self.classes_)
+        }
+
+
+# ============================================================================
+# VERIFICAÇÃO
+# ============================================================================
+def check_additivity(explainer, X):
+    """Maior diferença entre viés + Σ contribuições e o decision_function compilado."""
+    raw = explainer.compiled.decision_function(explainer.compiled.transform(X))
+    rebuilt = explainer.bias + explainer.contributions(X).sum(axis=2)
+    return float(np.abs(raw - rebuilt).max())
+
+
+def main(argv=None):
+    import joblib
+    import pandas as pd
+    from schema import to_pt_features
+
+    parser = argparse.ArgumentParser(description="Verifica aditividade e latência das contribuições por campo.")
+    parser.add_argument("--modelo", default=str(MODEL_PATH))
+    parser.add_argument("--dados", default="Obesity.csv")
+    parser.add_argument("--atol", type=float, default=1e-9)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    explainer = TreeExplainer.from_pipeline(joblib.load(args.modelo))
+    t_build = time.perf_counter() - t0
+    X = to_pt_features(pd.read_csv(args.dados))
+    max_diff = check_additivity(explainer, X)
+    print(f"Aditividade: maior diferença |viés + Σ contribuições - raw| = {max_diff:.2e} (montagem {t_build * 1e3:.0f} ms)")
+
+    rec = X.iloc[0].to_dict()
+    explainer.explain(rec)
+    t0 = time.perf_counter()
+    for _ in range(200):
+        explainer.explain(rec)
+    t_one = (time.perf_counter() - t0) / 200
+    t0 = time.perf_counter()
+    explainer.contributions(X)
+    t_batch = time.perf_counter() - t0
+    print(f"1 paciente: {t_one * 1e3:.2f} ms | {len(X)} pacientes: {t_batch * 1e3:.0f} ms")
+
+    if max_diff > args.atol:
+        sys.exit("❌ Contribuições não somam o raw score do modelo.")
+    print("✅ Contribuições aditivas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Índice dos filtros da sidebar para seleções por linha.
+
+Os gráficos do painel saem do cubo (stats_cube.py), mas a tabela e o
+download dos registros filtrados precisam das linhas. Em vez de três
+comparações em colunas inteiras e de um DataFrame copiado a cada rerun,
+o índice é montado uma vez na carga:
+    - um bitmap (1 bit por linha, em palavras uint64) por valor de cada
+      coluna categórica;
+    - a permutação que ordena a idade e as idades ordenadas.
+Um filtro vira OR dos bitmaps dos valores escolhidos, AND entre colunas,
+dois `searchsorted` para a faixa de idade e, no fim, um vetor de índices
+de linha (`df.take`/`iloc` só quando alguém consome as linhas).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+
+def _indices(words, n_rows):
+    """Índices dos bits ligados; só as palavras não nulas são desempacotadas."""
+    nz = np.flatnonzero(words)
+    if len(nz) > len(words) // 2:
+        return np.flatnonzero(np.unpackbits(words.view(np.uint8), count=n_rows, bitorder="little"))
+    bits = np.flatnonzero(np.unpackbits(words[nz].view(np.uint8), bitorder="little"))
+    return nz[bits >> 6] * 64 + (bits & 63)
+
+
+def _popcount(words):
+    """Bits ligados no bitmap (`np.bitwise_count` só existe a partir do NumPy 2.0)."""
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(words).sum())
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+
+def _pack(mask):
+    """Bitmap de uma máscara booleana em palavras uint64 (bit i = linha i)."""
+    packed = np.packbits(mask, bitorder="little")
+    packed = np.pad(packed, (0, -len(packed) % 8))
+    return packed.view(np.uint64)
+
+
+@dataclass(frozen=True)
+class FilterIndex:
+    """Bitmaps por categoria e permutação ordenada da coluna de faixa (`range_col`)."""
+
+    n_rows: int
+    bitmaps: dict
+    range_col: str
+    order: np.ndarray
+    sorted_values: np.ndarray
+    complete: frozenset = frozenset()  # colunas sem valores ausentes
+
+    @classmethod
+    def from_frame(cls, df, cat_cols=("Gênero", "Histórico Familiar"), range_col="Idade"):
+        """Monta o índice de `df` (categóricas em `category`)."""
+        bitmaps, complete = {}, set()
+        for col in cat_cols:
+            codes = df[col].cat.codes.to_numpy()
+            bitmaps[col] = {value: _pack(codes == k) for k, value in enumerate(df[col].cat.categories)}
+            if (codes >= 0).all():
+                complete.add(col)
+        values = df[range_col].to_numpy()
+        order = np.argsort(values, kind="stable").astype(np.int32 if len(df) < 2**31 else np.int64)
+        return cls(len(df), bitmaps, range_col, order, values[order], frozenset(complete))
+
+    @property
+    def nbytes(self):
+        bits = sum(w.nbytes for col in self.bitmaps.values() for w in col.values())
+        return bits + self.order.nbytes + self.sorted_values.nbytes
+
+    def _range_words(self, lo, hi):
+        """Bitmap de `lo <= valor <= hi` a partir da permutação ordenada (None = todas as linhas)."""
+        # limites no dtype da coluna: um int Python faria o NumPy converter o vetor inteiro
+        lo, hi = self.sorted_values.dtype.type(lo), self.sorted_values.dtype.type(hi)
+        a = int(np.searchsorted(self.sorted_values, lo, side="left"))
+        b = int(np.searchsorted(self.sorted_values, hi, side="right"))
+        if a == 0 and b == self.n_rows:
+            return None
+        # marca o lado menor da permutação (dentro ou fora da faixa)
+        if b - a <= self.n_rows // 2:
+            mask = np.zeros(self.n_rows, dtype=bool)
+            mask[self.order[a:b]] = True
+        else:
+            mask = np.ones(self.n_rows, dtype=bool)
+            mask[self.order[:a]] = False
+            mask[self.order[b:]] = False
+        return _pack(mask)
+
+    def _words(self, filters, value_range):
+        """Bitmap da seleção, ou None quando nenhum filtro restringe."""
+        result = None
+        for col, values in filters.items():
+            column = self.bitmaps[col]
+            chosen = [column[v] for v in dict.fromkeys(values) if v in column]
+            if len(chosen) == len(column) and col in self.complete:
+                continue  # todos os valores: a coluna não restringe
+            words = np.bitwise_or.reduce(chosen) if chosen else np.zeros_like(next(iter(column.values())))
+            result = words if result is None else np.bitwise_and(result, words, out=result)
+        if value_range is not None:
+            words = self._range_words(*value_range)
+            if words is not None:
+                result = words if result is None else np.bitwise_and(result, words, out=result)
+        return result
+
+    def words(self, filters, value_range=None):
+        """Bitmap da seleção: `filters` = {coluna: valores aceitos}, `value_range` = (lo, hi) inclusivo."""
+        result = self._words(filters, value_range)
+        return _pack(np.ones(self.n_rows, dtype=bool)) if result is None else result
+
+    def count(self, filters, value_range=None):
+        """Número de linhas selecionadas (popcount, sem materializar índices)."""
+        words = self._words(filters, value_range)
+        return self.n_rows if words is None else _popcount(words)
+
+    def select(self, filters, value_range=None):
+        """Índices (crescentes) das linhas selecionadas."""
+        words = self._words(filters, value_range)
+        return np.arange(self.n_rows) if words is None else _indices(words, self.n_rows)
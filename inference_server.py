@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""Servidor HTTP local de inferência com micro-batching.
+
+Requisições concorrentes ficam numa fila por alguns milissegundos e são
+pontuadas juntas em uma única chamada a predict_proba; o custo fixo do
+Pipeline/ColumnTransformer é pago uma vez por lote, não por paciente.
+
+Uso:
+    python inference_server.py serve --porta 8600 --max-batch-size 64 --max-wait-ms 5
+    python inference_server.py serve --saida-antecipada   # só a classe, com saída antecipada
+    python inference_server.py bench --url http://127.0.0.1:8600 --concorrencia 32 --requisicoes 2000
+
+Endpoints:
+    POST /predict  -> um paciente (dict PT-BR) ou uma lista de pacientes
+    GET  /stats    -> relatório de latência e vazão
+    GET  /health
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+import urllib.request
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from early_exit import EarlyExitModel
+from schema import FEATURE_COLS, to_pt_features, validate_record
+
+MODEL_PATH = Path("obesity_pipeline.pkl")
+
+EXEMPLO_PACIENTE = {
+    "Gênero": "Masculino", "Idade": 23.0, "Altura": 1.70, "Peso": 70.0,
+    "Histórico Familiar": "Sim", "FAVC": "Sim", "FCVC": 2.0, "NCP": 3.0,
+    "CAEC": "Às vezes", "Fuma": "Não", "Água por dia": 2.0, "Conta Calorias": "Não",
+    "Atividade Física": 1.0, "Tempo em Telas": 1.0, "Álcool": "Não", "Transporte": "Transporte público"
+}
+
+
+# ============================================================================
+# ESTATÍSTICAS
+# ============================================================================
+class ServerStats:
+    """Latências por requisição (janela limitada) e tamanhos de lote."""
+
+    def __init__(self, window=10_000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._batch_sizes = deque(maxlen=window)
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+
+    def record_request(self, seconds, n_rows):
+        with self._lock:
+            self._latencies.append(seconds)
+            self.requests += 1
+            self.rows += n_rows
+
+    def record_batch(self, n_rows):
+        with self._lock:
+            self._batch_sizes.append(n_rows)
+            self.batches += 1
+
+    def report(self):
+        with self._lock:
+            lat = np.array(self._latencies) * 1000
+            sizes = np.array(self._batch_sizes)
+            elapsed = time.perf_counter() - self.started
+            report = {
+                "requisicoes": self.requests,
+                "linhas": self.rows,
+                "lotes": self.batches,
+                "lote_medio": float(sizes.mean()) if sizes.size else 0.0,
+                "lote_maximo": int(sizes.max()) if sizes.size else 0,
+                "vazao_req_s": self.requests / elapsed if elapsed else 0.0,
+                "vazao_linhas_s": self.rows / elapsed if elapsed else 0.0,
+            }
+            for q in (50, 95, 99):
+                report[f"latencia_p{q}_ms"] = float(np.percentile(lat, q)) if lat.size else 0.0
+            return report
+
+
+# ============================================================================
+# MICRO-BATCHING
+# ============================================================================
+class MicroBatcher:
+    """Agrupa pacientes de requisições concorrentes em uma única chamada a predict_proba.
+
+    O lote é fechado quando atinge `max_batch_size` linhas ou quando o primeiro
+    item da fila esperou `max_wait_ms`, o que ocorrer primeiro.
+    """
+
+    def __init__(self, model, max_batch_size=64, max_wait_ms=5.0, stats=None):
+        self.model = model
+        self.classes = [str(c) for c in model.classes_]
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = stats or ServerStats()
+        self._queue = queue.Queue()
+        self._carry = None  # item que não coube no lote anterior
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, records):
+        """Enfileira uma lista de pacientes; devolve um Future com a lista de resultados.
+
+        Listas maiores que `max_batch_size` entram na fila em pedaços de até
+        `max_batch_size` linhas; o Future junta os resultados na ordem.
+        """
+        parts = []
+        for start in range(0, len(records), self.max_batch_size):
+            fut = Future()
+            self._queue.put((records[start:start + self.max_batch_size], fut))
+            parts.append(fut)
+        if len(parts) == 1:
+            return parts[0]
+
+        combined, lock, remaining = Future(), threading.Lock(), [len(parts)]
+
+        def part_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            failed = next((p.exception() for p in parts if p.exception() is not None), None)
+            if failed is not None:
+                combined.set_exception(failed)
+            else:
+                combined.set_result([r for p in parts for r in p.result()])
+
+        for fut in parts:
+            fut.add_done_callback(part_done)
+        return combined
+
+    def _collect(self):
+        """Próximo lote: no máximo `max_batch_size` linhas; o item que não cabe abre o lote seguinte."""
+        first, self._carry = (self._carry, None) if self._carry else (self._queue.get(), None)
+        items = [first]
+        n_rows = len(first[0])
+        deadline = time.perf_counter() + self.max_wait
+        while n_rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if n_rows + len(item[0]) > self.max_batch_size:
+                self._carry = item
+                break
+            items.append(item)
+            n_rows += len(item[0])
+        return items, n_rows
+
+    def _score(self, records):
+        X = to_pt_features(pd.DataFrame.from_records(records, columns=FEATURE_COLS))
+        if isinstance(self.model, EarlyExitModel):
+            # só a classe: as probabilidades do ponto de parada não são as calibradas
+            proba, stages = self.model.evaluate(X)
+            best = proba.argmax(axis=1)
+            trees = stages * self.model.compiled.n_raw
+            return [{"predicao": self.classes[best[i]], "arvores_avaliadas": int(trees[i])} for i in range(len(records))]
+        proba = self.model.predict_proba(X)
+        best = proba.argmax(axis=1)
+        return [
+            {
+                "predicao": self.classes[best[i]],
+                "probabilidades": dict(zip(self.classes, proba[i].round(6).tolist())),
+            }
+            for i in range(len(records))
+        ]
+
+    def _loop(self):
+        while True:
+            items, n_rows = self._collect()
+            records = [rec for recs, _ in items for rec in recs]
+            try:
+                results = self._score(records)
+            except Exception:
+                # falha do lote: pontua cada requisição sozinha, para só a culpada receber o erro
+                for recs, fut in items:
+                    try:
+                        fut.set_result(self._score(recs))
+                    except Exception as exc:
+                        fut.set_exception(exc)
+                self.stats.record_batch(n_rows)
+                continue
+            self.stats.record_batch(n_rows)
+
+            start = 0
+            for recs, fut in items:
+                end = start + len(recs)
+                fut.set_result(results[start:end])
+                start = end
+
+
+# ============================================================================
+# HTTP
+# ============================================================================
+class InferenceHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # o padrão (5) derruba conexões sob concorrência alta
+
+
+def make_handler(batcher):
+    class InferenceHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/stats":
+                self._send_json(200, batcher.stats.report())
+            else:
+                self._send_json(404, {"erro": "rota inexistente"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send_json(404, {"erro": "rota inexistente"})
+                return
+            t0 = time.perf_counter()
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"null")
+            except (ValueError, json.JSONDecodeError):
+                self._send_json(400, {"erro": "JSON inválido"})
+                return
+
+            single = isinstance(payload, dict)
+            records = [payload] if single else payload
+            if not isinstance(records, list) or not records or not all(isinstance(r, dict) for r in records):
+                self._send_json(400, {"erro": "envie um paciente (objeto) ou uma lista de pacientes"})
+                return
+            erros = {i: e for i, e in ((i, validate_record(r)) for i, r in enumerate(records)) if e}
+            if erros:
+                self._send_json(400, {"erro": "dados inválidos", "detalhes": erros})
+                return
+
+            try:
+                results = batcher.submit(records).result()
+            except Exception as exc:
+                self._send_json(500, {"erro": str(exc)})
+                return
+            batcher.stats.record_request(time.perf_counter() - t0, len(records))
+            self._send_json(200, results[0] if single else results)
+
+        def log_message(self, format, *args):  # silencia o log por requisição
+            pass
+
+    return InferenceHandler
+
+
+def serve(host="127.0.0.1", port=8600, model_path=MODEL_PATH, max_batch_size=64, max_wait_ms=5.0, early_exit=False):
+    model = joblib.load(model_path)
+    if early_exit:
+        model = EarlyExitModel.from_pipeline(model)
+    batcher = MicroBatcher(model, max_batch_size, max_wait_ms)
+    server = InferenceHTTPServer((host, port), make_handler(batcher))
+    print(f"Servidor de inferência em http://{host}:{port} "
+          f"(max_batch_size={max_batch_size}, max_wait_ms={max_wait_ms}"
+          f"{', saída antecipada' if early_exit else ''})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(batcher.stats.report(), indent=2, ensure_ascii=False))
+
+
+# ============================================================================
+# CARGA DE TESTE
+# ============================================================================
+def bench(url, concurrency=32, n_requests=2000):
+    """Dispara requisições concorrentes de um paciente e devolve o relatório do cliente."""
+    body = json.dumps(EXEMPLO_PACIENTE).encode("utf-8")
+
+    def call(_):
+        req = urllib.request.Request(f"{url}/predict", data=body,
+                                     headers={"Content-Type": "application/json"})
+        t0 = time.perf_counter()
+        with urllib.request.urlopen(req) as resp:
+            resp.read()
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        lat = np.array(list(pool.map(call, range(n_requests)))) * 1000
+    elapsed = time.perf_counter() - t0
+
+    with urllib.request.urlopen(f"{url}/stats") as resp:
+        server_stats = json.loads(resp.read())
+    return {
+        "concorrencia": concurrency,
+        "requisicoes": n_requests,
+        "vazao_req_s": n_requests / elapsed,
+        "latencia_p50_ms": float(np.percentile(lat, 50)),
+        "latencia_p95_ms": float(np.percentile(lat, 95)),
+        "latencia_p99_ms": float(np.percentile(lat, 99)),
+        "servidor": server_stats,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de inferência com micro-batching.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_serve = sub.add_parser("serve", help="Sobe o servidor")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--porta", type=int, default=8600)
+    p_serve.add_argument("--modelo", default=str(MODEL_PATH))
+    p_serve.add_argument("--max-batch-size", type=int, default=64, help="Máximo de linhas por lote")
+    p_serve.add_argument("--max-wait-ms", type=float, default=5.0, help="Espera máxima para fechar um lote")
+    p_serve.add_argument("--saida-antecipada", action="store_true",
+                         help="Responde só a classe, avaliada com saída antecipada (early_exit.py) no motor compilado")
+
+    p_bench = sub.add_parser("bench", help="Mede latência e vazão de um servidor em execução")
+    p_bench.add_argument("--url", default="http://127.0.0.1:8600")
+    p_bench.add_argument("--concorrencia", type=int, default=32)
+    p_bench.add_argument("--requisicoes", type=int, default=2000)
+
+    args = parser.parse_args(argv)
+    if args.cmd == "serve":
+        serve(args.host, args.porta, args.modelo, args.max_batch_size, args.max_wait_ms, args.saida_antecipada)
+    else:
+        print(json.dumps(bench(args.url, args.concorrencia, args.requisicoes), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Instrumentação de latência por fase com exportação no formato texto do Prometheus.
+
+Uso:
+    from metrics import REGISTRY
+    with REGISTRY.timer("predict_proba"):
+        ...
+    REGISTRY.write_textfile("metrics.prom")   # ou REGISTRY.serve(9108)
+"""
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Limites (em segundos) dos buckets do histograma
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """Histograma cumulativo no estilo Prometheus + janela recente para p50/p95/p99."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=2048):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        self._recent.append(seconds)
+        for i, upper in enumerate(self.buckets):
+            if seconds <= upper:
+                self.bucket_counts[i] += 1
+
+    def quantiles(self, qs=QUANTILES):
+        if not self._recent:
+            return {q: 0.0 for q in qs}
+        values = np.quantile(np.fromiter(self._recent, dtype=float), qs)
+        return dict(zip(qs, values.tolist()))
+
+
+class MetricsRegistry:
+    """Coleção de histogramas por fase, contadores e gauges de um processo."""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._gauges = {}
+        self._server = None
+
+    # ------------------------------------------------------------------
+    # Coleta
+    # ------------------------------------------------------------------
+    def observe(self, phase, seconds):
+        with self._lock:
+            hist = self._histograms.get(phase)
+            if hist is None:
+                hist = self._histograms[phase] = LatencyHistogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, phase):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - t0)
+
+    def set_gauge(self, name, value, help_text=""):
+        with self._lock:
+            self._gauges[name] = (float(value), help_text)
+
+    def summary(self):
+        """Linhas {fase, n, média, p50, p95, p99} em milissegundos, para exibição."""
+        with self._lock:
+            rows = []
+            for phase, hist in sorted(self._histograms.items()):
+                q = hist.quantiles()
+                rows.append({
+                    "fase": phase,
+                    "n": hist.count,
+                    "media_ms": hist.sum / hist.count * 1000,
+                    "p50_ms": q[0.5] * 1000,
+                    "p95_ms": q[0.95] * 1000,
+                    "p99_ms": q[0.99] * 1000,
+                })
+            return rows
+
+    # ------------------------------------------------------------------
+    # Exportação
+    # ------------------------------------------------------------------
+    def render_prometheus(self):
+        name = f"{self.prefix}_phase_latency_seconds"
+        lines = [
+            f"# HELP {name} Latência por fase da requisição.",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            for phase, hist in sorted(self._histograms.items()):
+                for upper, n in zip(hist.buckets, hist.bucket_counts):
+                    lines.append(f'{name}_bucket{{phase="{phase}",le="{upper}"}} {n}')
+                lines.append(f'{name}_bucket{{phase="{phase}",le="+Inf"}} {hist.count}')
+                lines.append(f'{name}_sum{{phase="{phase}"}} {hist.sum}')
+                lines.append(f'{name}_count{{phase="{phase}"}} {hist.count}')
+
+            qname = f"{self.prefix}_phase_latency_recent_seconds"
+            lines += [
+                f"# HELP {qname} Quantis de latência por fase (janela recente).",
+                f"# TYPE {qname} summary",
+            ]
+            for phase, hist in sorted(self._histograms.items()):
+                for q, v in hist.quantiles().items():
+                    lines.append(f'{qname}{{phase="{phase}",quantile="{q}"}} {v}')
+                lines.append(f'{qname}_sum{{phase="{phase}"}} {hist.sum}')
+                lines.append(f'{qname}_count{{phase="{phase}"}} {hist.count}')
+
+            for gauge, (value, help_text) in sorted(self._gauges.items()):
+                gname = f"{self.prefix}_{gauge}"
+                lines += [f"# HELP {gname} {help_text}", f"# TYPE {gname} gauge", f"{gname} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Grava as métricas de forma atômica (formato do textfile collector do node_exporter)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        """Expõe GET /metrics em uma thread de fundo (idempotente)."""
+        if self._server is not None:
+            return self._server
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200 if self.path == "/metrics" else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+
+# Registro único do processo do app de predição (sobrevive aos reruns do Streamlit)
+REGISTRY = MetricsRegistry("obesity_app")
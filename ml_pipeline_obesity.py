@@ -1,133 +1,506 @@
 # -*- coding: utf-8 -*-
+import argparse, io, json, os, shutil, tempfile, time
 import pandas as pd, numpy as np
 from pathlib import Path
-from sklearn.model_selection import train_test_split, StratifiedKFold, cross_val_score
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.base import clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import train_test_split, StratifiedKFold, HalvingRandomSearchCV
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from packaging import version
 import sklearn, joblib
+from model_registry import ModelRegistry, sha256_file
+from dataset import CSV_PATH, load_frame
+from schema import CAT_COLS, NUM_COLS, TARGET_COL
+
+MODEL_PATH = Path("obesity_pipeline.pkl")
+COMPARISON_PATH = Path("comparacao_estimadores.json")
+TUNING_PATH = MODEL_PATH.with_name("obesity_pipeline.tuning.json")
+SEARCH_LOG_PATH = MODEL_PATH.with_name("obesity_pipeline.search_log.csv")
+DISTILLATION_PATH = MODEL_PATH.with_name("obesity_pipeline.distillation.json")
 
 # =========================================================
-# 1) Leitura
+# 1) Leitura (cache colunar compartilhado, já em PT-BR e tipado: dataset.py)
+# 2) Target e features (em PT-BR)
 # =========================================================
-CSV_PATH = Path("Obesity.csv")  # garanta que está na mesma pasta
-df = pd.read_csv(CSV_PATH)
+def load_dataset(csv_path=CSV_PATH):
+    """Carrega o dataset e devolve (X, y, num_cols, cat_cols) no esquema PT-BR."""
+    df = load_frame(csv_path)
+    y = df[TARGET_COL]
+    X = df.drop(columns=[TARGET_COL])
+    return X, y, list(NUM_COLS), list(CAT_COLS)
+
 
 # =========================================================
-# 2) Renomear colunas (PT-BR)
+# 5) Pré-processamento + estimador (compatível com várias versões do sklearn)
 # =========================================================
-col_map_pt = {
-    "Gender": "Gênero",
-    "Age": "Idade",
-    "Height": "Altura",
-    "Weight": "Peso",
-    "family_history": "Histórico Familiar",
-    "FAVC": "FAVC",
-    "FCVC": "FCVC",
-    "NCP": "NCP",
-    "CAEC": "CAEC",
-    "SMOKE": "Fuma",
-    "CH2O": "Água por dia",
-    "SCC": "Conta Calorias",
-    "FAF": "Atividade Física",
-    "TUE": "Tempo em Telas",
-    "CALC": "Álcool",
-    "MTRANS": "Transporte",
-    "Obesity": "Obesidade"
+def _one_hot_preprocess(num_cols, cat_cols):
+    ohe_kwargs = {"handle_unknown": "ignore"}
+    if version.parse(sklearn.__version__) >= version.parse("1.2"):
+        ohe_kwargs["sparse_output"] = False
+    else:
+        ohe_kwargs["sparse"] = False
+    ohe = OneHotEncoder(**ohe_kwargs)
+
+    return ColumnTransformer([
+        ("num", StandardScaler(), num_cols),
+        ("cat", ohe, cat_cols)
+    ])
+
+
+def _gbc_pipeline(num_cols, cat_cols):
+    return Pipeline([("prep", _one_hot_preprocess(num_cols, cat_cols)),
+                     ("clf", GradientBoostingClassifier(random_state=42))])
+
+
+def _hgb_pipeline(num_cols, cat_cols):
+    # Categorias viram códigos ordinais e o HGB as trata de forma nativa (sem one-hot);
+    # categoria desconhecida vira NaN, que o HGB trata como ausente
+    preprocess = ColumnTransformer([
+        ("num", "passthrough", num_cols),
+        ("cat", OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=np.nan), cat_cols)
+    ])
+    categorical = [False] * len(num_cols) + [True] * len(cat_cols)
+    return Pipeline([("prep", preprocess),
+                     ("clf", HistGradientBoostingClassifier(categorical_features=categorical, random_state=42))])
+
+
+def _linear_pipeline(num_cols, cat_cols):
+    return Pipeline([("prep", _one_hot_preprocess(num_cols, cat_cols)),
+                     ("clf", LogisticRegression(max_iter=2000))])
+
+
+# Backends disponíveis (--estimador); todos expõem os passos "prep" e "clf" usados pelo app
+ESTIMATORS = {
+    "gbc": _gbc_pipeline,
+    "hgb": _hgb_pipeline,
+    "linear": _linear_pipeline,
 }
-df = df.rename(columns=col_map_pt)
+
+
+# Espaços de busca de hiperparâmetros por backend (usados com --tunar)
+PARAM_SPACES = {
+    "gbc": {
+        "clf__n_estimators": [50, 100, 200, 300],
+        "clf__learning_rate": [0.03, 0.05, 0.1, 0.2],
+        "clf__max_depth": [2, 3, 4, 5],
+        "clf__subsample": [0.7, 0.85, 1.0],
+        "clf__min_samples_leaf": [1, 3, 5, 10],
+        "clf__max_features": [None, "sqrt"],
+    },
+    "hgb": {
+        "clf__learning_rate": [0.03, 0.05, 0.1, 0.2],
+        "clf__max_iter": [100, 200, 400],
+        "clf__max_leaf_nodes": [15, 31, 63],
+        "clf__min_samples_leaf": [5, 10, 20, 40],
+        "clf__l2_regularization": [0.0, 0.1, 1.0],
+    },
+    "linear": {
+        "clf__C": [0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0, 30.0, 100.0],
+    },
+}
+
+
+def build_pipeline(num_cols, cat_cols, estimator="gbc"):
+    if estimator not in ESTIMATORS:
+        raise ValueError(f"Estimador desconhecido: {estimator} (opções: {', '.join(ESTIMATORS)})")
+    return ESTIMATORS[estimator](num_cols, cat_cols)
+
 
 # =========================================================
-# 3) Mapear categorias para PT-BR (features)
+# 6) Validação (CV) + Holdout + modelo final em paralelo
 # =========================================================
-def map_vals(col, mapping):
-    if col in df.columns:
-        df[col] = df[col].map(mapping).fillna(df[col])
-
-map_vals("Gênero", {"Male": "Masculino", "Female": "Feminino"})
-map_vals("Histórico Familiar", {"yes": "Sim", "no": "Não"})
-map_vals("FAVC", {"yes": "Sim", "no": "Não"})
-map_vals("Fuma", {"yes": "Sim", "no": "Não"})
-map_vals("Conta Calorias", {"yes": "Sim", "no": "Não"})
-map_vals("CAEC", {"Sometimes": "Às vezes", "Frequently": "Frequentemente", "Always": "Sempre", "no": "Não"})
-map_vals("Álcool", {"no": "Não", "Sometimes": "Às vezes", "Frequently": "Frequentemente", "Always": "Sempre"})
-map_vals("Transporte", {
-    "Public_Transportation": "Transporte público",
-    "Walking": "Caminhada",
-    "Automobile": "Automóvel",
-    "Motorbike": "Motocicleta",
-    "Bike": "Bicicleta"
-})
+def _fit_predict(pipe, X, y, train_idx, test_idx):
+    """Treina um clone em train_idx e prevê test_idx (executado em um processo do pool)."""
+    t0 = time.perf_counter()
+    model = clone(pipe).fit(X.iloc[train_idx], y.iloc[train_idx])
+    y_pred = model.predict(X.iloc[test_idx])
+    return y_pred, time.perf_counter() - t0
+
+
+def _fit_full(pipe, X, y):
+    t0 = time.perf_counter()
+    model = clone(pipe).fit(X, y)
+    return model, time.perf_counter() - t0
+
+
+def run_training(pipe, X, y, n_jobs=None):
+    """Roda os 5 folds de CV, o holdout e o ajuste final ao mesmo tempo em um pool de processos.
+
+    Devolve um dicionário com as predições de cada fold, o resultado do holdout,
+    o modelo final e o tempo de parede de cada etapa.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+    folds = list(cv.split(X, y))
+    train_idx, test_idx = train_test_split(
+        np.arange(len(X)), test_size=0.2, random_state=42, stratify=y
+    )
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        # o ajuste final é o mais longo: entra primeiro na fila
+        fut_final = pool.submit(_fit_full, pipe, X, y)
+        fut_folds = [pool.submit(_fit_predict, pipe, X, y, tr, te) for tr, te in folds]
+        fut_holdout = pool.submit(_fit_predict, pipe, X, y, train_idx, test_idx)
+
+        fold_results = [f.result() for f in fut_folds]
+        holdout_pred, holdout_s = fut_holdout.result()
+        final_model, final_s = fut_final.result()
+    wall = time.perf_counter() - t0
+
+    fold_scores = np.array([
+        accuracy_score(y.iloc[te], y_pred) for (_, te), (y_pred, _) in zip(folds, fold_results)
+    ])
+    stage_times = {f"cv_fold_{i + 1}": s for i, (_, s) in enumerate(fold_results)}
+    stage_times["holdout"] = holdout_s
+    stage_times["final"] = final_s
+    return {
+        "folds": folds,
+        "fold_predictions": [p for p, _ in fold_results],
+        "fold_scores": fold_scores,
+        "holdout_idx": test_idx,
+        "holdout_pred": holdout_pred,
+        "final_model": final_model,
+        "stage_times": stage_times,
+        "wall_time": wall,
+        "n_jobs": n_jobs,
+    }
+
+
+def print_reports(result, y):
+    scores = result["fold_scores"]
+    print("CV mean acc:", scores.mean(), "folds:", scores)
+
+    y_test = y.iloc[result["holdout_idx"]]
+    y_pred = result["holdout_pred"]
+    print("Holdout acc:", accuracy_score(y_test, y_pred))
+    print("Report:\n", classification_report(y_test, y_pred, zero_division=0))
+    print("CM:\n", confusion_matrix(y_test, y_pred))
+
+    print(f"\nTempo por etapa ({result['n_jobs']} processos):")
+    for stage, seconds in result["stage_times"].items():
+        print(f"  {stage:<10} {seconds:7.2f}s")
+    serial = sum(result["stage_times"].values())
+    print(f"  {'soma':<10} {serial:7.2f}s | parede {result['wall_time']:.2f}s "
+          f"| speedup {serial / result['wall_time']:.1f}x")
+
 
 # =========================================================
-# 4) Target e features (em PT-BR) + tradução das CLASSES do alvo
+# 6b) Busca de hiperparâmetros (successive halving)
 # =========================================================
-target_col = "Obesidade"
-
-# Traduz as classes do alvo para PT-BR
-target_map_pt = {
-    "Insufficient_Weight": "Baixo_peso",
-    "Normal_Weight": "Peso_normal",
-    "Overweight_Level_I": "Sobrepeso_I",
-    "Overweight_Level_II": "Sobrepeso_II",
-    "Obesity_Type_I": "Obesidade_I",
-    "Obesity_Type_II": "Obesidade_II",
-    "Obesity_Type_III": "Obesidade_III",
-}
-y = df[target_col].map(target_map_pt).astype("category")
+def tune_hyperparameters(pipe, X, y, estimator="gbc", n_candidates=40, n_jobs=None):
+    """Successive halving em paralelo sobre os hiperparâmetros do classificador.
 
-X = df.drop(columns=[target_col])
+    O Pipeline roda com `memory` num diretório temporário: o ColumnTransformer
+    ajustado em cada fold/subamostra é reaproveitado por todos os candidatos
+    dessa rodada, já que só os parâmetros de "clf" variam.
+    Devolve (melhores parâmetros, melhor acurácia de CV, log da busca, segundos).
+    """
+    cache_dir = tempfile.mkdtemp(prefix="obesity_prep_cache_")
+    try:
+        cached = clone(pipe).set_params(memory=joblib.Memory(cache_dir, verbose=0))
+        search = HalvingRandomSearchCV(
+            cached, PARAM_SPACES[estimator], n_candidates=n_candidates, factor=3,
+            cv=StratifiedKFold(n_splits=5, shuffle=True, random_state=42),
+            scoring="accuracy", refit=False, random_state=42, n_jobs=n_jobs or -1,
+        )
+        t0 = time.perf_counter()
+        search.fit(X, y)
+        elapsed = time.perf_counter() - t0
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
 
-# Garante tipos numéricos corretos (evita problemas de vírgula/locale)
-num_cols = X.select_dtypes(include=[np.number]).columns.tolist()
-for c in ["Idade", "Altura", "Peso", "FCVC", "NCP", "Água por dia", "Atividade Física", "Tempo em Telas"]:
-    if c in X.columns:
-        X[c] = pd.to_numeric(X[c], errors="coerce")
+    cols = ["iter", "n_resources", "mean_test_score", "std_test_score", "rank_test_score",
+            "mean_fit_time", "params"]
+    log = pd.DataFrame(search.cv_results_)[cols].sort_values(["iter", "rank_test_score"])
+    return search.best_params_, float(search.best_score_), log, elapsed
 
-cat_cols = X.select_dtypes(include=["object"]).columns.tolist()
-num_cols = X.select_dtypes(include=[np.number]).columns.tolist()
 
 # =========================================================
-# 5) Pré-processamento (compatível com várias versões do sklearn)
+# 7) Comparação de backends (velocidade x acurácia)
 # =========================================================
-from sklearn.preprocessing import OneHotEncoder
-ohe_kwargs = {"handle_unknown": "ignore"}
-if version.parse(sklearn.__version__) >= version.parse("1.2"):
-    ohe_kwargs["sparse_output"] = False
-else:
-    ohe_kwargs["sparse"] = False
-ohe = OneHotEncoder(**ohe_kwargs)
+def _median_time(fn, repeat):
+    fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+def compare_estimators(X, y, num_cols, cat_cols, names=None, n_jobs=None, batch_rows=100_000):
+    """Mede, para cada backend: tempo de treino, latência de 1 linha, vazão em lote,
+    tamanho do artefato e acurácia média de CV.
+
+    O tempo de treino é de um ajuste isolado, depois do pool de `run_training`:
+    dentro do pool ele incluiria a disputa de CPU com os folds em paralelo.
+    """
+    rows = []
+    row = X.iloc[[0]]
+    batch = X.sample(batch_rows, replace=True, random_state=42)
+    for name in names or ESTIMATORS:
+        pipe = build_pipeline(num_cols, cat_cols, name)
+        result = run_training(pipe, X, y, n_jobs=n_jobs)
+        model = result["final_model"]
+        _, fit_s = _fit_full(pipe, X, y)  # pool já fechado: ajuste sem concorrência
+        buf = io.BytesIO()
+        joblib.dump(model, buf)
+        batch_s = _median_time(lambda: model.predict_proba(batch), 3)
+        rows.append({
+            "estimador": name,
+            "cv_acc_media": float(result["fold_scores"].mean()),
+            "treino_s": fit_s,
+            "latencia_1_linha_ms": _median_time(lambda: model.predict_proba(row), 50) * 1000,
+            "vazao_linhas_s": batch_rows / batch_s,
+            "artefato_kb": buf.getbuffer().nbytes / 1024,
+        })
+    return rows
 
-preprocess = ColumnTransformer([
-    ("num", StandardScaler(), num_cols),
-    ("cat", ohe, cat_cols)
-])
 
-pipe = Pipeline([("prep", preprocess), ("clf", GradientBoostingClassifier(random_state=42))])
+def print_comparison(rows):
+    print(f"\n{'estimador':<8} {'CV acc':>7} {'treino':>8} {'1 linha':>9} {'vazão':>13} {'artefato':>10}")
+    for r in rows:
+        print(f"{r['estimador']:<8} {r['cv_acc_media']:>7.3f} {r['treino_s']:>7.2f}s "
+              f"{r['latencia_1_linha_ms']:>7.2f}ms {r['vazao_linhas_s']:>9.0f} l/s {r['artefato_kb']:>7.0f} KB")
+
 
 # =========================================================
-# 6) Validação (CV) + Holdout
+# 7b) Destilação (alunos menores treinados nas probabilidades do professor)
 # =========================================================
-cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
-scores = cross_val_score(pipe, X, y, cv=cv, scoring="accuracy")
-print("CV mean acc:", scores.mean(), "folds:", scores)
-
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-pipe.fit(X_train, y_train)
-y_pred = pipe.predict(X_test)
-print("Holdout acc:", accuracy_score(y_test, y_pred))
-print("Report:\n", classification_report(y_test, y_pred, zero_division=0))
-print("CM:\n", confusion_matrix(y_test, y_pred))
+# Alunos candidatos: (n_estimators, max_depth, learning_rate) do GradientBoostingClassifier;
+# com poucos estágios, um passo maior chega mais perto do professor
+STUDENT_CANDIDATES = [(10, 2, 0.3), (20, 2, 0.3), (20, 3, 0.3), (20, 4, 0.3), (40, 3, 0.3), (60, 3, 0.2)]
+
+
+def soft_label_rows(X, proba, classes, min_prob=0.01):
+    """Expande cada linha em uma por classe, com peso = probabilidade do professor.
+
+    A log-loss ponderada do GBC nessas linhas é a entropia cruzada com as
+    probabilidades do professor (rótulos suaves); classes com probabilidade
+    abaixo de `min_prob` são descartadas para não multiplicar as linhas à toa.
+    """
+    rows, cls = np.nonzero(proba >= min_prob)
+    return X.iloc[rows].reset_index(drop=True), pd.Series(classes[cls]), proba[rows, cls]
+
+
+def _fit_student(pipe, X, y, weights):
+    t0 = time.perf_counter()
+    model = clone(pipe).fit(X, y, clf__sample_weight=weights)
+    return model, time.perf_counter() - t0
+
+
+def _student_metrics(name, model, teacher_pred, X_eval, y_real, real_idx, row, batch):
+    """Concordância com o professor, acurácia no holdout real, latências e tamanho do artefato."""
+    from compiled_model import CompiledPipeline
+
+    pred = model.predict(X_eval)
+    compiled = CompiledPipeline.from_pipeline(model)
+    rec = row.iloc[0].to_dict()
+    buf = io.BytesIO()
+    joblib.dump(model, buf)
+    trees = [est.tree_ for est in model.named_steps["clf"].estimators_.ravel()]
+    return {
+        "modelo": name,
+        "arvores": len(trees),
+        "nos_por_linha": int(sum(t.max_depth for t in trees)),  # custo determinístico: nós percorridos por linha
+        "nos_total": int(sum(t.node_count for t in trees)),
+        "concordancia": float((pred == teacher_pred).mean()),
+        "holdout_acc": float(accuracy_score(y_real, pred[real_idx])),
+        "latencia_1_linha_ms": _median_time(lambda: model.predict_proba(row), 100) * 1000,
+        "latencia_compilado_ms": _median_time(lambda: compiled.predict_proba(rec), 100) * 1000,
+        "vazao_linhas_s": len(batch) / _median_time(lambda: model.predict_proba(batch), 3),
+        "artefato_kb": buf.getbuffer().nbytes / 1024,
+    }
+
+
+def distill(teacher, X, y, num_cols, cat_cols, synthetic_rows=20_000, candidates=STUDENT_CANDIDATES,
+            n_jobs=None, seed=42):
+    """Treina os alunos nas probabilidades do professor sobre linhas reais e sintéticas.
+
+    O conjunto de transferência é o treino do holdout (mesma divisão de
+    `run_training`) mais `synthetic_rows` linhas de `synthetic_data.py`. A
+    avaliação usa o holdout real e outras tantas linhas sintéticas inéditas.
+    Devolve (linhas da fronteira, professor incluído; {nome: aluno treinado}).
+    """
+    from synthetic_data import SyntheticModel
+    from schema import to_pt_features
+
+    train_idx, test_idx = train_test_split(
+        np.arange(len(X)), test_size=0.2, random_state=42, stratify=y
+    )
+    generator = SyntheticModel.fit(pd.read_csv(CSV_PATH))
+    rng = np.random.default_rng(seed)
+    synth = to_pt_features(generator.sample(2 * synthetic_rows, rng))
+    X_transfer = pd.concat([to_pt_features(X.iloc[train_idx]), synth.iloc[:synthetic_rows]], ignore_index=True)
+    X_eval = pd.concat([to_pt_features(X.iloc[test_idx]), synth.iloc[synthetic_rows:]], ignore_index=True)
+    real_idx = np.arange(len(test_idx))
+
+    X_soft, y_soft, w_soft = soft_label_rows(X_transfer, teacher.predict_proba(X_transfer), teacher.classes_)
+    teacher_pred = teacher.predict(X_eval)
+    row, batch = X.iloc[[0]], X_eval.sample(min(len(X_eval), 20_000), random_state=seed)
+    y_real = y.iloc[test_idx].to_numpy()
+
+    rows = [_student_metrics("professor", teacher, teacher_pred, X_eval, y_real, real_idx, row, batch)]
+    students = {}
+    with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count() or 1) as pool:
+        futures = {}
+        for n_estimators, max_depth, learning_rate in candidates:
+            pipe = build_pipeline(num_cols, cat_cols, "gbc").set_params(
+                clf__n_estimators=n_estimators, clf__max_depth=max_depth, clf__learning_rate=learning_rate)
+            name = f"gbc_{n_estimators}x{max_depth}_lr{learning_rate}"
+            futures[name] = pool.submit(_fit_student, pipe, X_soft, y_soft, w_soft)
+        fitted = {name: fut.result() for name, fut in futures.items()}
+    # latências medidas só depois do pool: sem treinos concorrendo pela CPU
+    for name, (students[name], fit_s) in fitted.items():
+        rows.append(_student_metrics(name, students[name], teacher_pred, X_eval, y_real, real_idx, row, batch))
+        rows[-1]["treino_s"] = fit_s
+
+    # fronteira: nenhum modelo mais barato (nós por linha, depois artefato) concorda tanto quanto ele com o professor
+    best = -1.0
+    for r in sorted(rows, key=lambda r: (r["nos_por_linha"], r["artefato_kb"])):
+        r["fronteira"] = r["concordancia"] > best
+        best = max(best, r["concordancia"])
+    return rows, students
+
+
+def pick_student(rows, budget_nodes=None):
+    """Aluno da fronteira de maior concordância que vale a troca (None se nenhum vale).
+
+    O custo é o número de nós percorridos por linha (soma das profundidades
+    das árvores), determinístico: latências de centésimos de milissegundo
+    são quase só ruído de medição e trocariam o aluno de uma execução para
+    outra. Um aluno só é candidato se estiver na fronteira, couber em
+    `budget_nodes` (None = sem limite) e não for dominado pelo professor,
+    isto é, se for estritamente mais barato que ele. Empates ficam com o
+    menor artefato.
+    """
+    teacher = next(r for r in rows if r["modelo"] == "professor")
+    fits = [
+        r for r in rows
+        if r["modelo"] != "professor" and r["fronteira"]
+        and r["nos_por_linha"] < teacher["nos_por_linha"]
+        and (budget_nodes is None or r["nos_por_linha"] <= budget_nodes)
+    ]
+    return max(fits, key=lambda r: (r["concordancia"], -r["nos_por_linha"], -r["artefato_kb"]), default=None)
+
+
+def print_frontier(rows):
+    print(f"\n{'modelo':<17} {'árvores':>7} {'nós/linha':>9} {'concord.':>9} {'holdout':>8} {'1 linha':>9} {'compilado':>10} "
+          f"{'vazão':>13} {'artefato':>10}")
+    for r in rows:
+        print(f"{r['modelo']:<17} {r['arvores']:>7} {r['nos_por_linha']:>9} {r['concordancia']:>9.3f} {r['holdout_acc']:>8.3f} "
+              f"{r['latencia_1_linha_ms']:>7.2f}ms {r['latencia_compilado_ms']:>8.3f}ms "
+              f"{r['vazao_linhas_s']:>9.0f} l/s {r['artefato_kb']:>7.0f} KB" + ("  *" if r["fronteira"] else ""))
+    print("* fronteira concordância x nós percorridos por linha | holdout do professor é otimista (treinado com todas as linhas)")
+
 
 # =========================================================
-# 7) Exporta modelo PT-BR
+# 8) Exporta modelo PT-BR
 # =========================================================
-MODEL_PATH = Path("obesity_pipeline.pkl")
-pipe.fit(X, y)
-joblib.dump(pipe, MODEL_PATH)
-print("Modelo PT salvo em", MODEL_PATH.resolve())
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Treina e exporta o pipeline de obesidade.")
+    parser.add_argument("--n-jobs", type=int, default=None, help="Processos para CV/holdout/final (padrão: nº de CPUs)")
+    parser.add_argument("--estimador", choices=sorted(ESTIMATORS), default="gbc", help="Backend do classificador")
+    parser.add_argument("--comparar", action="store_true",
+                        help=f"Compara todos os backends, grava {COMPARISON_PATH} e não exporta modelo")
+    parser.add_argument("--tunar", action="store_true", help="Busca hiperparâmetros (successive halving) antes de treinar")
+    parser.add_argument("--n-candidatos", type=int, default=40, help="Candidatos iniciais da busca")
+    parser.add_argument("--destilar", action="store_true",
+                        help=f"Destila {MODEL_PATH} em alunos menores e registra o escolhido no registro de modelos")
+    parser.add_argument("--orcamento-nos", type=int, default=None,
+                        help="Máximo de nós percorridos por linha do aluno registrado "
+                             "(padrão: qualquer aluno mais barato que o professor)")
+    parser.add_argument("--ativar-aluno", action="store_true", help="Aponta models/CURRENT para o aluno registrado")
+    parser.add_argument("--linhas-sinteticas", type=int, default=20_000, help="Linhas sintéticas na destilação")
+    args = parser.parse_args(argv)
+
+    X, y, num_cols, cat_cols = load_dataset(CSV_PATH)
+
+    if args.destilar:
+        if not MODEL_PATH.exists():
+            raise SystemExit(f"⚠️ Professor {MODEL_PATH} não encontrado: treine o modelo antes de destilar.")
+        rows, students = distill(joblib.load(MODEL_PATH), X, y, num_cols, cat_cols,
+                                 args.linhas_sinteticas, n_jobs=args.n_jobs)
+        print_frontier(rows)
+        chosen = pick_student(rows, args.orcamento_nos)
+        distillation_json = json.dumps({
+            "orcamento_nos": args.orcamento_nos,
+            "escolhido": chosen["modelo"] if chosen else None,
+            "modelos": rows,
+        }, indent=2, ensure_ascii=False)
+        DISTILLATION_PATH.write_text(distillation_json, encoding="utf-8")
+        print("Fronteira salva em", DISTILLATION_PATH.resolve())
+        if chosen is None:
+            raise SystemExit("❌ Nenhum aluno da fronteira é mais barato que o professor"
+                             + (f" e cabe em {args.orcamento_nos} nós por linha." if args.orcamento_nos else "."))
+        versao = ModelRegistry().register(students[chosen["modelo"]], metrics={
+            "destilado_de": sha256_file(MODEL_PATH),
+            **{k: chosen[k] for k in ("modelo", "concordancia", "holdout_acc", "nos_por_linha", "nos_total",
+                                      "latencia_1_linha_ms", "latencia_compilado_ms", "artefato_kb")},
+        }, activate=args.ativar_aluno, extra_files={"distillation.json": distillation_json})
+        print(f"Aluno {chosen['modelo']} (concordância {chosen['concordancia']:.3f}, "
+              f"{chosen['nos_por_linha']} nós por linha) registrado como {versao}"
+              + ("" if args.ativar_aluno else " (inativo; ative com --ativar-aluno ou ModelRegistry().activate)"))
+        return
+
+    if args.comparar:
+        rows = compare_estimators(X, y, num_cols, cat_cols, n_jobs=args.n_jobs)
+        print_comparison(rows)
+        COMPARISON_PATH.write_text(json.dumps(rows, indent=2, ensure_ascii=False), encoding="utf-8")
+        print("Comparação salva em", COMPARISON_PATH.resolve())
+        return
+
+    pipe = build_pipeline(num_cols, cat_cols, args.estimador)
+
+    tuning = None
+    if args.tunar:
+        best_params, best_score, search_log, search_s = tune_hyperparameters(
+            pipe, X, y, args.estimador, args.n_candidatos, args.n_jobs
+        )
+        pipe.set_params(**best_params)
+        tuning = {
+            "estimador": args.estimador,
+            "melhores_parametros": best_params,
+            "melhor_cv_acc": best_score,
+            "candidatos_iniciais": args.n_candidatos,
+            "tempo_busca_s": search_s,
+        }
+        print(f"Busca concluída em {search_s:.1f}s | melhor CV acc {best_score:.4f} | {best_params}")
+
+    result = run_training(pipe, X, y, n_jobs=args.n_jobs)
+    print_reports(result, y)
+
+    final_model = result["final_model"]
+    joblib.dump(final_model, MODEL_PATH)
+    print("Modelo PT salvo em", MODEL_PATH.resolve())
+
+    extra_files = {}
+    if tuning is not None:
+        tuning_json = json.dumps(tuning, indent=2, ensure_ascii=False, default=str)
+        search_csv = search_log.to_csv(index=False)
+        TUNING_PATH.write_text(tuning_json, encoding="utf-8")
+        SEARCH_LOG_PATH.write_text(search_csv, encoding="utf-8")
+        extra_files = {"tuning.json": tuning_json, "search_log.csv": search_csv}
+        print("Configuração e log da busca salvos em", TUNING_PATH.resolve(), "e", SEARCH_LOG_PATH.name)
+
+    # Registro versionado (o app troca para a nova versão sem reiniciar)
+    y_test = y.iloc[result["holdout_idx"]]
+    versao = ModelRegistry().register(final_model, metrics={
+        "cv_acc_media": float(result["fold_scores"].mean()),
+        "cv_acc_folds": [float(s) for s in result["fold_scores"]],
+        "holdout_acc": float(accuracy_score(y_test, result["holdout_pred"])),
+        "tempo_treino_s": result["stage_times"],
+        "hiperparametros": tuning["melhores_parametros"] if tuning else None,
+    }, extra_files=extra_files)
+    print("Versão registrada no registro de modelos:", versao)
+
+
+if __name__ == "__main__":
+    main()
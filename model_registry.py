@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""Registro local de modelos versionados com troca a quente.
+
+Estrutura em disco:
+    models/
+        CURRENT              -> nome da versão ativa (ex.: "v0003")
+        v0001/model.pkl
+        v0001/metadata.json  -> sha256, versão do sklearn, métricas, features, classes
+
+A troca de versão é uma substituição atômica do arquivo CURRENT. O app só
+confere o `stat` desse arquivo (barato) e, quando ele muda, carrega a nova
+versão, valida o hash e troca a referência do modelo de uma vez; requisições
+em andamento continuam usando a versão que já tinham em mãos.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import warnings
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from metrics import REGISTRY as METRICS
+
+REGISTRY_ROOT = Path("models")
+LEGACY_MODEL_PATH = Path("obesity_pipeline.pkl")
+ARTIFACT_NAME = "model.pkl"
+
+
+def sha256_file(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _write_atomic(path, text):
+    tmp = Path(f"{path}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# ============================================================================
+# REGISTRO
+# ============================================================================
+class ModelRegistry:
+    """Versões de modelo no disco e o ponteiro CURRENT para a versão ativa."""
+
+    def __init__(self, root=REGISTRY_ROOT):
+        self.root = Path(root)
+        self.current_file = self.root / "CURRENT"
+
+    def versions(self):
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir() and p.name.startswith("v"))
+
+    def current_version(self):
+        try:
+            return self.current_file.read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def artifact_path(self, version):
+        return self.root / version / ARTIFACT_NAME
+
+    def metadata(self, version):
+        return json.loads((self.root / version / "metadata.json").read_text(encoding="utf-8"))
+
+    def _new_version_dir(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        while True:
+            existing = [int(v[1:]) for v in self.versions() if v[1:].isdigit()]
+            version = f"v{max(existing, default=0) + 1:04d}"
+            try:
+                (self.root / version).mkdir()  # falha se outro processo criou a mesma versão
+                return version
+            except FileExistsError:
+                continue
+
+    def register(self, pipe, metrics=None, activate=True, extra_files=None):
+        """Grava `pipe` como nova versão com metadados e hash. Devolve o nome da versão.
+
+        `extra_files` ({nome: texto}) são gravados ao lado do artefato (ex.: log de tuning).
+        """
+        import joblib
+        import sklearn
+
+        version = self._new_version_dir()
+        artifact = self.artifact_path(version)
+        joblib.dump(pipe, artifact)
+
+        clf = pipe.named_steps["clf"] if hasattr(pipe, "named_steps") else pipe
+        meta = {
+            "versao": version,
+            "criado_em": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "sha256": sha256_file(artifact),
+            "tamanho_bytes": artifact.stat().st_size,
+            "sklearn": sklearn.__version__,
+            "estimador": type(clf).__name__,
+            "features": [str(c) for c in getattr(pipe, "feature_names_in_", [])],
+            "classes": [str(c) for c in getattr(pipe, "classes_", [])],
+            "metricas": metrics or {},
+        }
+        for name, text in (extra_files or {}).items():
+            (self.root / version / name).write_text(text, encoding="utf-8")
+        _write_atomic(self.root / version / "metadata.json", json.dumps(meta, indent=2, ensure_ascii=False))
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version):
+        """Aponta CURRENT para `version` (também serve para rollback)."""
+        if not self.artifact_path(version).exists():
+            raise FileNotFoundError(f"Versão inexistente no registro: {version}")
+        _write_atomic(self.current_file, version)
+
+
+# ============================================================================
+# TROCA A QUENTE
+# ============================================================================
+@dataclass(frozen=True)
+class LoadedModel:
+    version: str
+    sha256: str
+    model: object = field(repr=False)
+    metadata: dict = field(default_factory=dict, repr=False)
+
+
+class ModelHandle:
+    """Referência ao modelo ativo, trocada atomicamente quando o registro muda.
+
+    `get()` faz no máximo um `stat` a cada `check_interval` segundos; o hash do
+    artefato só é recalculado quando uma nova versão é carregada. Sem registro
+    (ou sem CURRENT), usa o arquivo legado `obesity_pipeline.pkl`.
+    """
+
+    def __init__(self, registry=None, fallback_path=LEGACY_MODEL_PATH, check_interval=2.0):
+        self.registry = registry or ModelRegistry()
+        self.fallback_path = Path(fallback_path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded = None
+        self._signature = None
+        self._next_check = 0.0
+        if self.registry.current_version() is None and not self.fallback_path.exists():
+            raise FileNotFoundError(f"Nenhum modelo em {self.registry.root} nem em {self.fallback_path}")
+
+    @property
+    def loaded(self):
+        """Versão já carregada (ou None), sem disparar carga nem verificação."""
+        return self._loaded
+
+    def _source_signature(self):
+        """(arquivo de origem, assinatura barata) da versão que deveria estar ativa."""
+        for path in (self.registry.current_file, self.fallback_path):
+            try:
+                st = os.stat(path)
+                return path, (str(path), st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                continue
+        raise FileNotFoundError(f"Nenhum modelo em {self.registry.root} nem em {self.fallback_path}")
+
+    def _load(self, source):
+        import joblib
+
+        if source == self.registry.current_file:
+            version = self.registry.current_version()
+            meta = self.registry.metadata(version)
+            artifact = self.registry.artifact_path(version)
+            digest = sha256_file(artifact)
+            if digest != meta["sha256"]:
+                raise ValueError(f"Hash do artefato {artifact} não confere com metadata.json")
+        else:
+            version, meta, artifact = "legado", {}, source
+            digest = sha256_file(artifact)
+        with METRICS.timer("carregar_modelo"):
+            model = joblib.load(artifact)
+        return LoadedModel(version, digest, model, meta)
+
+    def get(self):
+        """Modelo ativo; carrega/troca a versão se o registro mudou.
+
+        A carga e a validação de uma versão nova rodam fora de `_lock` (um
+        carregador por vez, em `_load_lock`): enquanto isso, as outras
+        chamadas seguem recebendo a versão atual. Só quem ainda não tem
+        modelo nenhum espera a carga.
+        """
+        now = time.monotonic()
+        loaded = self._loaded
+        if loaded is not None and now < self._next_check:
+            return loaded
+        with self._lock:
+            if self._loaded is not None and now < self._next_check:
+                return self._loaded
+            _, signature = self._source_signature()
+            self._next_check = now + self.check_interval
+            if signature == self._signature:
+                return self._loaded
+        if not self._load_lock.acquire(blocking=self._loaded is None):
+            return self._loaded  # outra thread já carrega a versão nova
+        try:
+            source, signature = self._source_signature()  # CURRENT pode ter mudado de novo
+            if signature == self._signature:
+                return self._loaded
+            try:
+                new = self._load(source)
+            except Exception as exc:
+                if self._loaded is None:
+                    raise
+                # versão nova inválida: segue servindo a anterior até CURRENT mudar de novo
+                warnings.warn(f"Falha ao carregar nova versão do modelo; mantendo {self._loaded.version}: {exc}")
+                new = self._loaded
+            with self._lock:
+                self._loaded = new  # troca atômica da referência
+                self._signature = signature
+            return new
+        finally:
+            self._load_lock.release()
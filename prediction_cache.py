@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""Cache LRU de predições e explicações, indexado pelas 16 features do formulário."""
+import threading
+from collections import OrderedDict
+
+from metrics import REGISTRY
+from schema import FEATURE_COLS, NUM_COLS
+
+# Passo dos sliders do formulário de app.py. Idade, Altura e Peso são campos
+# de digitação: entram na chave (e no modelo) com o valor exato.
+QUANTIZATION_STEPS = {
+    "FCVC": 0.5,
+    "NCP": 1.0,
+    "Água por dia": 0.5,
+    "Atividade Física": 0.5,
+    "Tempo em Telas": 0.5,
+}
+
+
+def quantize(value, step):
+    return round(round(float(value) / step) * step, 6)
+
+
+def canonical_record(entrada):
+    """Paciente com os campos numéricos como float e os sliders arredondados ao passo."""
+    rec = {c: entrada[c] for c in FEATURE_COLS}
+    for c in NUM_COLS:
+        rec[c] = quantize(rec[c], QUANTIZATION_STEPS[c]) if c in QUANTIZATION_STEPS else float(rec[c])
+    return rec
+
+
+def canonical_key(entrada):
+    """Tupla hasheável e estável que identifica o paciente no cache."""
+    rec = canonical_record(entrada)
+    return tuple(rec[c] for c in FEATURE_COLS)
+
+
+class PredictionCache:
+    """Cache LRU limitado em torno de model.predict_proba.
+
+    O modelo vem de um `model_registry.ModelHandle`; quando a versão ativa
+    muda (hash diferente), o cache é esvaziado. O modelo (e com ele o sklearn)
+    só é carregado na primeira predição. As explicações por campo
+    (`explanations.TreeExplainer`) seguem as mesmas regras, em um cache à parte.
+    """
+
+    def __init__(self, handle, maxsize=1024):
+        self.handle = handle
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._explanations = OrderedDict()
+        self._explainer = None
+        self._lock = threading.Lock()
+        self._model_sha = None
+
+    @property
+    def model(self):
+        return self.handle.get().model
+
+    def predict(self, entrada, loaded=None):
+        """Devolve (classe prevista, vetor de probabilidades, classes) para um paciente.
+
+        `loaded` (um `LoadedModel` de `handle.get()`) fixa a versão usada; por
+        padrão, a ativa. O app passa a mesma versão para predição, simulação e
+        explicação de um envio.
+        """
+        key = canonical_key(entrada)
+        loaded = loaded or self.handle.get()
+        with self._lock:
+            self._sync(loaded)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        import pandas as pd
+        with REGISTRY.timer("montar_dataframe"):
+            row = pd.DataFrame([dict(zip(FEATURE_COLS, key))])
+        with REGISTRY.timer("predict_proba"):
+            proba = loaded.model.predict_proba(row)[0]
+        classes = loaded.model.named_steps["clf"].classes_
+        result = (classes[proba.argmax()], proba, classes)
+
+        with self._lock:
+            if loaded.sha256 == self._model_sha:  # não guarda resultado de um modelo já substituído
+                self._entries[key] = result
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return result
+
+    def _sync(self, loaded):
+        """Esvazia os caches quando a versão ativa do modelo muda (chamar com o lock)."""
+        if loaded.sha256 != self._model_sha:
+            self._entries.clear()
+            self._explanations.clear()
+            self._explainer = None
+            self._model_sha = loaded.sha256
+
+    def explain(self, entrada, loaded=None):
+        """Contribuições por campo para cada classe: {classe: {campo: contribuição}}.
+
+        `loaded` como em `predict`. Devolve None quando o modelo não é um
+        GradientBoostingClassifier.
+        """
+        key = canonical_key(entrada)
+        loaded = loaded or self.handle.get()
+        with self._lock:
+            self._sync(loaded)
+            if key in self._explanations:
+                self._explanations.move_to_end(key)
+                return self._explanations[key]
+            explainer = self._explainer
+
+        if explainer is None:
+            from explanations import TreeExplainer
+            with REGISTRY.timer("montar_explicador"):
+                try:
+                    explainer = TreeExplainer.from_pipeline(loaded.model)
+                except ValueError:
+                    explainer = False  # estimador sem suporte: não tenta de novo para esta versão
+        if explainer is False:
+            result = None
+        else:
+            with REGISTRY.timer("explicacao"):
+                result = explainer.explain(dict(zip(FEATURE_COLS, key)))
+
+        with self._lock:
+            if loaded.sha256 == self._model_sha:
+                self._explainer = explainer
+                self._explanations[key] = result
+                if len(self._explanations) > self.maxsize:
+                    self._explanations.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._explanations.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "taxa_acerto": self.hits / total if total else 0.0,
+            "tamanho": len(self._entries),
+            "capacidade": self.maxsize,
+            "modelo_sha256": (self._model_sha or "")[:12],
+        }
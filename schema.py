@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""Esquema PT-BR das features do modelo (mesmas colunas geradas em ml_pipeline_obesity.py)."""
+import math
+
+import pandas as pd
+
+# =========================================================
+# Colunas e traduções
+# =========================================================
+COL_MAP_PT = {
+    "Gender": "Gênero",
+    "Age": "Idade",
+    "Height": "Altura",
+    "Weight": "Peso",
+    "family_history": "Histórico Familiar",
+    "FAVC": "FAVC",
+    "FCVC": "FCVC",
+    "NCP": "NCP",
+    "CAEC": "CAEC",
+    "SMOKE": "Fuma",
+    "CH2O": "Água por dia",
+    "SCC": "Conta Calorias",
+    "FAF": "Atividade Física",
+    "TUE": "Tempo em Telas",
+    "CALC": "Álcool",
+    "MTRANS": "Transporte",
+    "Obesity": "Obesidade"
+}
+
+SIM_NAO = {"yes": "Sim", "no": "Não"}
+FREQUENCIA = {"no": "Não", "Sometimes": "Às vezes", "Frequently": "Frequentemente", "Always": "Sempre"}
+
+VALUE_MAPS_PT = {
+    "Gênero": {"Male": "Masculino", "Female": "Feminino"},
+    "Histórico Familiar": SIM_NAO,
+    "FAVC": SIM_NAO,
+    "Fuma": SIM_NAO,
+    "Conta Calorias": SIM_NAO,
+    "CAEC": FREQUENCIA,
+    "Álcool": FREQUENCIA,
+    "Transporte": {
+        "Public_Transportation": "Transporte público",
+        "Walking": "Caminhada",
+        "Automobile": "Automóvel",
+        "Motorbike": "Motocicleta",
+        "Bike": "Bicicleta"
+    },
+}
+
+TARGET_COL = "Obesidade"
+TARGET_MAP_PT = {
+    "Insufficient_Weight": "Baixo_peso",
+    "Normal_Weight": "Peso_normal",
+    "Overweight_Level_I": "Sobrepeso_I",
+    "Overweight_Level_II": "Sobrepeso_II",
+    "Obesity_Type_I": "Obesidade_I",
+    "Obesity_Type_II": "Obesidade_II",
+    "Obesity_Type_III": "Obesidade_III",
+}
+
+# Ordem do formulário de app.py (a mesma do CSV original)
+FEATURE_COLS = [
+    "Gênero", "Idade", "Altura", "Peso", "Histórico Familiar", "FAVC", "FCVC", "NCP",
+    "CAEC", "Fuma", "Água por dia", "Conta Calorias", "Atividade Física", "Tempo em Telas",
+    "Álcool", "Transporte"
+]
+NUM_COLS = ["Idade", "Altura", "Peso", "FCVC", "NCP", "Água por dia", "Atividade Física", "Tempo em Telas"]
+CAT_COLS = [c for c in FEATURE_COLS if c not in NUM_COLS]
+CATEGORIES_PT = {col: sorted(set(mapping.values())) for col, mapping in VALUE_MAPS_PT.items()}
+# Faixas aceitas para as numéricas (os mesmos limites dos campos do formulário de app.py)
+FAIXAS_NUMERICAS = {
+    "Idade": (0.0, 120.0),
+    "Altura": (1.0, 2.3),
+    "Peso": (20.0, 300.0),
+    "FCVC": (0.0, 3.0),
+    "NCP": (1.0, 4.0),
+    "Água por dia": (1.0, 3.0),
+    "Atividade Física": (0.0, 3.0),
+    "Tempo em Telas": (0.0, 3.0),
+}
+
+
+# =========================================================
+# Preparação
+# =========================================================
+def to_pt_features(df):
+    """Devolve as 16 features PT-BR prontas para o Pipeline.
+
+    Aceita tanto o esquema PT-BR quanto o esquema original em inglês do Obesity.csv
+    (colunas e categorias são traduzidas). Colunas extras são ignoradas.
+    """
+    if "Gênero" not in df.columns and "Gender" in df.columns:
+        df = df.rename(columns=COL_MAP_PT)
+        df = df.assign(**{
+            col: df[col].map(mapping).fillna(df[col])
+            for col, mapping in VALUE_MAPS_PT.items() if col in df.columns
+        })
+
+    faltando = [c for c in FEATURE_COLS if c not in df.columns]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(faltando)}")
+
+    X = df[FEATURE_COLS].copy()
+    for c in NUM_COLS:
+        if not pd.api.types.is_numeric_dtype(X[c]):  # planilhas com vírgula decimal ("1,75")
+            X[c] = X[c].astype(str).str.replace(",", ".", regex=False)
+        X[c] = pd.to_numeric(X[c], errors="coerce")
+    return X
+
+
+def validate_record(rec):
+    """Valida um paciente no formato do formulário (dict PT-BR). Devolve a lista de erros."""
+    erros = [f"campo ausente: {c}" for c in FEATURE_COLS if c not in rec]
+    for c in NUM_COLS:
+        if c in rec:
+            try:
+                valor = float(rec[c])
+            except (TypeError, ValueError):
+                erros.append(f"valor não numérico em {c}: {rec[c]!r}")
+                continue
+            if not math.isfinite(valor):
+                erros.append(f"valor não finito em {c}: {rec[c]!r}")
+            elif not FAIXAS_NUMERICAS[c][0] <= valor <= FAIXAS_NUMERICAS[c][1]:
+                erros.append(f"valor fora da faixa em {c}: {rec[c]!r}")
+    for c, valores in CATEGORIES_PT.items():
+        if c in rec and rec[c] not in valores:
+            erros.append(f"valor inválido em {c}: {rec[c]!r}")
+    return erros
+
+
+def validate_frame(X):
+    """Valida, linha a linha, as features devolvidas por `to_pt_features`.
+
+    Mesmas regras de `validate_record`, vetorizadas. Devolve uma Series de
+    strings com os erros de cada linha ("" = linha válida).
+    """
+    erros = pd.Series("", index=X.index, dtype=object)
+    for c in NUM_COLS:
+        invalido = X[c].isna()
+        erros[invalido] += f"valor não numérico em {c}; "
+        lo, hi = FAIXAS_NUMERICAS[c]
+        fora = ~invalido & ~X[c].between(lo, hi)  # inclui ±inf
+        erros[fora] += f"valor fora da faixa em {c} ({lo:g} a {hi:g}); "
+    for c, valores in CATEGORIES_PT.items():
+        invalido = ~X[c].isin(valores)
+        erros[invalido] += f"valor inválido em {c}; "
+    return erros.str.removesuffix("; ")
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""Cubo de estatísticas pré-agregadas para o painel analítico.
+
+As células são (gênero, faixa de idade, histórico familiar, nível de peso).
+Cada uma guarda contagem, somas e somas de produtos cruzados das variáveis
+numéricas. KPIs, médias por nível, proporções e a matriz de correlação de
+qualquer combinação de filtros saem da soma de células. Nenhuma linha é
+lida, e o custo não depende do tamanho do dataset.
+
+Faixas de idade: o filtro do painel é `a <= Idade <= b` com `a` e `b`
+inteiros. Por isso cada idade inteira k tem a sua faixa, e as idades em
+(k, k+1) ficam numa faixa própria. Assim o recorte do cubo coincide
+exatamente com o filtro por linhas.
+
+Box plots: para algumas variáveis, cada célula também guarda um esboço de
+quantis mergeável. O esboço é um histograma de bins fixos (somar
+histogramas = juntar células) mais os K menores e K maiores valores, que
+alimentam whiskers e outliers. Quartis têm erro de no máximo um bin e
+whiskers de cerca de dois; o volume enviado ao navegador não depende do
+número de linhas.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+def _quantile(counts, lo, width, lows, highs, q):
+    """Quantil `q` (interpolação linear entre estatísticas de ordem, como pandas).
+
+    A i-ésima menor observação é exata quando está entre os extremos guardados
+    (`lows` crescente, `highs` decrescente); no miolo, é estimada pela posição
+    dentro do bin do histograma.
+    """
+    n = int(counts.sum())
+    cum = np.cumsum(counts)
+
+    def order_stat(i):
+        if i < len(lows):
+            return lows[i]
+        if n - 1 - i < len(highs):
+            return highs[n - 1 - i]
+        b = int(np.searchsorted(cum, i, side="right"))
+        before = cum[b - 1] if b else 0
+        return lo + (b + (i - before + 0.5) / counts[b]) * width
+
+    rank = q * (n - 1)
+    i = int(np.floor(rank))
+    value = order_stat(i)
+    if rank > i:
+        value += (rank - i) * (order_stat(i + 1) - value)
+    return float(value)
+
+
+def _merge_extremes(values, k, largest):
+    """K menores (ou maiores) valores de um conjunto de listas de extremos (NaN = vazio)."""
+    values = values[~np.isnan(values)]
+    values = np.sort(values)
+    return values[::-1][:k] if largest else values[:k]
+
+
+def age_bucket(age, age_lo):
+    """Índice da faixa: 2*(k - age_lo) para idade inteira k; +1 para idades entre k e k+1."""
+    age = np.asarray(age, dtype=np.float64)
+    whole = np.floor(age)
+    return (2 * (whole - age_lo) + (age != whole)).astype(np.int64)
+
+
+@dataclass(frozen=True)
+class CubeSelection:
+    """Células de um filtro somadas sobre gênero e idade: eixos (histórico, nível)."""
+    n: np.ndarray       # (H, C)
+    s: np.ndarray       # (H, C, V) somas das variáveis deslocadas
+    xx: np.ndarray      # (H, C, V, V) somas de produtos cruzados deslocados
+    shift: np.ndarray   # (V,) deslocamento (média global) aplicado antes de acumular
+    value_cols: tuple
+    families: tuple
+    classes: tuple
+    sketches: "CellSketches" = None
+    hist: np.ndarray = None    # (C, S, B) histogramas somados sobre as células do filtro
+    lows: np.ndarray = None    # (células, C, S, K) menores valores das células do filtro
+    highs: np.ndarray = None   # (células, C, S, K) maiores valores
+
+    @property
+    def total(self):
+        return int(self.n.sum())
+
+    def _col(self, col):
+        return self.value_cols.index(col)
+
+    def mean(self, col):
+        j = self._col(col)
+        return self.s[..., j].sum() / self.n.sum() + self.shift[j]
+
+    def share(self, classes):
+        """Fração dos pacientes selecionados cujo nível está em `classes`."""
+        idx = [self.classes.index(c) for c in classes]
+        return self.n[:, idx].sum() / self.n.sum()
+
+    def counts_by_class(self):
+        counts = self.n.sum(axis=0)
+        return pd.Series(counts, index=pd.Index(self.classes)).loc[lambda c: c > 0].astype(int)
+
+    def mean_by_class(self, col):
+        j = self._col(col)
+        n = self.n.sum(axis=0)
+        present = n > 0
+        means = self.s[..., j].sum(axis=0)[present] / n[present] + self.shift[j]
+        return pd.Series(means, index=pd.Index(np.array(self.classes, dtype=object)[present]))
+
+    def share_by_family(self, classes):
+        """Percentual de `classes` dentro de cada valor de histórico familiar presente."""
+        idx = [self.classes.index(c) for c in classes]
+        n = self.n.sum(axis=1)
+        present = n > 0
+        pct = self.n[:, idx].sum(axis=1)[present] / n[present] * 100
+        return pd.Series(pct, index=pd.Index(np.array(self.families, dtype=object)[present]))
+
+    def corr(self):
+        """Correlação de Pearson entre as variáveis (igual a DataFrame.corr())."""
+        n = self.n.sum()
+        s = self.s.sum(axis=(0, 1))
+        xx = self.xx.sum(axis=(0, 1))
+        cov = xx / n - np.outer(s / n, s / n)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.outer(std, std)
+        return pd.DataFrame(corr, index=list(self.value_cols), columns=list(self.value_cols))
+
+    def box_stats(self, col):
+        """Estatísticas de box plot por nível presente, a partir dos esboços.
+
+        Devolve {nível: {q1, median, q3, lowerfence, upperfence, mean, outliers}};
+        os whiskers seguem Tukey (1,5 IQR) e `outliers` traz no máximo K pontos
+        de cada lado. `col` precisa estar no cubo e nos esboços.
+        """
+        sk = self.sketches
+        j = sk.cols.index(col)
+        lo, width = sk.lo[j], sk.width[j]
+        out = {}
+        for c, label in enumerate(self.classes):
+            counts = self.hist[c, j]
+            if counts.sum() == 0:
+                continue
+            lows = _merge_extremes(self.lows[:, c, j], sk.k, largest=False)
+            highs = _merge_extremes(self.highs[:, c, j], sk.k, largest=True)
+            q1, med, q3 = (_quantile(counts, lo, width, lows, highs, q) for q in (0.25, 0.5, 0.75))
+            iqr = q3 - q1
+            low_fence, high_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+            # whisker = valor mais extremo dentro da cerca; exato se estiver entre os K
+            # extremos guardados, senão aproximado pela borda do primeiro bin ocupado
+            occupied = lo + np.flatnonzero(counts) * width
+            inside = lows[lows >= low_fence]
+            lowerfence = inside[0] if inside.size else max(low_fence, occupied[occupied + width >= low_fence][0])
+            inside = highs[highs <= high_fence]
+            upperfence = inside[0] if inside.size else min(high_fence, occupied[occupied <= high_fence][-1] + width)
+            jv = self._col(col)
+            out[label] = {
+                "q1": q1, "median": med, "q3": q3,
+                "lowerfence": float(lowerfence), "upperfence": float(upperfence),
+                "mean": float(self.s[:, c, jv].sum() / self.n[:, c].sum() + self.shift[jv]),
+                "outliers": np.concatenate([lows[lows < lowerfence], highs[highs > upperfence]]),
+            }
+        return out
+
+
+@dataclass(frozen=True)
+class CellSketches:
+    """Esboços de quantis por célula: histogramas de bins fixos + K extremos de cada lado."""
+    cols: tuple
+    lo: np.ndarray      # (S,) borda inferior do primeiro bin
+    width: np.ndarray   # (S,) largura dos bins
+    k: int
+    hist: np.ndarray    # (*cubo, S, B) contagens, int32
+    lows: np.ndarray    # (*cubo, S, K) menores valores (NaN = vazio)
+    highs: np.ndarray   # (*cubo, S, K) maiores valores
+
+    @classmethod
+    def build(cls, cell, n_cells, dims, x, cols, bins, k):
+        lo = x.min(axis=0)
+        width = np.maximum(x.max(axis=0) - lo, 1e-9) / bins
+        S = len(cols)
+        hist = np.empty((n_cells, S, bins), dtype=np.int32)
+        lows = np.full((n_cells, S, k), np.nan)
+        highs = np.full((n_cells, S, k), np.nan)
+        for j in range(S):
+            b = np.minimum(((x[:, j] - lo[j]) / width[j]).astype(np.int64), bins - 1)
+            hist[:, j] = np.bincount(cell * bins + b, minlength=n_cells * bins).reshape(n_cells, bins)
+            # ordena por (célula, valor) e pega os K primeiros/últimos de cada célula
+            order = np.lexsort((x[:, j], cell))
+            cells_sorted, values = cell[order], x[order, j]
+            present = np.unique(cells_sorted)
+            starts = np.searchsorted(cells_sorted, present, side="left")
+            ends = np.searchsorted(cells_sorted, present, side="right")
+            for i in range(k):
+                ok = starts + i < ends
+                lows[present[ok], j, i] = values[starts[ok] + i]
+                highs[present[ok], j, i] = values[ends[ok] - 1 - i]
+        shape = tuple(dims)
+        return cls(tuple(cols), lo, width, k, hist.reshape(shape + (S, bins)),
+                   lows.reshape(shape + (S, k)), highs.reshape(shape + (S, k)))
+
+    @property
+    def nbytes(self):
+        return self.hist.nbytes + self.lows.nbytes + self.highs.nbytes
+
+
+class StatsCube:
+    """Cubo (gênero, faixa de idade, histórico familiar, nível) montado uma vez por dataset."""
+
+    def __init__(self, genders, families, classes, value_cols, age_lo, age_hi, n, s, xx, shift, sketches=None):
+        self.genders = tuple(genders)
+        self.families = tuple(families)
+        self.classes = tuple(classes)
+        self.value_cols = tuple(value_cols)
+        self.age_lo = age_lo
+        self.age_hi = age_hi
+        self.n, self.s, self.xx, self.shift = n, s, xx, shift
+        self.sketches = sketches
+
+    @classmethod
+    def from_frame(cls, df, value_cols, sketch_cols=(), gender_col="Gênero", age_col="Idade",
+                   family_col="Histórico Familiar", class_col="Obesidade", bins=256, extremes=16):
+        """Agrega `df` (categóricas em `category`) nas células do cubo.
+
+        `sketch_cols` ganham esboços de quantis (`bins` bins e `extremes` extremos por lado).
+        """
+        genders = df[gender_col].cat.categories
+        families = df[family_col].cat.categories
+        classes = df[class_col].cat.categories
+        age = df[age_col].to_numpy(dtype=np.float64)
+        age_lo, age_hi = int(np.floor(age.min())), int(np.floor(age.max()))
+        dims = (len(genders), 2 * (age_hi - age_lo) + 2, len(families), len(classes))
+
+        # índice plano da célula de cada linha (códigos -1 = ausente ficam de fora)
+        codes = [df[gender_col].cat.codes.to_numpy(), age_bucket(age, age_lo),
+                 df[family_col].cat.codes.to_numpy(), df[class_col].cat.codes.to_numpy()]
+        valid = np.all([c >= 0 for c in codes], axis=0)
+        cell = np.ravel_multi_index([c[valid] for c in codes], dims)
+        n_cells = int(np.prod(dims))
+
+        x = df[list(value_cols)].to_numpy(dtype=np.float64)[valid]
+        shift = x.mean(axis=0)  # somas deslocadas evitam cancelamento na covariância
+        x = x - shift
+        V = len(value_cols)
+        n = np.bincount(cell, minlength=n_cells)
+        s = np.empty((n_cells, V))
+        xx = np.empty((n_cells, V, V))
+        for i in range(V):
+            s[:, i] = np.bincount(cell, weights=x[:, i], minlength=n_cells)
+            for j in range(i, V):
+                xx[:, i, j] = xx[:, j, i] = np.bincount(cell, weights=x[:, i] * x[:, j], minlength=n_cells)
+        sketches = None
+        if sketch_cols:
+            xs = df[list(sketch_cols)].to_numpy(dtype=np.float64)[valid]
+            sketches = CellSketches.build(cell, n_cells, dims, xs, sketch_cols, bins, extremes)
+        return cls(genders, families, classes, value_cols, age_lo, age_hi,
+                   n.reshape(dims), s.reshape(dims + (V,)), xx.reshape(dims + (V, V)), shift, sketches)
+
+    def select(self, genders, age_range, families):
+        """Soma as células do filtro (`age_range` inteiro e inclusivo) em uma CubeSelection."""
+        g = sorted(self.genders.index(v) for v in genders if v in self.genders)
+        h = sorted(self.families.index(v) for v in families if v in self.families)
+        a0 = max(2 * (int(age_range[0]) - self.age_lo), 0)
+        a1 = max(2 * (int(age_range[1]) - self.age_lo) + 1, 0)  # fim exclusivo: inclui a idade exata b, não (b, b+1)
+        n = self.n[g, a0:a1][:, :, h].sum(axis=(0, 1))
+        s = self.s[g, a0:a1][:, :, h].sum(axis=(0, 1))
+        xx = self.xx[g, a0:a1][:, :, h].sum(axis=(0, 1))
+        hist = lows = highs = None
+        sk = self.sketches
+        if sk is not None:
+            hist = sk.hist[g, a0:a1][:, :, h].sum(axis=(0, 1, 2))
+            C, S, K = len(self.classes), len(sk.cols), sk.k
+            lows = sk.lows[g, a0:a1][:, :, h].reshape(-1, C, S, K)
+            highs = sk.highs[g, a0:a1][:, :, h].reshape(-1, C, S, K)
+        return CubeSelection(n, s, xx, self.shift, self.value_cols,
+                             tuple(self.families[i] for i in h), self.classes, sk, hist, lows, highs)
+
+    @property
+    def nbytes(self):
+        total = self.n.nbytes + self.s.nbytes + self.xx.nbytes
+        return total + (self.sketches.nbytes if self.sketches is not None else 0)
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""Gerador de dados sintéticos no esquema do Obesity.csv, para testes de escala.
+
+O Obesity.csv tem 2.111 linhas; para exercitar o pipeline, o painel e a
+pontuação em lote com dezenas de milhões de linhas, o gerador aprende, para
+cada classe de obesidade:
+    - a marginal empírica de cada coluna (quantis das numéricas, frequências
+      das categóricas);
+    - a correlação entre as colunas, por uma cópula gaussiana (cada coluna é
+      levada a escores normais pelo seu CDF empírico).
+Para gerar, sorteia a classe pelas proporções do CSV, amostra os escores
+normais correlacionados da classe e volta para a escala original pelos
+quantis/frequências. O peso não é amostrado diretamente: a cópula modela o
+IMC e o peso sai de IMC × altura², de modo que o IMC de cada linha continua
+dentro da faixa da sua classe.
+
+As linhas são geradas em blocos independentes (um gerador aleatório por
+bloco, derivado da semente), distribuídos entre processos e gravados em CSV
+ou Parquet à medida que ficam prontos: o resultado não depende do número de
+processos e a memória não cresce com o número de linhas.
+
+Uso:
+    python synthetic_data.py gerar --linhas 10000000 --saida sintetico.parquet --workers 4
+    python synthetic_data.py gerar --linhas 1000000 --saida sintetico.csv --ptbr
+    python synthetic_data.py verificar --linhas 200000
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+from schema import COL_MAP_PT, TARGET_MAP_PT, VALUE_MAPS_PT
+
+CSV_PATH = "Obesity.csv"
+TARGET = "Obesity"
+NUMERIC = ["Age", "Height", "BMI", "FCVC", "NCP", "CH2O", "FAF", "TUE"]
+# Ordem das categorias na cópula: escalas ordinais na ordem natural, transporte do mais ao menos ativo
+CATEGORICAL = {
+    "Gender": ["Female", "Male"],
+    "family_history": ["no", "yes"],
+    "FAVC": ["no", "yes"],
+    "CAEC": ["no", "Sometimes", "Frequently", "Always"],
+    "SMOKE": ["no", "yes"],
+    "SCC": ["no", "yes"],
+    "CALC": ["no", "Sometimes", "Frequently", "Always"],
+    "MTRANS": ["Walking", "Bike", "Public_Transportation", "Motorbike", "Automobile"],
+}
+# Faixas válidas: alturas observadas, escalas de hábitos e limites do formulário de app.py
+LIMITES = {
+    "Age": (14.0, 61.0),
+    "Height": (1.45, 1.98),
+    "Weight": (20.0, 300.0),
+    "FCVC": (1.0, 3.0),
+    "NCP": (1.0, 4.0),
+    "CH2O": (1.0, 3.0),
+    "FAF": (0.0, 3.0),
+    "TUE": (0.0, 3.0),
+}
+COLUMNS = ["Gender", "Age", "Height", "Weight", "family_history", "FAVC", "FCVC", "NCP", "CAEC",
+           "SMOKE", "CH2O", "SCC", "FAF", "TUE", "CALC", "MTRANS", TARGET]
+CHUNK_ROWS = 250_000
+
+_model = None  # modelo recebido uma única vez por processo
+
+
+# ============================================================================
+# AJUSTE
+# ============================================================================
+def _normal_scores(codes):
+    """Escores normais pelo CDF empírico (empates no posto médio, como na correlação de Spearman)."""
+    n = len(codes)
+    _, inverse, counts = np.unique(codes, return_inverse=True, return_counts=True)
+    mid = (np.cumsum(counts) - counts / 2) / n
+    return ndtri(mid[inverse])
+
+
+@dataclass(frozen=True)
+class ClassModel:
+    """Marginais e fator de Cholesky da cópula de uma classe."""
+
+    quantiles: dict  # numérica -> valores ordenados
+    cumulative: dict  # categórica -> frequência acumulada de cada categoria
+    cholesky: np.ndarray
+
+    @classmethod
+    def fit(cls, df):
+        scores, quantiles, cumulative = [], {}, {}
+        for col in NUMERIC:
+            values = df[col].to_numpy(dtype=np.float64)
+            quantiles[col] = np.sort(values)
+            scores.append(_normal_scores(values))
+        for col, vocab in CATEGORICAL.items():
+            codes = pd.Categorical(df[col], categories=vocab).codes
+            cumulative[col] = np.cumsum(np.bincount(codes, minlength=len(vocab))) / len(codes)
+            scores.append(_normal_scores(codes))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = np.nan_to_num(np.corrcoef(np.vstack(scores)))  # coluna constante na classe: sem correlação
+        np.fill_diagonal(corr, 1.0)
+        # encolhe levemente para a identidade: garante uma matriz positiva definida em classes pequenas
+        corr = 0.98 * corr + 0.02 * np.eye(len(corr))
+        return cls(quantiles, cumulative, np.linalg.cholesky(corr))
+
+    def sample(self, n, rng):
+        """`n` linhas da classe: dict coluna -> array (numéricas em float, categóricas em códigos)."""
+        u = ndtr(rng.standard_normal((n, len(self.cholesky))) @ self.cholesky.T)
+        out = {}
+        for j, col in enumerate(NUMERIC):
+            q = self.quantiles[col]
+            # quantil empírico interpolado: corridas de valores repetidos (ex.: escalas inteiras) se mantêm
+            out[col] = np.interp(u[:, j] * len(q) - 0.5, np.arange(len(q)), q)
+        for j, col in enumerate(CATEGORICAL, start=len(NUMERIC)):
+            out[col] = np.searchsorted(self.cumulative[col], u[:, j], side="right").clip(max=len(CATEGORICAL[col]) - 1)
+        return out
+
+
+@dataclass(frozen=True)
+class SyntheticModel:
+    """Uma `ClassModel` por classe e as proporções das classes no CSV."""
+
+    classes: list
+    priors: np.ndarray
+    per_class: list
+
+    @classmethod
+    def fit(cls, df):
+        """Ajusta no DataFrame do Obesity.csv (colunas e valores originais em inglês)."""
+        df = df.assign(BMI=df["Weight"] / df["Height"] ** 2)
+        counts = df[TARGET].value_counts().sort_index()
+        per_class = [ClassModel.fit(df[df[TARGET] == c]) for c in counts.index]
+        return cls(list(counts.index), (counts / counts.sum()).to_numpy(), per_class)
+
+    def sample(self, n, rng, ptbr=False):
+        """DataFrame com `n` linhas no esquema do Obesity.csv (ou PT-BR, como `dataset.parse_csv`)."""
+        labels = rng.choice(len(self.classes), size=n, p=self.priors)
+        cols = {c: np.empty(n) for c in NUMERIC}
+        cols.update({c: np.empty(n, dtype=np.int8) for c in CATEGORICAL})
+        for k, model in enumerate(self.per_class):
+            rows = np.flatnonzero(labels == k)
+            if len(rows):
+                for col, values in model.sample(len(rows), rng).items():
+                    cols[col][rows] = values
+
+        for col, (lo, hi) in LIMITES.items():
+            if col in cols:
+                np.clip(cols[col], lo, hi, out=cols[col])
+        cols["Height"] = cols["Height"].round(2)
+        cols["Weight"] = np.clip(cols.pop("BMI") * cols["Height"] ** 2, *LIMITES["Weight"]).round(1)
+        vocab = dict(CATEGORICAL, **{TARGET: self.classes})
+        cols[TARGET] = labels
+        if ptbr:
+            vocab = {c: [_translate(c, v) for v in values] for c, values in vocab.items()}
+        df = pd.DataFrame({
+            c: np.asarray(vocab[c], dtype=object)[cols[c]] if c in vocab else cols[c] for c in COLUMNS
+        })
+        return df.rename(columns=COL_MAP_PT) if ptbr else df
+
+
+def _translate(col, value):
+    if col == TARGET:
+        return TARGET_MAP_PT.get(value, value)
+    return VALUE_MAPS_PT.get(COL_MAP_PT[col], {}).get(value, value)
+
+
+# ============================================================================
+# GERAÇÃO EM BLOCOS
+# ============================================================================
+def _init_worker(model):
+    global _model
+    _model = model
+
+
+def generate_chunk(n, seed_seq, ptbr=False, model=None):
+    """Um bloco de `n` linhas com o gerador aleatório de `seed_seq` (reprodutível)."""
+    model = model if model is not None else _model
+    return model.sample(n, np.random.default_rng(seed_seq), ptbr)
+
+
+def _chunk_sizes(n_rows, chunk_rows):
+    return [min(chunk_rows, n_rows - start) for start in range(0, n_rows, chunk_rows)]
+
+
+def generate_file(output_path, n_rows, model, seed=0, chunk_rows=CHUNK_ROWS, workers=None, ptbr=False):
+    """Grava `n_rows` linhas sintéticas em `output_path` (.csv ou .parquet), bloco a bloco.
+
+    Com workers > 1 os blocos são gerados em paralelo, com no máximo
+    2 × workers blocos em voo para manter a memória constante.
+    """
+    from batch_scoring import ChunkWriter
+
+    workers = workers or os.cpu_count() or 1
+    sizes = _chunk_sizes(n_rows, chunk_rows)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    writer = ChunkWriter(output_path)
+    t0 = time.perf_counter()
+    try:
+        if workers == 1:
+            for n, s in zip(sizes, seeds):
+                writer.write(generate_chunk(n, s, ptbr, model))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model,)) as pool:
+                pending = deque()
+                for n, s in zip(sizes, seeds):
+                    pending.append(pool.submit(generate_chunk, n, s, ptbr))
+                    if len(pending) >= 2 * workers:
+                        writer.write(pending.popleft().result())
+                while pending:
+                    writer.write(pending.popleft().result())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - t0
+    return {"linhas": n_rows, "segundos": elapsed, "linhas_por_segundo": n_rows / elapsed if elapsed else 0.0}
+
+
+# ============================================================================
+# VERIFICAÇÃO
+# ============================================================================
+def fidelity(real, synth):
+    """Diferenças por classe entre o CSV e as linhas sintéticas.
+
+    Devolve um DataFrame (uma linha por classe) com a maior diferença de média
+    das numéricas (em desvios-padrão do CSV), a maior diferença de frequência
+    das categorias e a maior diferença na matriz de correlação de Spearman.
+    """
+    numeric = ["Age", "Height", "Weight", "FCVC", "NCP", "CH2O", "FAF", "TUE"]
+    rows = []
+    for c in sorted(real[TARGET].unique()):
+        r, s = real[real[TARGET] == c], synth[synth[TARGET] == c]
+        std = r[numeric].std().replace(0, 1)
+        freq = max(
+            (r[col].value_counts(normalize=True) - s[col].value_counts(normalize=True)).abs().max()
+            for col in CATEGORICAL
+        )
+        corr = (r[numeric].corr("spearman") - s[numeric].corr("spearman")).abs().max().max()
+        rows.append({
+            "Classe": c,
+            "linhas": len(s),
+            "Δ média (σ)": ((r[numeric].mean() - s[numeric].mean()).abs() / std).max(),
+            "Δ frequência": freq,
+            "Δ correlação": corr,
+        })
+    return pd.DataFrame(rows)
+
+
+def out_of_range(df):
+    """Número de valores fora das faixas válidas ou dos vocabulários (esquema original)."""
+    bad = sum(int(((df[c] < lo) | (df[c] > hi)).sum()) for c, (lo, hi) in LIMITES.items())
+    return bad + sum(int((~df[c].isin(v)).sum()) for c, v in CATEGORICAL.items())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gerador de dados sintéticos no esquema do Obesity.csv")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_gen = sub.add_parser("gerar", help="Grava linhas sintéticas em CSV ou Parquet")
+    p_gen.add_argument("--linhas", type=int, default=10_000_000)
+    p_gen.add_argument("--saida", default="sintetico.parquet", help="Arquivo .csv ou .parquet")
+    p_gen.add_argument("--workers", type=int, default=None, help="Processos (padrão: nº de CPUs)")
+    p_gen.add_argument("--bloco", type=int, default=CHUNK_ROWS, help="Linhas por bloco")
+    p_gen.add_argument("--ptbr", action="store_true", help="Colunas e valores em PT-BR (esquema do painel)")
+    p_chk = sub.add_parser("verificar", help="Compara marginais e correlações com o CSV")
+    p_chk.add_argument("--linhas", type=int, default=200_000)
+    p_chk.add_argument("--modelo", default="obesity_pipeline.pkl", help="Acurácia do pipeline nas linhas sintéticas")
+    for p in (p_gen, p_chk):
+        p.add_argument("--dados", default=CSV_PATH)
+        p.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    real = pd.read_csv(args.dados)
+    model = SyntheticModel.fit(real)
+
+    if args.cmd == "gerar":
+        stats = generate_file(args.saida, args.linhas, model, args.semente, args.bloco, args.workers, args.ptbr)
+        print(f"{stats['linhas']:,} linhas geradas em {stats['segundos']:.1f}s "
+              f"({stats['linhas_por_segundo']:,.0f} linhas/s) -> {args.saida}")
+        return
+
+    synth = model.sample(args.linhas, np.random.default_rng(args.semente))
+    print(fidelity(real, synth).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print(f"Valores fora das faixas/vocabulários: {out_of_range(synth)}")
+    if os.path.exists(args.modelo):
+        import joblib
+        from schema import to_pt_features
+
+        pipe = joblib.load(args.modelo)
+        real_acc = (pipe.predict(to_pt_features(real)) == real[TARGET].map(TARGET_MAP_PT)).mean()
+        synth_acc = (pipe.predict(to_pt_features(synth)) == synth[TARGET].map(TARGET_MAP_PT)).mean()
+        print(f"Acurácia do pipeline: CSV {real_acc:.3f} | sintético {synth_acc:.3f}")
+
+
+if __name__ == "__main__":
+    main()
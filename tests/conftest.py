@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Os módulos do projeto ficam na raiz do repositório."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
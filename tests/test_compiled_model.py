@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Paridade do motor compilado (compiled_model.py) com o Pipeline do sklearn."""
+from pathlib import Path
+
+import joblib
+import pandas as pd
+import pytest
+
+from compiled_model import CompiledPipeline, check_parity
+from ml_pipeline_obesity import build_pipeline
+from schema import CAT_COLS, NUM_COLS, to_pt_features
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="module")
+def dados():
+    raw = pd.read_csv(ROOT / "Obesity.csv")
+    return to_pt_features(raw), raw["Obesity"]
+
+
+def _assert_parity(pipe, X):
+    max_diff, agree = check_parity(pipe, CompiledPipeline.from_pipeline(pipe), X)
+    assert max_diff < 1e-9
+    assert agree == 1.0
+
+
+def test_paridade_modelo_publicado(dados):
+    X, _ = dados
+    _assert_parity(joblib.load(ROOT / "obesity_pipeline.pkl"), X)
+
+
+def test_paridade_arvores_profundas(dados):
+    # árvores desbalanceadas (folhas em profundidades diferentes) exercitam o preenchimento do achatamento
+    X, y = dados
+    pipe = build_pipeline(list(NUM_COLS), list(CAT_COLS)).set_params(clf__n_estimators=15, clf__max_depth=6)
+    _assert_parity(pipe.fit(X, y), X)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Troca a quente do ModelHandle: uma carga por vez, sempre com o _load_lock."""
+import threading
+import time
+
+from model_registry import ModelHandle, ModelRegistry
+
+
+def _handle(tmp_path):
+    registry = ModelRegistry(tmp_path / "models")
+    registry.register({"modelo": 1})
+    return registry, ModelHandle(registry, fallback_path=tmp_path / "nada.pkl", check_interval=0.0)
+
+
+def test_current_muda_durante_a_carga(tmp_path):
+    registry, handle = _handle(tmp_path)
+    assert handle.get().version == "v0001"
+    registry.register({"modelo": 2})
+
+    original, cargas = handle._load, []
+
+    def load(source):
+        cargas.append(handle._load_lock.locked())
+        loaded = original(source)
+        if len(cargas) == 1:
+            registry.register({"modelo": 3})  # CURRENT muda no meio da carga
+        return loaded
+
+    handle._load = load
+    assert handle.get().version == "v0002"
+    assert cargas == [True]  # exatamente uma carga, com o lock
+    assert handle.get().version == "v0003"
+    assert cargas == [True, True]
+
+
+def test_leitores_nao_esperam_a_carga(tmp_path):
+    registry, handle = _handle(tmp_path)
+    handle.get()
+    registry.register({"modelo": 2})
+
+    original, comecou = handle._load, threading.Event()
+
+    def slow(source):
+        comecou.set()
+        time.sleep(0.5)
+        return original(source)
+
+    handle._load = slow
+    carregador = threading.Thread(target=handle.get)
+    carregador.start()
+    comecou.wait()
+    t0 = time.perf_counter()
+    assert handle.get().version == "v0001"  # segue com a versão atual
+    assert time.perf_counter() - t0 < 0.25
+    carregador.join()
+    assert handle.get().version == "v0002"
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Simulador "e se...?" dos hábitos modificáveis do paciente.
+
+A partir do paciente do formulário, monta de uma vez a grade de cenários:
+cada hábito levado a cada valor mais saudável que o atual (mais atividade
+física, vegetais e água, menos telas, sem alimentos hipercalóricos, menos
+beliscos, transporte ativo), mais um cenário com todos os hábitos no valor
+mais saudável. A grade inteira é pontuada em uma única chamada de
+`predict_proba`.
+
+Impacto de um cenário = quanto cai a distância esperada (em níveis da escala
+Baixo peso … Obesidade III) até o Peso normal. Vale tanto para quem está acima
+quanto para quem está abaixo do peso.
+"""
+import numpy as np
+
+from dataset import TARGET_LEVELS
+from prediction_cache import canonical_record
+
+NIVEL_SAUDAVEL = TARGET_LEVELS.index("Peso_normal")
+
+# Hábitos numéricos: (limite saudável, passo do formulário); o sentido vem do limite
+HABITOS_NUMERICOS = {
+    "Atividade Física": (3.0, 0.5),
+    "FCVC": (3.0, 0.5),
+    "Água por dia": (3.0, 0.5),
+    "Tempo em Telas": (0.0, 0.5),
+}
+# Hábitos categóricos: valores do mais saudável para o menos saudável
+HABITOS_CATEGORICOS = {
+    "FAVC": ["Não", "Sim"],
+    "CAEC": ["Não", "Às vezes", "Frequentemente", "Sempre"],
+    "Transporte": ["Caminhada", "Bicicleta", "Transporte público", "Automóvel", "Motocicleta"],
+}
+# Caminhada e bicicleta são igualmente ativas: nenhuma é "melhora" da outra
+_EQUIVALENTES = {"Transporte": {"Caminhada": 0, "Bicicleta": 0}}
+
+
+def _alternatives(campo, atual):
+    """Valores mais saudáveis que `atual` para o hábito `campo`."""
+    if campo in HABITOS_NUMERICOS:
+        limite, passo = HABITOS_NUMERICOS[campo]
+        sentido = 1.0 if limite > atual else -1.0
+        n = int(round(abs(limite - atual) / passo))
+        return [round(atual + sentido * passo * i, 6) for i in range(1, n + 1)]
+    ordem = HABITOS_CATEGORICOS[campo]
+    rank = {v: _EQUIVALENTES.get(campo, {}).get(v, i) for i, v in enumerate(ordem)}
+    return [v for v in ordem if atual in rank and rank[v] < rank[atual]]
+
+
+def build_scenarios(entrada):
+    """Grade de cenários: lista de (hábito, novo valor, paciente) — o primeiro é o paciente atual."""
+    base = canonical_record(entrada)
+    cenarios = [(None, None, base)]
+    combinado = dict(base)
+    for campo in list(HABITOS_NUMERICOS) + list(HABITOS_CATEGORICOS):
+        valores = _alternatives(campo, base[campo])
+        for valor in valores:
+            cenarios.append((campo, valor, {**base, campo: valor}))
+        if valores:
+            combinado[campo] = valores[-1] if campo in HABITOS_NUMERICOS else valores[0]
+    if len(cenarios) > 2:
+        cenarios.append(("Todos os hábitos", None, combinado))
+    return cenarios
+
+
+def expected_distance(proba, classes):
+    """Distância esperada (em níveis) até o Peso normal, para cada linha de `proba`."""
+    niveis = np.array([abs(TARGET_LEVELS.index(c) - NIVEL_SAUDAVEL) if c in TARGET_LEVELS else 0
+                       for c in classes], dtype=np.float64)
+    return proba @ niveis
+
+
+def simulate(model, entrada):
+    """Pontua a grade de cenários em uma chamada de `predict_proba`.
+
+    Devolve um DataFrame com uma linha por cenário (sem o paciente atual):
+    Hábito, Valor atual, Novo valor, Classe prevista, ΔP classe atual
+    (variação da probabilidade da classe prevista hoje) e Impacto (redução da
+    distância esperada até o Peso normal; positivo = melhora).
+    """
+    import pandas as pd
+
+    cenarios = build_scenarios(entrada)
+    grade = pd.DataFrame([paciente for _, _, paciente in cenarios])
+    proba = model.predict_proba(grade)
+    classes = model.classes_
+    distancia = expected_distance(proba, classes)
+    atual = int(proba[0].argmax())
+
+    base = cenarios[0][2]
+    return pd.DataFrame({
+        "Hábito": [campo for campo, _, _ in cenarios[1:]],
+        "Valor atual": [base[campo] if campo in base else None for campo, _, _ in cenarios[1:]],
+        "Novo valor": [valor for _, valor, _ in cenarios[1:]],
+        "Classe prevista": classes[proba[1:].argmax(axis=1)],
+        "ΔP classe atual": proba[1:, atual] - proba[0, atual],
+        "Impacto": distancia[0] - distancia[1:],
+    })
+
+
+def rank_habits(cenarios):
+    """Melhor cenário de cada hábito, do maior para o menor impacto."""
+    melhores = cenarios.loc[cenarios.groupby("Hábito", sort=False)["Impacto"].idxmax()]
+    return melhores.sort_values("Impacto", ascending=False).reset_index(drop=True)